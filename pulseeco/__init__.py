@@ -2,25 +2,59 @@ from importlib.util import find_spec
 
 if find_spec("pydantic") is not None:  # pragma: no cover
     from .client import (
+        AirQualityIndex,
+        AqiStandard,
         AveragePeriod,
         DataValue,
+        DataValueBatch,
+        DataValueRecord,
+        DataValueRow,
         DataValueType,
+        IndexedSensor,
+        LocalMirror,
+        Measurement,
+        MeasurementWatcher,
+        MultiCityPulseEcoClient,
+        MultiCityResult,
+        NearbySensor,
         Overall,
         OverallValues,
         PulseEcoClient,
+        QuerySpec,
+        RollingMean,
         Sensor,
+        SensorIndex,
+        SensorRegistry,
         SensorStatus,
         SensorType,
+        TrustedPulseEcoClient,
     )
 
     __all__ = [
+        "AirQualityIndex",
+        "AqiStandard",
         "AveragePeriod",
         "DataValue",
+        "DataValueBatch",
+        "DataValueRecord",
+        "DataValueRow",
         "DataValueType",
+        "IndexedSensor",
+        "LocalMirror",
+        "Measurement",
+        "MeasurementWatcher",
+        "MultiCityPulseEcoClient",
+        "MultiCityResult",
+        "NearbySensor",
         "Overall",
         "OverallValues",
         "PulseEcoClient",
+        "QuerySpec",
+        "RollingMean",
         "Sensor",
+        "SensorIndex",
+        "SensorRegistry",
         "SensorStatus",
         "SensorType",
+        "TrustedPulseEcoClient",
     ]
@@ -1,19 +1,23 @@
 from .data_types import (
+    DataRawQuery,
     DataValueAvg,
     DataValueBase,
     DataValueRaw,
     Overall,
     OverallValues,
+    RangeQuery,
     Sensor,
 )
 from .pulse_eco_api import PulseEcoAPI
 
 __all__ = [
+    "DataRawQuery",
     "DataValueAvg",
     "DataValueBase",
     "DataValueRaw",
     "Overall",
     "OverallValues",
     "PulseEcoAPI",
+    "RangeQuery",
     "Sensor",
 ]
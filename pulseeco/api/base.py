@@ -1,18 +1,66 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import asyncio
+import json
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+from .merging import merge_data_values
 
 if TYPE_CHECKING:
     import datetime
+    from collections.abc import AsyncIterator, Iterable, Iterator
+    from types import TracebackType
 
-    from .data_types import DataValueAvg, DataValueRaw, Overall, Sensor
+    from .data_types import (
+        DataRawQuery,
+        DataValueAvg,
+        DataValueRaw,
+        Overall,
+        RangeQuery,
+        Sensor,
+    )
 
 from abc import ABC, abstractmethod
 
+_T = TypeVar("_T", bound="PulseEcoAPIBase")
+
+
+def _encode(data: Any) -> bytes:  # noqa: ANN401
+    return json.dumps(data).encode()
 
-class PulseEcoAPIBase(ABC):  # pragma: no cover
+
+class PulseEcoAPIBase(ABC):  # pragma: no cover  # noqa: PLR0904
     """Low level unsafe pulse.eco API wrapper base class"""
 
+    def close(self) -> None:  # noqa: B027
+        """Close the resources owned by the API wrapper."""
+
+    async def aclose(self) -> None:
+        """Close the resources owned by the API wrapper."""
+        self.close()
+
+    def __enter__(self: _T) -> _T:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    async def __aenter__(self: _T) -> _T:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
     @abstractmethod
     def sensors(self) -> list[Sensor]: ...
 
@@ -43,6 +91,150 @@ class PulseEcoAPIBase(ABC):  # pragma: no cover
         sensor_id: str | None = None,
     ) -> list[DataValueRaw]: ...
 
+    def data_raw_bytes(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None = None,
+        sensor_id: str | None = None,
+    ) -> list[bytes]:
+        """Get raw data for a city as response bodies, encodes the decoded data."""
+        return [
+            _encode(self.data_raw(from_=from_, to=to, type=type, sensor_id=sensor_id))
+        ]
+
+    async def adata_raw_bytes(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None = None,
+        sensor_id: str | None = None,
+    ) -> list[bytes]:
+        """Get raw data for a city as response bodies, encodes the decoded data."""
+        return [
+            _encode(
+                await self.adata_raw(from_=from_, to=to, type=type, sensor_id=sensor_id)
+            )
+        ]
+
+    def iter_data_raw(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None = None,
+        sensor_id: str | None = None,
+        prefetch: int = 1,
+    ) -> Iterator[list[DataValueRaw]]:
+        """Get raw data for a city in batches, yields all data as one batch."""
+        yield self.data_raw(from_=from_, to=to, type=type, sensor_id=sensor_id)
+
+    async def aiter_data_raw(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None = None,
+        sensor_id: str | None = None,
+        prefetch: int = 1,
+    ) -> AsyncIterator[list[DataValueRaw]]:
+        """Get raw data for a city in batches, yields all data as one batch."""
+        yield await self.adata_raw(from_=from_, to=to, type=type, sensor_id=sensor_id)
+
+    def data_raw_many(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        queries: Iterable[DataRawQuery],
+    ) -> list[DataValueRaw]:
+        """Get raw data for many queries, merged by stamp, sensor and type."""
+        return merge_data_values([
+            self.data_raw(from_=from_, to=to, type=type, sensor_id=sensor_id)
+            for type, sensor_id in queries
+        ])
+
+    async def adata_raw_many(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        queries: Iterable[DataRawQuery],
+    ) -> list[DataValueRaw]:
+        """Get raw data for many queries, merged by stamp, sensor and type."""
+        return merge_data_values(
+            await asyncio.gather(
+                *(
+                    self.adata_raw(from_=from_, to=to, type=type, sensor_id=sensor_id)
+                    for type, sensor_id in queries
+                )
+            )
+        )
+
+    def data_raw_many_bytes(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        queries: Iterable[DataRawQuery],
+    ) -> list[bytes]:
+        """Get raw data for many queries as response bodies, encodes the data."""
+        return [_encode(self.data_raw_many(from_=from_, to=to, queries=queries))]
+
+    async def adata_raw_many_bytes(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        queries: Iterable[DataRawQuery],
+    ) -> list[bytes]:
+        """Get raw data for many queries as response bodies, encodes the data."""
+        return [_encode(await self.adata_raw_many(from_=from_, to=to, queries=queries))]
+
+    def query_many(self, queries: Iterable[RangeQuery]) -> list[list[Any]]:
+        """Get the data of many range queries, a list of data values per query."""
+        return [
+            cast(
+                "list[Any]",
+                self.data_raw(query.from_, query.to, query.type, query.sensor_id),
+            )
+            if query.end_point == "dataRaw"
+            else cast(
+                "list[Any]",
+                self.avg_data(
+                    query.end_point.removeprefix("avgData/"),
+                    query.from_,
+                    query.to,
+                    cast("str", query.type),
+                    query.sensor_id,
+                ),
+            )
+            for query in queries
+        ]
+
+    async def aquery_many(self, queries: Iterable[RangeQuery]) -> list[list[Any]]:
+        """Get the data of many range queries, a list of data values per query."""
+        return list(
+            await asyncio.gather(
+                *(
+                    self.adata_raw(query.from_, query.to, query.type, query.sensor_id)
+                    if query.end_point == "dataRaw"
+                    else self.aavg_data(
+                        query.end_point.removeprefix("avgData/"),
+                        query.from_,
+                        query.to,
+                        cast("str", query.type),
+                        query.sensor_id,
+                    )
+                    for query in queries
+                )
+            )
+        )
+
+    def query_many_bytes(self, queries: Iterable[RangeQuery]) -> list[list[bytes]]:
+        """Get the response bodies of many range queries, encodes the data."""
+        return [[_encode(result)] for result in self.query_many(queries)]
+
+    async def aquery_many_bytes(
+        self, queries: Iterable[RangeQuery]
+    ) -> list[list[bytes]]:
+        """Get the response bodies of many range queries, encodes the data."""
+        return [[_encode(result)] for result in await self.aquery_many(queries)]
+
     @abstractmethod
     def avg_data(
         self,
@@ -63,6 +255,28 @@ class PulseEcoAPIBase(ABC):  # pragma: no cover
         sensor_id: str | None = None,
     ) -> list[DataValueAvg]: ...
 
+    def avg_data_bytes(
+        self,
+        period: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str,
+        sensor_id: str | None = None,
+    ) -> list[bytes]:
+        """Get average data for a city as response bodies, encodes the data."""
+        return [_encode(self.avg_data(period, from_, to, type, sensor_id))]
+
+    async def aavg_data_bytes(
+        self,
+        period: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str,
+        sensor_id: str | None = None,
+    ) -> list[bytes]:
+        """Get average data for a city as response bodies, encodes the data."""
+        return [_encode(await self.aavg_data(period, from_, to, type, sensor_id))]
+
     @abstractmethod
     def data24h(self) -> list[DataValueRaw]: ...
 
@@ -75,6 +289,22 @@ class PulseEcoAPIBase(ABC):  # pragma: no cover
     @abstractmethod
     async def acurrent(self) -> list[DataValueRaw]: ...
 
+    def data24h_bytes(self) -> bytes:
+        """Get 24h data for a city as a response body, encodes the data."""
+        return _encode(self.data24h())
+
+    async def adata24h_bytes(self) -> bytes:
+        """Get 24h data for a city as a response body, encodes the data."""
+        return _encode(await self.adata24h())
+
+    def current_bytes(self) -> bytes:
+        """Get the current data of a city as a response body, encodes the data."""
+        return _encode(self.current())
+
+    async def acurrent_bytes(self) -> bytes:
+        """Get the current data of a city as a response body, encodes the data."""
+        return _encode(await self.acurrent())
+
     @abstractmethod
     def overall(self) -> Overall: ...
 
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import datetime
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from pulseeco.constants import (
+    CACHE_SETTLE_DELAY,
+    DEFAULT_CACHE_MAX_SIZE,
+    LIVE_CACHE_TTL,
+    SENSOR_CACHE_TTL,
+)
+from pulseeco.utils import parse_datetime
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+# Get the TTL in seconds of a response by its end point and get parameters,
+# `math.inf` caches the response forever and None does not cache it.
+CachePolicy = Callable[[str, dict[str, Any]], Optional[float]]
+
+
+def default_cache_policy(end_point: str, params: dict[str, Any]) -> float | None:
+    """Get the TTL of a response following how often the end points change.
+
+    - `sensor` and `sensor/{id}` change rarely and are cached for an hour.
+    - `overall`, `current` and `data24h` are cached for a minute.
+    - `dataRaw` and `avgData` of windows that ended more than 2 hours ago
+      never change and are cached forever, newer windows are cached for a minute.
+
+    :param end_point: an end point of the API
+    :param params: the get parameters of the request
+    :return: the TTL in seconds, `math.inf` for forever, or None to not cache
+    """
+    if end_point == "sensor" or end_point.startswith("sensor/"):
+        return SENSOR_CACHE_TTL
+    if end_point in {"overall", "current", "data24h"}:
+        return LIVE_CACHE_TTL
+    if end_point == "dataRaw" or end_point.startswith("avgData/"):
+        to = params.get("to")
+        if to is None:
+            return LIVE_CACHE_TTL
+        to = parse_datetime(to)
+        if to.tzinfo is None:
+            to = to.replace(tzinfo=datetime.timezone.utc)
+        settled_at = (
+            datetime.datetime.now(tz=datetime.timezone.utc) - CACHE_SETTLE_DELAY
+        )
+        return math.inf if to < settled_at else LIVE_CACHE_TTL
+    return None
+
+
+class ResponseCacheBase(ABC):
+    """Response cache base class, implement it to plug in another storage."""
+
+    def __init__(self, policy: CachePolicy = default_cache_policy) -> None:
+        """Initialize the response cache.
+
+        :param policy: gets the TTL of a response, defaults to `default_cache_policy`
+        """
+        self.policy = policy
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Any:  # noqa: ANN401
+        """Get a cached response.
+
+        :param key: the key of the request
+        :raises KeyError: if the response is not cached or expired
+        :return: the cached response
+        """
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:  # noqa: ANN401
+        """Cache a response.
+
+        :param key: the key of the request
+        :param value: the response
+        :param ttl: the TTL in seconds, `math.inf` for forever
+        """
+
+
+class ResponseCache(ResponseCacheBase):
+    """Thread safe in-memory LRU response cache with a TTL per response.
+
+    The cached responses are shared between callers and should not be mutated.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+        policy: CachePolicy = default_cache_policy,
+    ) -> None:
+        """Initialize the response cache.
+
+        :param max_size: the maximum number of cached responses, the least
+            recently used response is evicted when full, defaults to 1024
+        :param policy: gets the TTL of a response, defaults to `default_cache_policy`
+        """
+        super().__init__(policy=policy)
+        if max_size < 1:
+            raise ValueError("`max_size` should be at least 1")
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """The ratio of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get(self, key: Hashable) -> Any:  # noqa: ANN401
+        """Get a cached response.
+
+        :param key: the key of the request
+        :raises KeyError: if the response is not cached or expired
+        :return: the cached response
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:  # noqa: ANN401
+        """Cache a response.
+
+        :param key: the key of the request
+        :param value: the response
+        :param ttl: the TTL in seconds, `math.inf` for forever
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all cached responses and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, NamedTuple
+
+from pulseeco.constants import (
+    ADAPTIVE_CHUNK_LARGE_ROWS,
+    ADAPTIVE_CHUNK_MIN_SPAN,
+    ADAPTIVE_CHUNK_SMALL_ROWS,
+)
+
+if TYPE_CHECKING:
+    import datetime
+
+# (city name, end point, data value type, sensor ID)
+ChunkKey = tuple[str, str, str, str]
+
+
+class ChunkDecision(NamedTuple):
+    """A change of the learned span of a chunk key."""
+
+    key: ChunkKey
+    reason: str
+    """One of 'timeout', 'oversized' or 'sparse'."""
+    old_span: datetime.timedelta
+    new_span: datetime.timedelta
+
+
+class AdaptiveChunkPlanner:
+    """Learns the span of the chunk requests per city, end point, type and sensor.
+
+    The span is halved after a chunk request times out
+    or returns too many data values,
+    and doubled (up to the maximum span of the end point)
+    after a full span chunk returns only a few data values.
+    """
+
+    def __init__(
+        self,
+        min_span: datetime.timedelta = ADAPTIVE_CHUNK_MIN_SPAN,
+        small_rows: int = ADAPTIVE_CHUNK_SMALL_ROWS,
+        large_rows: int = ADAPTIVE_CHUNK_LARGE_ROWS,
+        max_decisions: int = 1000,
+    ) -> None:
+        """Initialize the adaptive chunk planner.
+
+        :param min_span: the span is never halved below this, defaults to 1 hour
+        :param small_rows: a full span chunk with less data values than this
+            doubles the span, defaults to 500
+        :param large_rows: a chunk with more data values than this
+            halves the span, defaults to 20000
+        :param max_decisions: the number of latest decisions kept, defaults to 1000
+        """
+        if small_rows >= large_rows:
+            raise ValueError("`small_rows` should be less than `large_rows`")
+        self.min_span = min_span
+        self.small_rows = small_rows
+        self.large_rows = large_rows
+        self._spans: dict[ChunkKey, datetime.timedelta] = {}
+        self._max_spans: dict[ChunkKey, datetime.timedelta] = {}
+        self._decisions: deque[ChunkDecision] = deque(maxlen=max_decisions)
+        self._lock = threading.Lock()
+
+    @property
+    def spans(self) -> dict[ChunkKey, datetime.timedelta]:
+        """The learned span of each chunk key."""
+        with self._lock:
+            return dict(self._spans)
+
+    @property
+    def decisions(self) -> list[ChunkDecision]:
+        """The latest changes of the learned spans, oldest first."""
+        with self._lock:
+            return list(self._decisions)
+
+    def get_span(
+        self, key: ChunkKey, max_span: datetime.timedelta
+    ) -> datetime.timedelta:
+        """Get the span to split a request with.
+
+        :param key: the chunk key of the request
+        :param max_span: the maximum span of the end point
+        :return: the learned span, or the maximum span if nothing is learned yet
+        """
+        with self._lock:
+            self._max_spans[key] = max_span
+            return min(self._spans.get(key, max_span), max_span)
+
+    def _change_span(
+        self, key: ChunkKey, reason: str, new_span: datetime.timedelta
+    ) -> None:
+        old_span = self._spans.get(key, self._max_spans.get(key, new_span))
+        if new_span == old_span:
+            return
+        self._spans[key] = new_span
+        self._decisions.append(
+            ChunkDecision(key=key, reason=reason, old_span=old_span, new_span=new_span)
+        )
+
+    def record_timeout(
+        self, key: ChunkKey, span: datetime.timedelta
+    ) -> datetime.timedelta | None:
+        """Record that a chunk request timed out.
+
+        :param key: the chunk key of the request
+        :param span: the span of the chunk
+        :return: the span to retry the chunk with,
+            or None if it can not be split any further
+        """
+        if span <= self.min_span:
+            return None
+        new_span = max(self.min_span, span / 2)
+        with self._lock:
+            self._change_span(key, "timeout", min(new_span, self._spans.get(key, span)))
+        return new_span
+
+    def record_success(
+        self, key: ChunkKey, span: datetime.timedelta, rows: int
+    ) -> None:
+        """Record the number of data values returned by a chunk request.
+
+        :param key: the chunk key of the request
+        :param span: the span of the chunk
+        :param rows: the number of data values returned
+        """
+        with self._lock:
+            max_span = self._max_spans.get(key, span)
+            current_span = self._spans.get(key, max_span)
+            if rows > self.large_rows and span > self.min_span:
+                self._change_span(
+                    key, "oversized", min(current_span, max(self.min_span, span / 2))
+                )
+            # a shorter chunk is the tail of the span and says nothing about density
+            elif rows < self.small_rows and span >= current_span:
+                self._change_span(key, "sparse", min(max_span, current_span * 2))
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    """An in-flight sync call that other threads can wait for."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+
+class _AsyncCall:
+    """An in-flight async call and the number of callers waiting for it."""
+
+    def __init__(self, task: asyncio.Future[Any]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into one.
+
+    While a call for a key is in flight, other calls for the same key
+    wait for it and share its result instead of calling again.
+    Sync calls are shared between threads,
+    async calls are shared between tasks of the same event loop.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call[Any]] = {}
+        self._async_calls: dict[
+            tuple[asyncio.AbstractEventLoop, Hashable], _AsyncCall
+        ] = {}
+        self._saved = 0
+
+    @property
+    def saved(self) -> int:
+        """The number of calls that shared the result of an in-flight call."""
+        return self._saved
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Call a function, or wait for the in-flight call with the same key.
+
+        :param key: the key of the call
+        :param func: the function to call
+        :return: the result of the function
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                self._saved += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return cast("T", call.result)
+
+        try:
+            call.result = result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return result
+
+    def _forget(
+        self, loop_key: tuple[asyncio.AbstractEventLoop, Hashable], call: _AsyncCall
+    ) -> None:
+        # a new call may have taken the key after this one was abandoned
+        if self._async_calls.get(loop_key) is call:
+            del self._async_calls[loop_key]
+
+    def _done(
+        self,
+        loop_key: tuple[asyncio.AbstractEventLoop, Hashable],
+        call: _AsyncCall,
+        _: asyncio.Future[Any],
+    ) -> None:
+        with self._lock:
+            self._forget(loop_key, call)
+
+    async def ado(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Await a function, or wait for the in-flight call with the same key.
+
+        The call runs in its own task, so a cancelled caller does not cancel it
+        for the others, it is cancelled only when every caller was cancelled.
+
+        :param key: the key of the call
+        :param func: the async function to call
+        :return: the result of the function
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (loop, key)
+        with self._lock:
+            call = self._async_calls.get(loop_key)
+            if call is None:
+                call = self._async_calls[loop_key] = _AsyncCall(
+                    asyncio.ensure_future(func())
+                )
+                call.task.add_done_callback(
+                    functools.partial(self._done, loop_key, call)
+                )
+            else:
+                self._saved += 1
+            call.waiters += 1
+
+        try:
+            return cast("T", await asyncio.shield(call.task))
+        finally:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = call.waiters == 0 and not call.task.done()
+                if abandoned:
+                    self._forget(loop_key, call)
+            if abandoned:
+                call.task.cancel()
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import TypedDict
+from typing import TYPE_CHECKING, NamedTuple, Optional, TypedDict, Union
+
+if TYPE_CHECKING:
+    import datetime
 
 
 class Sensor(TypedDict):
@@ -41,3 +44,21 @@ class OverallValues(TypedDict):
 class Overall(TypedDict):
     cityName: str
     values: OverallValues
+
+
+class DataRawQuery(NamedTuple):
+    """The type and sensor of one raw data query, None matches all."""
+
+    type: Optional[str]  # noqa: UP045
+    sensor_id: Optional[str]  # noqa: UP045
+
+
+class RangeQuery(NamedTuple):
+    """One raw or average data query over a datetime range."""
+
+    # the end point, dataRaw or avgData/{period}
+    end_point: str
+    from_: Union[str, datetime.datetime]  # noqa: UP007
+    to: Union[str, datetime.datetime]  # noqa: UP007
+    type: Optional[str] = None  # noqa: UP045
+    sensor_id: Optional[str] = None  # noqa: UP045
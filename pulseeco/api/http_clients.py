@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import sys
+import threading
+from http import HTTPStatus
 from importlib.util import find_spec
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Any, Union, cast
 
 has_requests = find_spec("requests") is not None
 has_aiohttp = find_spec("aiohttp") is not None
@@ -14,6 +18,8 @@ if has_httpx:  # pragma: no cover
     import httpx  # type: ignore[import-not-found, unused-ignore]
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     import aiohttp  # type: ignore[import-not-found, unused-ignore]
 
 
@@ -43,6 +49,225 @@ def get_fallback_sync_client() -> _SingleUseClient:  # pragma: no cover
     )
 
 
+def create_pooled_sync_client(pool_maxsize: int) -> CLIENT:  # pragma: no cover
+    """Create a sync http client that keeps connections to one host alive.
+
+    :param pool_maxsize: the maximum number of connections kept alive to the host
+    :return: a requests.Session if requests is installed, else an httpx.Client
+    """
+    if has_requests:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_maxsize
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    if has_httpx:
+        return httpx.Client(
+            limits=httpx.Limits(
+                max_connections=pool_maxsize,
+                max_keepalive_connections=pool_maxsize,
+            )
+        )
+    raise ImportError(
+        "No supported sync http client is installed"
+        ", install one of the extras `requests` or `httpx`"
+        ", you can install either with `pip install pulse-eco[requests]`"
+        " or `pip install pulse-eco[httpx]`"
+    )
+
+
 if TYPE_CHECKING:
     CLIENT = Union[requests.Session, httpx.Client, _SingleUseClient]
     ASYNC_CLIENT = Union[aiohttp.ClientSession, httpx.AsyncClient]
+
+
+def get_status_code(response: Any) -> int:  # noqa: ANN401
+    """Get the status code of a response of any supported http client.
+
+    :param response: a requests, httpx or aiohttp response
+    :return: the status code
+    """
+    # aiohttp uses `status`, requests and httpx use `status_code`
+    status_code = getattr(response, "status_code", None)
+    if status_code is None:
+        status_code = response.status
+    return cast("int", status_code)
+
+
+def is_transient_error(e: BaseException) -> bool:
+    """Check if a request exception is a connection error or a timeout.
+
+    :param e: the exception raised while sending a request
+    :return: whether the request can be retried
+    """
+    if isinstance(e, (ConnectionError, asyncio.TimeoutError)):
+        return True
+    if has_requests and isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if has_httpx and isinstance(e, httpx.TransportError):
+        return True
+    # an aiohttp exception can only be raised if aiohttp was imported
+    aiohttp_module = sys.modules.get("aiohttp")
+    return aiohttp_module is not None and isinstance(
+        e, aiohttp_module.ClientConnectionError
+    )
+
+
+def is_http_error(e: BaseException) -> bool:
+    """Check if a request exception is an error status response.
+
+    :param e: the exception raised while sending a request
+    :return: whether the response had an error status
+    """
+    if has_requests and isinstance(e, requests.HTTPError):
+        return True
+    if has_httpx and isinstance(e, httpx.HTTPStatusError):
+        return True
+    # an aiohttp exception can only be raised if aiohttp was imported
+    aiohttp_module = sys.modules.get("aiohttp")
+    return aiohttp_module is not None and isinstance(
+        e, aiohttp_module.ClientResponseError
+    )
+
+
+def is_timeout_error(e: BaseException) -> bool:
+    """Check if a request exception is a timeout or a gateway timeout response.
+
+    :param e: the exception raised while sending a request
+    :return: whether the request timed out
+    """
+    if isinstance(e, asyncio.TimeoutError):
+        return True
+    if has_requests and isinstance(e, requests.Timeout):
+        return True
+    if has_httpx and isinstance(e, httpx.TimeoutException):
+        return True
+    # requests and httpx keep the response, aiohttp keeps the status
+    response = getattr(e, "response", None)
+    status_code = (
+        getattr(response, "status_code", None)
+        if response is not None
+        else getattr(e, "status", None)
+    )
+    return status_code == HTTPStatus.GATEWAY_TIMEOUT
+
+
+def is_thread_safe_client(client: CLIENT) -> bool:
+    """Check if a sync http client can be shared between threads.
+
+    `requests.Session` is not documented as thread safe,
+    `httpx.Client` and the single use clients are.
+
+    :param client: a sync http client
+    :return: whether the client is thread safe
+    """
+    return not (has_requests and isinstance(client, requests.Session))
+
+
+def _clone_requests_session(session: requests.Session) -> requests.Session:
+    """Create a new session with the configuration of another session.
+
+    The transport adapters are shared, which are thread safe,
+    so the connection pools are shared as well.
+    """
+    clone = requests.Session()
+    clone.headers.update(session.headers)
+    clone.auth = session.auth
+    clone.proxies.update(session.proxies)
+    clone.verify = session.verify
+    clone.cert = session.cert
+    for prefix, adapter in session.adapters.items():
+        clone.mount(prefix, adapter)
+    return clone
+
+
+class SyncClientPool:
+    """Hands out sync http clients to threads.
+
+    If no client is configured, a pooled keep-alive client is created lazily
+    and owned by the pool.
+    A thread safe client is shared between all threads.
+    Otherwise only the thread that created the pool uses the client,
+    every other thread gets its own client from the client factory.
+    """
+
+    def __init__(
+        self,
+        client: CLIENT | None = None,
+        client_factory: Callable[[], CLIENT] | None = None,
+        pool_maxsize: int = 1,
+    ) -> None:
+        """Initialize the client pool.
+
+        :param client: the configured sync http client, defaults to None
+            which lazily creates a pooled keep-alive client owned by the pool
+        :param client_factory: creates the per-thread clients
+            if the client is not thread safe, defaults to None which
+            creates sessions with the configuration of the client
+        :param pool_maxsize: the maximum number of connections kept alive
+            by the owned client, defaults to 1
+        """
+        self._client = client
+        self._owns_client = client is None
+        self._client_factory = client_factory
+        self._pool_maxsize = pool_maxsize
+        self._thread_safe = client is None or is_thread_safe_client(client)
+        self._owner = threading.get_ident()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._factory_clients: list[CLIENT] = []
+        self._generation = 0
+
+    def _get_client(self) -> CLIENT:
+        """Get the configured client, create the owned client if needed."""
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = create_pooled_sync_client(self._pool_maxsize)
+                    self._thread_safe = is_thread_safe_client(self._client)
+                client = self._client
+        return client
+
+    def get(self) -> CLIENT:
+        """Get the client for the current thread.
+
+        :return: a sync http client
+        """
+        client = self._get_client()
+        if self._thread_safe or threading.get_ident() == self._owner:
+            return client
+        thread_client: CLIENT | None = getattr(self._local, "client", None)
+        # thread clients created before the pool was closed are stale
+        if thread_client is None or self._local.generation != self._generation:
+            if self._client_factory is not None:
+                thread_client = self._client_factory()
+                with self._lock:
+                    self._factory_clients.append(thread_client)
+            else:
+                thread_client = _clone_requests_session(
+                    cast("requests.Session", client)
+                )
+            self._local.client = thread_client
+            self._local.generation = self._generation
+        return thread_client
+
+    def close(self) -> None:
+        """Close the owned client and the clients created by the client factory.
+
+        The owned client is created again if the pool is used after closing.
+        """
+        with self._lock:
+            factory_clients, self._factory_clients = self._factory_clients, []
+            self._generation += 1
+            owned_client = self._client if self._owns_client else None
+            if self._owns_client:
+                self._client = None
+        if owned_client is not None:
+            factory_clients.append(owned_client)
+        for client in factory_clients:
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import contextlib
+from typing import Any, TypeVar
+
+from pulseeco.constants import DEFAULT_INTERN_TABLE_SIZE
+
+T = TypeVar("T")
+
+# the fields whose values repeat between data values and sensors
+INTERNED_KEYS = frozenset({
+    "sensorId",
+    "position",
+    "type",
+    "status",
+    "description",
+    "comments",
+})
+
+
+class InternTable:
+    """Bounded table of shared objects, used to deduplicate repeated strings.
+
+    Equal values interned through the table are replaced by one shared object.
+    When the table is full, the oldest values are forgotten first.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_INTERN_TABLE_SIZE) -> None:
+        """Initialize the intern table.
+
+        :param max_size: the maximum number of values kept, defaults to 65536
+        """
+        if max_size < 1:
+            raise ValueError("`max_size` should be at least 1")
+        self.max_size = max_size
+        self._table: dict[Any, Any] = {}
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def intern(self, value: T) -> T:
+        """Get the shared object equal to the value.
+
+        :param value: a hashable value
+        :return: the shared object, the value itself if it is new
+        """
+        shared = self._table.get(value)
+        if shared is not None:
+            self.hits += 1
+            return shared  # type: ignore[no-any-return]
+        if len(self._table) >= self.max_size:
+            # another thread can change the table at the same time
+            with contextlib.suppress(RuntimeError, KeyError, StopIteration):
+                del self._table[next(iter(self._table))]
+        return self._table.setdefault(value, value)  # type: ignore[no-any-return]
+
+    def intern_json(self, data: Any) -> Any:  # noqa: ANN401
+        """Intern the repeated string fields of data value or sensor jsons in place.
+
+        :param data: a response json, only lists of objects are interned
+        :return: the same response json
+        """
+        if not isinstance(data, list):
+            return data
+        intern = self.intern
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            for key in INTERNED_KEYS.intersection(item):
+                value = item[key]
+                if isinstance(value, str):
+                    item[key] = intern(value)
+        return data
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import json
+from importlib.util import find_spec
+from typing import Any, Callable
+
+# Decode a response body into its json
+JSONLoads = Callable[[bytes], Any]
+
+if find_spec("orjson") is not None:  # pragma: no cover
+    import orjson  # type: ignore[import-not-found, unused-ignore]
+
+    json_loads: JSONLoads = orjson.loads
+else:
+    json_loads = json.loads
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import datetime
+import heapq
+import itertools
+import operator
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from pulseeco.utils import parse_datetime
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping, Sequence
+
+T = TypeVar("T")
+
+# (UTC epoch seconds of the stamp, sensor ID, type)
+DataValueKey = tuple[float, str, str]
+
+
+def epoch_seconds(stamp: str | datetime.datetime) -> float:
+    """Get the UTC epoch seconds of a timestamp, naive timestamps are UTC.
+
+    :param stamp: an isoformat string or a datetime object
+    :return: the epoch seconds
+    """
+    stamp = parse_datetime(stamp)
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=datetime.timezone.utc)
+    return stamp.timestamp()
+
+
+def data_value_key(data_value: Mapping[str, Any]) -> DataValueKey:
+    """Get the order and identity of a data value json.
+
+    :param data_value: a data value json
+    :return: a tuple of (epoch seconds of the stamp, sensor ID, type)
+    """
+    return (
+        epoch_seconds(data_value["stamp"]),
+        data_value["sensorId"],
+        data_value["type"],
+    )
+
+
+def merge_sorted(
+    runs: Iterable[Sequence[T]], key: Callable[[T], DataValueKey]
+) -> list[T]:
+    """Merge runs into one list ordered by key, without duplicate keys.
+
+    The runs are merged with a k-way merge in O(n log k),
+    only a run that is not already ordered is sorted first.
+    Of the items with equal keys the first one is kept.
+
+    :param runs: the runs, ex. the decoded responses of the chunks
+    :param key: gets the key of an item
+    :return: the merged items
+    """
+    keyed_runs = []
+    for index, run in enumerate(runs):
+        keys = list(map(key, run))
+        keyed_run = list(zip(keys, itertools.repeat(index), itertools.count(), run))
+        if any(map(operator.gt, keys, itertools.islice(keys, 1, None))):
+            keyed_run.sort()
+        keyed_runs.append(keyed_run)
+    merged = []
+    previous_key = None
+    for item_key, _, _, item in heapq.merge(*keyed_runs):
+        if item_key != previous_key:
+            merged.append(item)
+            previous_key = item_key
+    return merged
+
+
+def merge_data_values(runs: Iterable[Sequence[Any]]) -> list[Any]:
+    """Merge runs of data value jsons by stamp, sensor ID and type.
+
+    :param runs: the runs of data value jsons
+    :return: the merged data value jsons, without duplicates
+    """
+    return merge_sorted(runs, data_value_key)
+
+
+class BoundaryDeduplicator:
+    """Drops the data values repeated at the boundary of consecutive batches.
+
+    Consecutive chunks share their boundary stamp,
+    so a batch is compared to the keys of the last stamp of the previous batch.
+    """
+
+    def __init__(self, key: Callable[[Any], DataValueKey] = data_value_key) -> None:
+        """Initialize the boundary deduplicator.
+
+        :param key: gets the key of a data value, defaults to `data_value_key`
+        """
+        self._key = key
+        self._boundary_keys: set[DataValueKey] = set()
+
+    def __call__(self, batch: list[T]) -> list[T]:
+        """Drop the data values of the batch seen at the previous boundary.
+
+        :param batch: a batch ordered by key
+        :return: the batch without the repeated data values
+        """
+        keys = list(map(self._key, batch))
+        if self._boundary_keys:
+            kept = [
+                index
+                for index, item_key in enumerate(keys)
+                if item_key not in self._boundary_keys
+            ]
+            if len(kept) < len(batch):
+                batch = [batch[index] for index in kept]
+                keys = [keys[index] for index in kept]
+        if keys:
+            last_stamp = keys[-1][0]
+            self._boundary_keys = set(
+                itertools.takewhile(
+                    lambda item_key: item_key[0] == last_stamp, reversed(keys)
+                )
+            )
+        return batch
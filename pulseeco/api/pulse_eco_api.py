@@ -1,14 +1,21 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import inspect
+import itertools
 import os
+import time
 import warnings
+from collections import deque
 from typing import TYPE_CHECKING, Any, cast
+from urllib.parse import urlsplit
 
 from pulseeco.constants import (
     AVG_DATA_MAX_SPAN,
     DATA_RAW_MAX_SPAN,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY_PER_HOST,
     PULSE_ECO_BASE_URL_FORMAT,
     PULSE_ECO_BASE_URL_FORMAT_ENV_KEY,
     PULSE_ECO_CITY_PASSWORD_ENV_KEY_FORMAT,
@@ -16,19 +23,49 @@ from pulseeco.constants import (
     PULSE_ECO_PASSWORD_ENV_KEY,
     PULSE_ECO_USERNAME_ENV_KEY,
 )
-from pulseeco.utils import convert_datetime_to_str, split_datetime_span
+from pulseeco.utils import (
+    convert_datetime_to_str,
+    parse_datetime,
+    split_datetime_span,
+)
 
 from .base import PulseEcoAPIBase
-from .http_clients import get_fallback_sync_client
+from .coalescing import SingleFlight
+from .http_clients import (
+    SyncClientPool,
+    get_status_code,
+    is_timeout_error,
+    is_transient_error,
+)
+from .json_backend import json_loads as default_json_loads
+from .merging import BoundaryDeduplicator, merge_data_values
+from .rate_limit import get_host_rate_limiter
+from .retry import DEFAULT_RETRY_POLICY
+from .scheduler import ChunkScheduler, LazyThreadPool
 
 if TYPE_CHECKING:
     import datetime
-
-    from .data_types import DataValueAvg, DataValueRaw, Overall, Sensor
+    from collections.abc import AsyncIterator, Callable, Hashable, Iterable, Iterator
+    from concurrent.futures import Future
+
+    from .cache import ResponseCacheBase
+    from .chunking import AdaptiveChunkPlanner, ChunkKey
+    from .data_types import (
+        DataRawQuery,
+        DataValueAvg,
+        DataValueRaw,
+        Overall,
+        RangeQuery,
+        Sensor,
+    )
     from .http_clients import (
         ASYNC_CLIENT,
         CLIENT,
     )
+    from .interning import InternTable
+    from .json_backend import JSONLoads
+    from .rate_limit import TokenBucket
+    from .retry import RetryPolicy
 
 
 def get_auth_from_env(city_name: str) -> tuple[str, str] | None:
@@ -72,7 +109,7 @@ def get_auth_from_env(city_name: str) -> tuple[str, str] | None:
     return None
 
 
-class PulseEcoAPI(PulseEcoAPIBase):
+class PulseEcoAPI(PulseEcoAPIBase):  # noqa: PLR0904
     """Low level unsafe pulse.eco API wrapper."""
 
     def __init__(
@@ -83,6 +120,18 @@ class PulseEcoAPI(PulseEcoAPIBase):
         session: None = None,
         client: CLIENT | None = None,
         async_client: ASYNC_CLIENT | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_concurrency_per_host: int = DEFAULT_MAX_CONCURRENCY_PER_HOST,
+        max_workers: int | None = None,
+        client_factory: Callable[[], CLIENT] | None = None,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        rate_limit: float | None = None,
+        rate_limit_burst: float | None = None,
+        chunk_planner: AdaptiveChunkPlanner | None = None,
+        coalesce_requests: bool = True,
+        cache: ResponseCacheBase | None = None,
+        json_loads: JSONLoads | None = None,
+        intern_table: InternTable | None = None,
     ) -> None:
         """Initialize the pulse.eco API wrapper.
 
@@ -93,11 +142,50 @@ class PulseEcoAPI(PulseEcoAPIBase):
         :param session: deprecated, use client and async_client instead
         :param client: a sync http client, supported types are:
             requests.Session, httpx.Client,
-            defaults to None which uses a new requests.Session for each request,
-            use a context managed session for better performance and resource management
+            defaults to None which lazily creates a keep-alive client
+            owned by this instance, sized for the concurrency of this instance,
+            close it with `close` or by using the instance as a context manager
         :param async_client: an async http client, supported types are:
             aiohttp.ClientSession, httpx.AsyncClient,
-            defaults to None which will use the sync client
+            defaults to None which will run the sync client in a thread pool
+            of `max_concurrency` threads, so the event loop is not blocked
+        :param max_concurrency: the maximum number of concurrent chunk requests
+            of this instance for the async chunked methods, defaults to 4
+        :param max_concurrency_per_host: the maximum number of concurrent
+            chunk requests to one host, shared between all instances,
+            the smallest limit of the instances is enforced, defaults to 8
+        :param max_workers: the number of threads used to request the chunks of
+            the sync chunked methods in parallel, defaults to None which
+            requests the chunks one after another
+        :param client_factory: creates a sync http client for each worker thread
+            if the client is not thread safe (requests.Session),
+            defaults to None which creates sessions with the configuration
+            of the client that share its connection pools
+        :param retry_policy: the backoff and retries of requests that fail with
+            a connection error, a timeout or a 429 or 5xx status code,
+            defaults to 3 retries with exponential backoff and jitter,
+            use `pulseeco.api.retry.NO_RETRY` to disable retries
+        :param rate_limit: the maximum number of requests per second to the host,
+            shared between all instances and both the sync and async methods,
+            the smallest rate limit of the instances is enforced,
+            defaults to None which does not limit the rate
+        :param rate_limit_burst: the number of requests allowed in a burst,
+            the smallest burst of the instances is enforced,
+            defaults to None which uses the rate limit
+        :param chunk_planner: learns the span of the chunk requests of
+            `data_raw` and `avg_data`, can be shared between instances,
+            defaults to None which always uses the maximum span of the end point
+        :param coalesce_requests: whether identical concurrent requests share
+            one in-flight request and its response body, defaults to True
+        :param cache: caches the response bodies with a TTL per end point,
+            ex. `pulseeco.api.cache.ResponseCache`, can be shared between instances,
+            defaults to None which does not cache
+        :param json_loads: decodes the response bodies,
+            defaults to None which uses `orjson.loads` if `orjson` is installed,
+            otherwise `json.loads`
+        :param intern_table: shares one object between the repeated sensor IDs,
+            positions and types of the decoded responses, can be shared between
+            instances, defaults to None which does not intern
         """
         self.city_name = city_name
 
@@ -114,12 +202,28 @@ class PulseEcoAPI(PulseEcoAPIBase):
 
         client = client if client is not None else session
 
-        self._client: CLIENT
-
-        if client is not None:
-            self._client = client
-        else:
-            self._client = get_fallback_sync_client()
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("`max_workers` should be at least 1")
+
+        self._client_pool = SyncClientPool(
+            client,
+            client_factory=client_factory,
+            pool_maxsize=max(max_concurrency, max_workers or 1),
+        )
+
+        self._thread_pool = (
+            LazyThreadPool(max_workers, thread_name_prefix=f"pulseeco-{city_name}")
+            if max_workers is not None
+            else None
+        )
+        # runs the sync requests of the async methods if there is no async client
+        self._async_fallback_thread_pool = LazyThreadPool(
+            max_concurrency, thread_name_prefix=f"pulseeco-async-{city_name}"
+        )
+        # requests the next chunks of the sync iterators in the background
+        self._prefetch_thread_pool = LazyThreadPool(
+            max_concurrency, thread_name_prefix=f"pulseeco-prefetch-{city_name}"
+        )
 
         self._async_client = async_client
 
@@ -130,6 +234,80 @@ class PulseEcoAPI(PulseEcoAPIBase):
 
         self._base_url = base_url
 
+        host = (
+            urlsplit(base_url.format(city_name=city_name, end_point="")).netloc
+            or city_name
+        )
+        self._scheduler = ChunkScheduler(
+            host=host,
+            max_concurrency=max_concurrency,
+            max_concurrency_per_host=max_concurrency_per_host,
+        )
+
+        self._retry_policy = retry_policy
+        self._chunk_planner = chunk_planner
+        self._single_flight = SingleFlight() if coalesce_requests else None
+        self._cache = cache
+        self._json_loads = json_loads if json_loads is not None else default_json_loads
+        self._intern_table = intern_table
+        self._rate_limiter: TokenBucket | None = (
+            get_host_rate_limiter(host, rate_limit, rate_limit_burst)
+            if rate_limit is not None
+            else None
+        )
+
+    def close(self) -> None:
+        """Close the http clients and the thread pool owned by this instance.
+
+        Clients passed to the constructor are not closed.
+        """
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown()
+        self._async_fallback_thread_pool.shutdown()
+        self._prefetch_thread_pool.shutdown()
+        self._client_pool.close()
+
+    @property
+    def scheduler(self) -> ChunkScheduler:
+        """The scheduler of the async chunked requests.
+
+        Use it to inspect how many chunks are in flight and queued.
+        """
+        return self._scheduler
+
+    @property
+    def coalesced_requests(self) -> int:
+        """The number of requests saved by sharing an identical in-flight request."""
+        return self._single_flight.saved if self._single_flight is not None else 0
+
+    @property
+    def cache(self) -> ResponseCacheBase | None:
+        """The response cache, use it to inspect the hit and miss statistics."""
+        return self._cache
+
+    @staticmethod
+    def _request_key(end_point: str, params: dict[str, Any]) -> Hashable:
+        """Get the key of a request, equal for requests with equal parameters."""
+        return end_point, tuple(
+            sorted((k, str(v)) for k, v in params.items() if v is not None)
+        )
+
+    def _cache_key(self, request_key: Hashable) -> Hashable:
+        """Get the key of a request in the cache, which can be shared."""
+        return self._base_url, self.city_name, request_key
+
+    @property
+    def intern_table(self) -> InternTable | None:
+        """The intern table of the decoded responses."""
+        return self._intern_table
+
+    def _decode(self, content: bytes) -> Any:  # noqa: ANN401
+        """Decode a response body, interning its repeated strings if enabled."""
+        data = self._json_loads(content)
+        if self._intern_table is not None:
+            self._intern_table.intern_json(data)
+        return data
+
     def _base_request(
         self, end_point: str, params: dict[str, Any] | None = None
     ) -> Any:  # noqa: ANN401
@@ -139,18 +317,7 @@ class PulseEcoAPI(PulseEcoAPIBase):
         :param params: get parameters, defaults to None
         :return: the response json
         """
-        if params is None:
-            params = {}
-        url = self._base_url.format(city_name=self.city_name, end_point=end_point)
-
-        # httpx does not support auth None
-        if self._auth is not None:
-            response = self._client.get(url, params=params, auth=self._auth)
-        else:
-            response = self._client.get(url, params=params)
-        response.raise_for_status()
-
-        return response.json()
+        return self._decode(self._request_bytes(end_point, params))
 
     async def _abase_request(
         self, end_point: str, params: dict[str, Any] | None = None
@@ -161,25 +328,520 @@ class PulseEcoAPI(PulseEcoAPIBase):
         :param params: get parameters, defaults to None
         :return: the response json
         """
-        if self._async_client is None:
-            return self._base_request(end_point, params)
+        return self._decode(await self._arequest_bytes(end_point, params))
+
+    def _request_bytes(
+        self, end_point: str, params: dict[str, Any] | None = None
+    ) -> bytes:
+        """Make a request to the PulseEco API and get the response body.
+
+        The response is served from the cache if one is set,
+        identical concurrent requests are coalesced into one if enabled.
+
+        :param end_point: an end point of the API
+        :param params: get parameters, defaults to None
+        :return: the response body
+        """
+        if params is None:
+            params = {}
+        request_key = self._request_key(end_point, params)
+        ttl = self._cache.policy(end_point, params) if self._cache is not None else None
+        if self._cache is not None and ttl is not None:
+            try:
+                return cast("bytes", self._cache.get(self._cache_key(request_key)))
+            except KeyError:
+                pass
+        if self._single_flight is None:
+            result = self._send_request(end_point, params)
+        else:
+            result = self._single_flight.do(
+                request_key, functools.partial(self._send_request, end_point, params)
+            )
+        if self._cache is not None and ttl is not None and ttl > 0:
+            self._cache.set(self._cache_key(request_key), result, ttl)
+        return result
+
+    async def _arequest_bytes(
+        self, end_point: str, params: dict[str, Any] | None = None
+    ) -> bytes:
+        """Make an async request to the PulseEco API and get the response body.
 
+        The response is served from the cache if one is set,
+        identical concurrent requests are coalesced into one if enabled.
+
+        :param end_point: an end point of the API
+        :param params: get parameters, defaults to None
+        :return: the response body
+        """
         if params is None:
             params = {}
+        request_key = self._request_key(end_point, params)
+        ttl = self._cache.policy(end_point, params) if self._cache is not None else None
+        if self._cache is not None and ttl is not None:
+            try:
+                return cast("bytes", self._cache.get(self._cache_key(request_key)))
+            except KeyError:
+                pass
+        if self._single_flight is None:
+            result = await self._asend_request(end_point, params)
+        else:
+            result = await self._single_flight.ado(
+                request_key, functools.partial(self._asend_request, end_point, params)
+            )
+        if self._cache is not None and ttl is not None and ttl > 0:
+            self._cache.set(self._cache_key(request_key), result, ttl)
+        return result
 
+    def _send_request(self, end_point: str, params: dict[str, Any]) -> bytes:
+        """Send a request to the PulseEco API.
+
+        Failed requests are retried according to the retry policy.
+
+        :param end_point: an end point of the API
+        :param params: get parameters
+        :return: the response body
+        """
         url = self._base_url.format(city_name=self.city_name, end_point=end_point)
 
-        # httpx does not support auth None
-        if self._auth is not None:
-            response = await self._async_client.get(url, params=params, auth=self._auth)
+        client = self._client_pool.get()
+
+        attempt = 0
+        while True:
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire()
+            try:
+                # httpx does not support auth None
+                if self._auth is not None:
+                    response = client.get(url, params=params, auth=self._auth)
+                else:
+                    response = client.get(url, params=params)
+            except Exception as e:
+                delay = self._retry_policy.get_delay(attempt)
+                if delay is None or not is_transient_error(e):
+                    raise
+            else:
+                delay = self._get_response_retry_delay(attempt, response)
+                if delay is None:
+                    response.raise_for_status()
+                    return cast("bytes", response.content)
+            time.sleep(delay)
+            attempt += 1
+
+    async def _asend_request(self, end_point: str, params: dict[str, Any]) -> bytes:
+        """Send an async request to the PulseEco API.
+
+        Failed requests are retried according to the retry policy.
+
+        :param end_point: an end point of the API
+        :param params: get parameters
+        :return: the response body
+        """
+        if self._async_client is None:
+            # do not block the event loop with the sync client
+            return await asyncio.get_running_loop().run_in_executor(
+                self._async_fallback_thread_pool.get(),
+                functools.partial(self._send_request, end_point, params),
+            )
+
+        url = self._base_url.format(city_name=self.city_name, end_point=end_point)
+
+        attempt = 0
+        while True:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.aacquire()
+            try:
+                # httpx does not support auth None
+                if self._auth is not None:
+                    response = await self._async_client.get(
+                        url, params=params, auth=self._auth
+                    )
+                else:
+                    response = await self._async_client.get(url, params=params)
+            except Exception as e:
+                delay = self._retry_policy.get_delay(attempt)
+                if delay is None or not is_transient_error(e):
+                    raise
+            else:
+                delay = self._get_response_retry_delay(attempt, response)
+                if delay is None:
+                    response.raise_for_status()
+
+                    # In case of aiohttp, the body is read with a coroutine function
+                    read = getattr(response, "read", None)
+                    if inspect.iscoroutinefunction(read):
+                        return cast("bytes", await read())
+                    return cast("bytes", response.content)
+                # In case of aiohttp, the connection has to be released
+                release = getattr(response, "release", None)
+                if release is not None and inspect.isawaitable(released := release()):
+                    await released
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _get_response_retry_delay(
+        self,
+        attempt: int,
+        response: Any,  # noqa: ANN401
+    ) -> float | None:
+        """Get the time to wait before retrying a request after its response.
+
+        :param attempt: the number of the attempt, starting from 0
+        :param response: the response of the attempt
+        :return: the number of seconds to wait, or None if it should not be retried
+        """
+        if not self._retry_policy.should_retry_status(get_status_code(response)):
+            return None
+        return self._retry_policy.get_delay(
+            attempt, retry_after=response.headers.get("Retry-After")
+        )
+
+    def _chunk_key(self, end_point: str, params: dict[str, str]) -> ChunkKey:
+        """Get the key the chunk planner learns the span of a chunk request by."""
+        return (
+            self.city_name,
+            end_point,
+            params.get("type", ""),
+            params.get("sensorId", ""),
+        )
+
+    def _chunk_params(
+        self,
+        end_point: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        max_span: datetime.timedelta,
+        type: str | None,
+        sensor_id: str | None,
+    ) -> list[dict[str, str]]:
+        """Split a datetime span into the get parameters of each chunk request.
+
+        The span of the chunks is learned by the chunk planner if one is set.
+
+        :param end_point: an end point of the API
+        :param from_: the start datetime of the span
+        :param to: the end datetime of the span
+        :param max_span: the maximum span of one request
+        :param type: the data value type
+        :param sensor_id: the unique ID of the sensor
+        :return: a list of get parameters, one for each chunk
+        """
+        params = {
+            "sensorId": sensor_id,
+            "type": type,
+        }
+        base_params = {k: v for k, v in params.items() if v is not None}
+        span = max_span
+        if self._chunk_planner is not None:
+            span = self._chunk_planner.get_span(
+                self._chunk_key(end_point, base_params), max_span
+            )
+        return [
+            {
+                **base_params,
+                "from": convert_datetime_to_str(from_temp),
+                "to": convert_datetime_to_str(to_temp),
+            }
+            for from_temp, to_temp in split_datetime_span(from_, to, span)
+        ]
+
+    def _data_raw_chunk_params(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None,
+        sensor_id: str | None,
+    ) -> list[dict[str, str]]:
+        """Get the get parameters of the chunks of a raw data query.
+
+        Warns the caller of the public method if neither sensor_id nor type is set.
+        """
+        if sensor_id is None and type is None:
+            warnings.warn(
+                "Warning! If you encounter an error, "
+                "you should probably specify either sensor_id or type.",
+                stacklevel=3,
+            )
+        return self._chunk_params(
+            "dataRaw", from_, to, DATA_RAW_MAX_SPAN, type=type, sensor_id=sensor_id
+        )
+
+    def _avg_data_chunk_params(
+        self,
+        period: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str,
+        sensor_id: str | None,
+    ) -> tuple[str, list[dict[str, str]]]:
+        """Get the end point and the get parameters of the chunks of an average query.
+
+        Warns the caller of the public method if the period is not valid.
+        """
+        if period not in {"day", "week", "month"}:
+            warnings.warn(
+                "Warning! Invalid value for period. Should be one of: day, week, month",
+                stacklevel=3,
+            )
+        end_point = f"avgData/{period}"
+        return end_point, self._chunk_params(
+            end_point, from_, to, AVG_DATA_MAX_SPAN, type=type, sensor_id=sensor_id
+        )
+
+    @staticmethod
+    def _split_chunk_params(
+        params: dict[str, str], span: datetime.timedelta
+    ) -> list[dict[str, str]]:
+        """Split the get parameters of a chunk request into smaller chunks."""
+        return [
+            {
+                **params,
+                "from": convert_datetime_to_str(from_temp),
+                "to": convert_datetime_to_str(to_temp),
+            }
+            for from_temp, to_temp in split_datetime_span(
+                params["from"], params["to"], span
+            )
+        ]
+
+    @staticmethod
+    def _chunk_span(params: dict[str, str]) -> datetime.timedelta:
+        """Get the span of a chunk request from its get parameters."""
+        return parse_datetime(params["to"]) - parse_datetime(params["from"])
+
+    @staticmethod
+    def _count_rows(content: bytes) -> int:
+        """Count the data values of a response body without decoding it."""
+        # every data value has exactly one stamp
+        return content.count(b'"stamp"')
+
+    def _fetch_chunk_bytes(self, end_point: str, params: dict[str, str]) -> list[bytes]:
+        """Request a chunk, split it into smaller chunks if it times out.
+
+        :param end_point: an end point of the API
+        :param params: the get parameters of the chunk
+        :return: the response bodies, more than one if the chunk was split
+        """
+        if self._chunk_planner is None:
+            return [self._request_bytes(end_point, params=params)]
+        chunk_key = self._chunk_key(end_point, params)
+        span = self._chunk_span(params)
+        try:
+            content = self._request_bytes(end_point, params=params)
+        except Exception as e:
+            smaller_span = (
+                self._chunk_planner.record_timeout(chunk_key, span)
+                if is_timeout_error(e)
+                else None
+            )
+            if smaller_span is None:
+                raise
+            return [
+                content
+                for smaller_params in self._split_chunk_params(params, smaller_span)
+                for content in self._fetch_chunk_bytes(end_point, smaller_params)
+            ]
+        self._chunk_planner.record_success(chunk_key, span, self._count_rows(content))
+        return [content]
+
+    async def _afetch_chunk_bytes(
+        self, end_point: str, params: dict[str, str]
+    ) -> list[bytes]:
+        """Request a chunk, split it into smaller chunks if it times out.
+
+        :param end_point: an end point of the API
+        :param params: the get parameters of the chunk
+        :return: the response bodies, more than one if the chunk was split
+        """
+        if self._chunk_planner is None:
+            return [await self._arequest_bytes(end_point, params=params)]
+        chunk_key = self._chunk_key(end_point, params)
+        span = self._chunk_span(params)
+        try:
+            content = await self._arequest_bytes(end_point, params=params)
+        except Exception as e:
+            smaller_span = (
+                self._chunk_planner.record_timeout(chunk_key, span)
+                if is_timeout_error(e)
+                else None
+            )
+            if smaller_span is None:
+                raise
+            # the smaller chunks reuse the scheduler slot of the chunk
+            return [
+                content
+                for smaller_params in self._split_chunk_params(params, smaller_span)
+                for content in await self._afetch_chunk_bytes(end_point, smaller_params)
+            ]
+        self._chunk_planner.record_success(chunk_key, span, self._count_rows(content))
+        return [content]
+
+    def _fetch_chunk(self, end_point: str, params: dict[str, str]) -> list[Any]:
+        """Request a chunk, decode it and merge the responses of its split chunks.
+
+        :param end_point: an end point of the API
+        :param params: the get parameters of the chunk
+        :return: the merged response jsons
+        """
+        return merge_data_values(
+            self._decode(content)
+            for content in self._fetch_chunk_bytes(end_point, params)
+        )
+
+    async def _afetch_chunk(self, end_point: str, params: dict[str, str]) -> list[Any]:
+        """Request a chunk, decode it and merge the responses of its split chunks.
+
+        :param end_point: an end point of the API
+        :param params: the get parameters of the chunk
+        :return: the merged response jsons
+        """
+        return merge_data_values(
+            self._decode(content)
+            for content in await self._afetch_chunk_bytes(end_point, params)
+        )
+
+    def _fetch_chunks(
+        self, end_point: str, params_list: list[dict[str, str]]
+    ) -> list[Any]:
+        """Request every chunk and merge the results.
+
+        The chunks are requested in parallel if `max_workers` is set.
+        The results are ordered by stamp, sensor ID and type, without duplicates.
+
+        :param end_point: an end point of the API
+        :param params_list: the get parameters of each chunk
+        :return: the merged response jsons
+        """
+        return merge_data_values(
+            self._decode(content)
+            for content in self._fetch_chunks_bytes(end_point, params_list)
+        )
+
+    async def _afetch_chunks(
+        self, end_point: str, params_list: list[dict[str, str]]
+    ) -> list[Any]:
+        """Request every chunk through the scheduler and merge the results.
+
+        The results are ordered by stamp, sensor ID and type, without duplicates.
+
+        :param end_point: an end point of the API
+        :param params_list: the get parameters of each chunk
+        :return: the merged response jsons
+        """
+        return merge_data_values(
+            self._decode(content)
+            for content in await self._afetch_chunks_bytes(end_point, params_list)
+        )
+
+    def _fetch_chunks_bytes(
+        self, end_point: str, params_list: list[dict[str, str]]
+    ) -> list[bytes]:
+        """Request every chunk and get the response bodies in order.
+
+        The chunks are requested in parallel if `max_workers` is set.
+
+        :param end_point: an end point of the API
+        :param params_list: the get parameters of each chunk
+        :return: the response bodies
+        """
+        if self._thread_pool is None or len(params_list) <= 1:
+            chunks = [
+                self._fetch_chunk_bytes(end_point, params) for params in params_list
+            ]
         else:
-            response = await self._async_client.get(url, params=params)
-        response.raise_for_status()
+            chunks = list(
+                self._thread_pool.get().map(
+                    functools.partial(self._fetch_chunk_bytes, end_point), params_list
+                )
+            )
+        return [content for chunk in chunks for content in chunk]
+
+    async def _afetch_chunks_bytes(
+        self, end_point: str, params_list: list[dict[str, str]]
+    ) -> list[bytes]:
+        """Request every chunk through the scheduler and get the response bodies.
+
+        :param end_point: an end point of the API
+        :param params_list: the get parameters of each chunk
+        :return: the response bodies in order
+        """
+        chunks = await self._scheduler.run([
+            functools.partial(self._afetch_chunk_bytes, end_point, params)
+            for params in params_list
+        ])
+        return [content for chunk in chunks for content in chunk]
 
-        # In case of aiohttp, the response.json() is a coroutine function
-        if inspect.iscoroutinefunction(response.json):
-            return await response.json()
-        return response.json()
+    def _iter_chunks(
+        self, end_point: str, params_list: list[dict[str, str]], prefetch: int
+    ) -> Iterator[list[Any]]:
+        """Request the chunks in order and yield each one as it arrives.
+
+        The next `prefetch` chunks are requested in the background
+        while the current chunk is consumed.
+
+        :param end_point: an end point of the API
+        :param params_list: the get parameters of each chunk
+        :param prefetch: the number of chunks requested ahead
+        :return: an iterator of the merged response jsons of each chunk,
+            without the duplicates at the boundaries of the chunks
+        """
+        deduplicate = BoundaryDeduplicator()
+        if prefetch < 1:
+            for params in params_list:
+                yield deduplicate(self._fetch_chunk(end_point, params))
+            return
+        executor = self._prefetch_thread_pool.get()
+        params_iter = iter(params_list)
+        futures: deque[Future[list[Any]]] = deque()
+        try:
+            while True:
+                futures.extend(
+                    executor.submit(self._fetch_chunk, end_point, params)
+                    for params in itertools.islice(
+                        params_iter, prefetch + 1 - len(futures)
+                    )
+                )
+                if not futures:
+                    return
+                yield deduplicate(futures.popleft().result())
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def _aiter_chunks(
+        self, end_point: str, params_list: list[dict[str, str]], prefetch: int
+    ) -> AsyncIterator[list[Any]]:
+        """Request the chunks in order through the scheduler and yield each one.
+
+        The next `prefetch` chunks are requested in the background
+        while the current chunk is consumed.
+
+        :param end_point: an end point of the API
+        :param params_list: the get parameters of each chunk
+        :param prefetch: the number of chunks requested ahead
+        :return: an async iterator of the merged response jsons of each chunk,
+            without the duplicates at the boundaries of the chunks
+        """
+        deduplicate = BoundaryDeduplicator()
+        params_iter = iter(params_list)
+        tasks: deque[asyncio.Future[list[Any]]] = deque()
+        try:
+            while True:
+                tasks.extend(
+                    asyncio.ensure_future(
+                        self._scheduler.run_one(
+                            functools.partial(self._afetch_chunk, end_point, params)
+                        )
+                    )
+                    for params in itertools.islice(
+                        params_iter, max(prefetch, 0) + 1 - len(tasks)
+                    )
+                )
+                if not tasks:
+                    return
+                yield deduplicate(await tasks.popleft())
+        finally:
+            for task in tasks:
+                task.cancel()
 
     def sensors(self) -> list[Sensor]:
         """Get all sensors for a city.
@@ -228,28 +890,8 @@ class PulseEcoAPI(PulseEcoAPIBase):
         :param sensor_id: the unique ID of the sensor, defaults to None
         :return: a list of data values
         """
-        if sensor_id is None and type is None:
-            warnings.warn(
-                "Warning! If you encounter an error, "
-                "you should probably specify either sensor_id or type.",
-                stacklevel=2,
-            )
-        data: list[DataValueRaw] = []
-        datetime_spans = split_datetime_span(from_, to, DATA_RAW_MAX_SPAN)
-        for from_temp, to_temp in datetime_spans:
-            params = {
-                "sensorId": sensor_id,
-                "type": type,
-                "from": convert_datetime_to_str(from_temp),
-                "to": convert_datetime_to_str(to_temp),
-            }
-            params = {k: v for k, v in params.items() if v is not None}
-            data_value = cast(
-                "list[DataValueRaw]",
-                self._base_request("dataRaw", params=params),
-            )
-            data += data_value
-        return data
+        params_list = self._data_raw_chunk_params(from_, to, type, sensor_id)
+        return cast("list[DataValueRaw]", self._fetch_chunks("dataRaw", params_list))
 
     async def adata_raw(
         self,
@@ -268,34 +910,217 @@ class PulseEcoAPI(PulseEcoAPIBase):
         :param sensor_id: the unique ID of the sensor, defaults to None
         :return: a list of data values
         """
-        if sensor_id is None and type is None:
-            warnings.warn(
-                "Warning! If you encounter an error, "
-                "you should probably specify either sensor_id or type.",
-                stacklevel=2,
-            )
-        coroutines: list[asyncio.Future[list[DataValueRaw]]] = []
-        datetime_spans = split_datetime_span(from_, to, DATA_RAW_MAX_SPAN)
-        for from_temp, to_temp in datetime_spans:
-            params = {
-                "sensorId": sensor_id,
-                "type": type,
-                "from": convert_datetime_to_str(from_temp),
-                "to": convert_datetime_to_str(to_temp),
-            }
-            params = {k: v for k, v in params.items() if v is not None}
-            coroutines.append(
-                cast(
-                    "asyncio.Future[list[DataValueRaw]]",
-                    self._abase_request("dataRaw", params=params),
-                )
-            )
+        params_list = self._data_raw_chunk_params(from_, to, type, sensor_id)
+        return cast(
+            "list[DataValueRaw]", await self._afetch_chunks("dataRaw", params_list)
+        )
+
+    def data_raw_bytes(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None = None,
+        sensor_id: str | None = None,
+    ) -> list[bytes]:
+        """Get raw data for a city as the undecoded response bodies.
+
+        Pass the bodies to `pydantic.TypeAdapter.validate_json`
+        to skip building the intermediate dicts.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a json list of data values for each chunk request
+        """
+        params_list = self._data_raw_chunk_params(from_, to, type, sensor_id)
+        return self._fetch_chunks_bytes("dataRaw", params_list)
+
+    async def adata_raw_bytes(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None = None,
+        sensor_id: str | None = None,
+    ) -> list[bytes]:
+        """Get raw data for a city as the undecoded response bodies.
+
+        Pass the bodies to `pydantic.TypeAdapter.validate_json`
+        to skip building the intermediate dicts.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a json list of data values for each chunk request
+        """
+        params_list = self._data_raw_chunk_params(from_, to, type, sensor_id)
+        return await self._afetch_chunks_bytes("dataRaw", params_list)
+
+    def _many_chunk_params(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        queries: Iterable[DataRawQuery],
+    ) -> list[dict[str, str]]:
+        """Get the get parameters of the chunks of every query, as one task set."""
         return [
-            data
-            for data_value in await asyncio.gather(*coroutines)
-            for data in data_value
+            params
+            for type, sensor_id in queries
+            for params in self._chunk_params(
+                "dataRaw", from_, to, DATA_RAW_MAX_SPAN, type=type, sensor_id=sensor_id
+            )
         ]
 
+    def data_raw_many(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        queries: Iterable[DataRawQuery],
+    ) -> list[DataValueRaw]:
+        """Get raw data for many queries, ex. every sensor and type of a city.
+
+        The chunks of all queries are requested as one task set,
+        in parallel if `max_workers` is set,
+        and merged by stamp, sensor ID and type.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param queries: the type and sensor ID of each query
+        :return: a list of data values
+        """
+        return cast(
+            "list[DataValueRaw]",
+            self._fetch_chunks("dataRaw", self._many_chunk_params(from_, to, queries)),
+        )
+
+    async def adata_raw_many(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        queries: Iterable[DataRawQuery],
+    ) -> list[DataValueRaw]:
+        """Get raw data for many queries, ex. every sensor and type of a city.
+
+        The chunks of all queries are requested as one task set
+        through the scheduler, and merged by stamp, sensor ID and type.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param queries: the type and sensor ID of each query
+        :return: a list of data values
+        """
+        return cast(
+            "list[DataValueRaw]",
+            await self._afetch_chunks(
+                "dataRaw", self._many_chunk_params(from_, to, queries)
+            ),
+        )
+
+    def data_raw_many_bytes(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        queries: Iterable[DataRawQuery],
+    ) -> list[bytes]:
+        """Get the undecoded response bodies of `data_raw_many`.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param queries: the type and sensor ID of each query
+        :return: the response bodies of the chunks in order
+        """
+        return self._fetch_chunks_bytes(
+            "dataRaw", self._many_chunk_params(from_, to, queries)
+        )
+
+    async def adata_raw_many_bytes(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        queries: Iterable[DataRawQuery],
+    ) -> list[bytes]:
+        """Get the undecoded response bodies of `adata_raw_many`.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param queries: the type and sensor ID of each query
+        :return: the response bodies of the chunks in order
+        """
+        return await self._afetch_chunks_bytes(
+            "dataRaw", self._many_chunk_params(from_, to, queries)
+        )
+
+    def iter_data_raw(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None = None,
+        sensor_id: str | None = None,
+        prefetch: int = 1,
+    ) -> Iterator[list[DataValueRaw]]:
+        """Get raw data for a city, one batch per chunk request.
+
+        The batches are yielded in order as each chunk arrives,
+        so the whole span is never held in memory at once.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :param prefetch: the number of chunks requested ahead in the background,
+            defaults to 1, 0 requests each chunk only when it is needed
+        :return: an iterator of lists of data values
+        """
+        params_list = self._data_raw_chunk_params(from_, to, type, sensor_id)
+        return cast(
+            "Iterator[list[DataValueRaw]]",
+            self._iter_chunks("dataRaw", params_list, prefetch),
+        )
+
+    def aiter_data_raw(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None = None,
+        sensor_id: str | None = None,
+        prefetch: int = 1,
+    ) -> AsyncIterator[list[DataValueRaw]]:
+        """Get raw data for a city, one batch per chunk request.
+
+        The batches are yielded in order as each chunk arrives,
+        so the whole span is never held in memory at once.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :param prefetch: the number of chunks requested ahead in the background,
+            defaults to 1, 0 requests each chunk only when it is needed
+        :return: an async iterator of lists of data values
+        """
+        params_list = self._data_raw_chunk_params(from_, to, type, sensor_id)
+        return cast(
+            "AsyncIterator[list[DataValueRaw]]",
+            self._aiter_chunks("dataRaw", params_list, prefetch),
+        )
+
     def avg_data(
         self,
         period: str,
@@ -315,27 +1140,10 @@ class PulseEcoAPI(PulseEcoAPIBase):
         :param sensor_id: the unique ID of the sensor, defaults to None
         :return: a list of average data values
         """
-        if period not in {"day", "week", "month"}:
-            warnings.warn(
-                "Warning! Invalid value for period. Should be one of: day, week, month",
-                stacklevel=2,
-            )
-        data: list[DataValueAvg] = []
-        datetime_spans = split_datetime_span(from_, to, AVG_DATA_MAX_SPAN)
-        for from_temp, to_temp in datetime_spans:
-            params = {
-                "sensorId": sensor_id,
-                "type": type,
-                "from": convert_datetime_to_str(from_temp),
-                "to": convert_datetime_to_str(to_temp),
-            }
-            params = {k: v for k, v in params.items() if v is not None}
-            data_value = cast(
-                "list[DataValueAvg]",
-                self._base_request(f"avgData/{period}", params=params),
-            )
-            data += data_value
-        return data
+        end_point, params_list = self._avg_data_chunk_params(
+            period, from_, to, type, sensor_id
+        )
+        return cast("list[DataValueAvg]", self._fetch_chunks(end_point, params_list))
 
     async def aavg_data(
         self,
@@ -356,31 +1164,155 @@ class PulseEcoAPI(PulseEcoAPIBase):
         :param sensor_id: the unique ID of the sensor, defaults to None
         :return: a list of average data values
         """
-        if period not in {"day", "week", "month"}:
-            warnings.warn(
-                "Warning! Invalid value for period. Should be one of: day, week, month",
-                stacklevel=2,
-            )
-        coroutines: list[asyncio.Future[list[DataValueAvg]]] = []
-        datetime_spans = split_datetime_span(from_, to, AVG_DATA_MAX_SPAN)
-        for from_temp, to_temp in datetime_spans:
-            params = {
-                "sensorId": sensor_id,
-                "type": type,
-                "from": convert_datetime_to_str(from_temp),
-                "to": convert_datetime_to_str(to_temp),
-            }
-            params = {k: v for k, v in params.items() if v is not None}
-            coroutines.append(
-                cast(
-                    "asyncio.Future[list[DataValueAvg]]",
-                    self._abase_request(f"avgData/{period}", params=params),
-                )
+        end_point, params_list = self._avg_data_chunk_params(
+            period, from_, to, type, sensor_id
+        )
+        return cast(
+            "list[DataValueAvg]",
+            await self._afetch_chunks(end_point, params_list),
+        )
+
+    def avg_data_bytes(
+        self,
+        period: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str,
+        sensor_id: str | None = None,
+    ) -> list[bytes]:
+        """Get average data for a city as the undecoded response bodies.
+
+        :param period: the period of the average data (day, week, month)
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a json list of average data values for each chunk request
+        """
+        end_point, params_list = self._avg_data_chunk_params(
+            period, from_, to, type, sensor_id
+        )
+        return self._fetch_chunks_bytes(end_point, params_list)
+
+    async def aavg_data_bytes(
+        self,
+        period: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str,
+        sensor_id: str | None = None,
+    ) -> list[bytes]:
+        """Get average data for a city as the undecoded response bodies.
+
+        :param period: the period of the average data (day, week, month)
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a json list of average data values for each chunk request
+        """
+        end_point, params_list = self._avg_data_chunk_params(
+            period, from_, to, type, sensor_id
+        )
+        return await self._afetch_chunks_bytes(end_point, params_list)
+
+    def _range_query_params(self, query: RangeQuery) -> list[dict[str, str]]:
+        """Split a range query into the get parameters of its chunk requests."""
+        return self._chunk_params(
+            query.end_point,
+            query.from_,
+            query.to,
+            DATA_RAW_MAX_SPAN if query.end_point == "dataRaw" else AVG_DATA_MAX_SPAN,
+            type=query.type,
+            sensor_id=query.sensor_id,
+        )
+
+    @staticmethod
+    def _group_chunks(
+        chunks: list[list[bytes]], params_lists: list[list[dict[str, str]]]
+    ) -> list[list[bytes]]:
+        """Group the response bodies of a task set by the query of each chunk."""
+        chunks_iter = iter(chunks)
+        return [
+            [
+                content
+                for chunk in itertools.islice(chunks_iter, len(params_list))
+                for content in chunk
+            ]
+            for params_list in params_lists
+        ]
+
+    def query_many_bytes(self, queries: Iterable[RangeQuery]) -> list[list[bytes]]:
+        """Get the undecoded response bodies of many range queries.
+
+        The chunks of all queries are requested as one task set,
+        in parallel if `max_workers` is set.
+
+        :param queries: the raw or average data queries
+        :return: the response bodies of the chunks of each query
+        """
+        queries = list(queries)
+        params_lists = [self._range_query_params(query) for query in queries]
+        end_points = [
+            query.end_point
+            for query, params_list in zip(queries, params_lists)
+            for _ in params_list
+        ]
+        params = [params for params_list in params_lists for params in params_list]
+        if self._thread_pool is None or len(params) <= 1:
+            chunks = list(map(self._fetch_chunk_bytes, end_points, params))
+        else:
+            chunks = list(
+                self._thread_pool.get().map(self._fetch_chunk_bytes, end_points, params)
             )
+        return self._group_chunks(chunks, params_lists)
+
+    async def aquery_many_bytes(
+        self, queries: Iterable[RangeQuery]
+    ) -> list[list[bytes]]:
+        """Get the undecoded response bodies of many range queries.
+
+        The chunks of all queries are requested as one task set
+        through the scheduler.
+
+        :param queries: the raw or average data queries
+        :return: the response bodies of the chunks of each query
+        """
+        queries = list(queries)
+        params_lists = [self._range_query_params(query) for query in queries]
+        chunks = await self._scheduler.run([
+            functools.partial(self._afetch_chunk_bytes, query.end_point, params)
+            for query, params_list in zip(queries, params_lists)
+            for params in params_list
+        ])
+        return self._group_chunks(chunks, params_lists)
+
+    def query_many(self, queries: Iterable[RangeQuery]) -> list[list[Any]]:
+        """Get the data of many range queries as one task set.
+
+        :param queries: the raw or average data queries
+        :return: the data values of each query,
+            merged by stamp, sensor ID and type
+        """
         return [
-            data
-            for data_value in await asyncio.gather(*coroutines)
-            for data in data_value
+            merge_data_values(map(self._decode, contents))
+            for contents in self.query_many_bytes(queries)
+        ]
+
+    async def aquery_many(self, queries: Iterable[RangeQuery]) -> list[list[Any]]:
+        """Get the data of many range queries as one task set.
+
+        :param queries: the raw or average data queries
+        :return: the data values of each query,
+            merged by stamp, sensor ID and type
+        """
+        return [
+            merge_data_values(map(self._decode, contents))
+            for contents in await self.aquery_many_bytes(queries)
         ]
 
     def data24h(self) -> list[DataValueRaw]:
@@ -419,6 +1351,36 @@ class PulseEcoAPI(PulseEcoAPIBase):
         """
         return cast("list[DataValueRaw]", await self._abase_request("current"))
 
+    def data24h_bytes(self) -> bytes:
+        """Get 24h data for a city as the undecoded response body.
+
+        :return: a json list of data values for the past 24 hours
+        """
+        return self._request_bytes("data24h")
+
+    async def adata24h_bytes(self) -> bytes:
+        """Get 24h data for a city as the undecoded response body.
+
+        :return: a json list of data values for the past 24 hours
+        """
+        return await self._arequest_bytes("data24h")
+
+    def current_bytes(self) -> bytes:
+        """Get the last received valid data for each sensor in a city
+        as the undecoded response body.
+
+        :return: a json list of current data values
+        """
+        return self._request_bytes("current")
+
+    async def acurrent_bytes(self) -> bytes:
+        """Get the last received valid data for each sensor in a city
+        as the undecoded response body.
+
+        :return: a json list of current data values
+        """
+        return await self._arequest_bytes("current")
+
     def overall(
         self,
     ) -> Overall:
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread safe token bucket rate limiter, usable from sync and async code.
+
+    A caller reserves a token right away and then waits until the token
+    is due, so waiting callers are served in order.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """Initialize the token bucket.
+
+        :param rate: the number of tokens added per second
+        :param capacity: the maximum number of tokens, which is the allowed burst,
+            defaults to None which uses the rate (at least 1)
+        """
+        if rate <= 0:
+            raise ValueError("`rate` should be positive")
+        if capacity is None:
+            capacity = max(1.0, rate)
+        if capacity < 1:
+            raise ValueError("`capacity` should be at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, possibly in advance.
+
+        :return: the number of seconds to wait until the token is due
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def lower(self, rate: float, capacity: float | None = None) -> None:
+        """Lower the rate and the capacity, higher values are ignored.
+
+        :param rate: the number of tokens added per second
+        :param capacity: the maximum number of tokens, defaults to None
+            which uses the rate (at least 1)
+        """
+        if capacity is None:
+            capacity = max(1.0, rate)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self.rate = min(self.rate, rate)
+            self.capacity = min(self.capacity, capacity)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def acquire(self) -> None:
+        """Take a token, block until it is available."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        """Take a token, wait until it is available."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_host_rate_limiters: dict[str, TokenBucket] = {}
+_host_rate_limiters_lock = threading.Lock()
+
+
+def get_host_rate_limiter(
+    host: str, rate: float, capacity: float | None = None
+) -> TokenBucket:
+    """Get the rate limiter shared by all API instances requesting the same host.
+
+    The smallest rate and capacity of the instances of a host are enforced.
+
+    :param host: the host, ex. 'skopje.pulse.eco'
+    :param rate: the number of requests per second
+    :param capacity: the allowed burst of requests, defaults to None
+        which uses the rate (at least 1)
+    :return: the shared rate limiter of the host
+    """
+    with _host_rate_limiters_lock:
+        rate_limiter = _host_rate_limiters.get(host)
+        if rate_limiter is None:
+            rate_limiter = _host_rate_limiters[host] = TokenBucket(rate, capacity)
+            return rate_limiter
+    rate_limiter.lower(rate, capacity)
+    return rate_limiter
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import datetime
+import random
+from email.utils import parsedate_to_datetime
+
+from pulseeco.constants import (
+    DEFAULT_BACKOFF_FACTOR,
+    DEFAULT_MAX_BACKOFF,
+    DEFAULT_MAX_RETRIES,
+    RETRY_STATUS_CODES,
+)
+
+
+def parse_retry_after(retry_after: str | None) -> float | None:
+    """Parse the value of a `Retry-After` header.
+
+    :param retry_after: delay seconds or an HTTP date, or None
+    :return: the number of seconds to wait, or None if it can not be parsed
+    """
+    if retry_after is None:
+        return None
+    retry_after = retry_after.strip()
+    if retry_after.isdigit():
+        return float(retry_after)
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for failed requests."""
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        retry_status_codes: frozenset[int] = RETRY_STATUS_CODES,
+        jitter: bool = True,
+    ) -> None:
+        """Initialize the retry policy.
+
+        :param max_retries: the maximum number of retries of one request,
+            defaults to 3
+        :param backoff_factor: the backoff of the first retry in seconds,
+            doubled for each following retry, defaults to 0.5
+        :param max_backoff: the maximum backoff in seconds, defaults to 30
+        :param retry_status_codes: the response status codes that are retried,
+            defaults to 429, 500, 502, 503 and 504
+        :param jitter: whether to wait a random time between 0 and the backoff,
+            defaults to True
+        """
+        if max_retries < 0:
+            raise ValueError("`max_retries` should not be negative")
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_status_codes = retry_status_codes
+        self.jitter = jitter
+
+    def should_retry_status(self, status_code: int) -> bool:
+        """Check if a response with the status code should be retried.
+
+        :param status_code: the response status code
+        :return: whether the status code is retryable
+        """
+        return status_code in self.retry_status_codes
+
+    def get_delay(self, attempt: int, retry_after: str | None = None) -> float | None:
+        """Get the time to wait before the next retry.
+
+        A `Retry-After` header is honoured if it asks to wait longer
+        than the backoff, up to the maximum backoff.
+
+        :param attempt: the number of the failed attempt, starting from 0
+        :param retry_after: the `Retry-After` header of the response, defaults to None
+        :return: the number of seconds to wait, or None if there are no retries left
+        """
+        if attempt >= self.max_retries:
+            return None
+        backoff = min(self.max_backoff, self.backoff_factor * 2.0**attempt)
+        if self.jitter:
+            backoff = random.uniform(0, backoff)  # noqa: S311
+        retry_after_seconds = parse_retry_after(retry_after)
+        if retry_after_seconds is not None:
+            return max(backoff, min(retry_after_seconds, self.max_backoff))
+        return backoff
+
+
+NO_RETRY = RetryPolicy(max_retries=0)
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextlib
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, TypeVar
+
+from pulseeco.constants import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY_PER_HOST,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+    from types import TracebackType
+
+T = TypeVar("T")
+
+
+class _LoopSlots:
+    """The slots of one event loop, bounded by the current limit of its owner.
+
+    Unlike `asyncio.Semaphore`, the limit is read on every acquire,
+    so a lowered limit holds for the next requests.
+    """
+
+    def __init__(self, owner: LoopSemaphores) -> None:
+        self._owner = owner
+        self._in_use = 0
+        self._waiters: collections.deque[asyncio.Future[None]] = collections.deque()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def __aenter__(self) -> None:
+        while self._in_use >= self._owner.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # hand a wake up of a cancelled waiter to the next one
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+            finally:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+        self._in_use += 1
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._in_use -= 1
+        self._wake()
+
+
+class LoopSemaphores:
+    """Slots sharing the same limit, one set per running event loop.
+
+    Futures are bound to an event loop,
+    so the slots are created lazily inside of the loop that uses them.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._slots: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _LoopSlots
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> _LoopSlots:
+        """Get the slots of the running event loop, use it with `async with`."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = self._slots[loop] = _LoopSlots(self)
+        return slots
+
+    def lower(self, limit: int) -> None:
+        """Lower the limit, a higher limit is ignored.
+
+        The requests in flight are not interrupted,
+        the next requests wait until they are under the lower limit.
+
+        :param limit: the new limit
+        """
+        with self._lock:
+            self.limit = min(self.limit, limit)
+
+
+_host_semaphores: dict[str, LoopSemaphores] = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def get_host_semaphores(host: str, limit: int) -> LoopSemaphores:
+    """Get the semaphores shared by all schedulers requesting the same host.
+
+    The smallest limit of the schedulers of a host is enforced.
+
+    :param host: the host, ex. 'skopje.pulse.eco'
+    :param limit: the maximum number of concurrent requests to the host
+    :return: the shared semaphores for the host
+    """
+    with _host_semaphores_lock:
+        semaphores = _host_semaphores.get(host)
+        if semaphores is None:
+            semaphores = _host_semaphores[host] = LoopSemaphores(limit)
+    semaphores.lower(limit)
+    return semaphores
+
+
+class ChunkScheduler:
+    """Run chunk requests with bounded concurrency.
+
+    A request has to acquire both a slot of the scheduler itself
+    (one scheduler per `PulseEcoAPI` instance)
+    and a slot of its host, which is shared between all schedulers.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_concurrency_per_host: int = DEFAULT_MAX_CONCURRENCY_PER_HOST,
+    ) -> None:
+        """Initialize the chunk scheduler.
+
+        :param host: the host that the requests are sent to
+        :param max_concurrency: the maximum number of concurrent requests
+            of this scheduler
+        :param max_concurrency_per_host: the maximum number of concurrent requests
+            to the host, shared between all schedulers,
+            the smallest limit of the schedulers is enforced
+        """
+        if max_concurrency < 1:
+            raise ValueError("`max_concurrency` should be at least 1")
+        if max_concurrency_per_host < 1:
+            raise ValueError("`max_concurrency_per_host` should be at least 1")
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self._semaphores = LoopSemaphores(max_concurrency)
+        self._host_semaphores = get_host_semaphores(host, max_concurrency_per_host)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queued = 0
+
+    @property
+    def in_flight(self) -> int:
+        """The number of chunks that are currently being requested."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """The number of chunks that are waiting for a free slot."""
+        return self._queued
+
+    async def run_one(self, factory: Callable[[], Awaitable[T]]) -> T:
+        """Run one chunk request once a slot is free and return its result.
+
+        :param factory: a function that creates the chunk request coroutine
+        :return: the result of the chunk request
+        """
+        with self._lock:
+            self._queued += 1
+        started = False
+        try:
+            async with self._semaphores.get(), self._host_semaphores.get():
+                with self._lock:
+                    self._queued -= 1
+                    self._in_flight += 1
+                started = True
+                return await factory()
+        finally:
+            with self._lock:
+                if started:
+                    self._in_flight -= 1
+                else:
+                    self._queued -= 1
+
+    async def run(self, factories: Sequence[Callable[[], Awaitable[T]]]) -> list[T]:
+        """Run the chunk requests and return their results.
+
+        :param factories: functions that create the chunk request coroutines
+        :return: the results in the same order as the factories
+        """
+        return list(
+            await asyncio.gather(*(self.run_one(factory) for factory in factories))
+        )
+
+
+class LazyThreadPool:
+    """A thread pool that starts its threads on first use."""
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "") -> None:
+        """Initialize the lazy thread pool.
+
+        :param max_workers: the maximum number of threads
+        :param thread_name_prefix: the name prefix of the threads, defaults to ''
+        """
+        self.max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ThreadPoolExecutor:
+        """Get the thread pool, create it if needed.
+
+        :return: the thread pool executor
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self._thread_name_prefix,
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        """Shut down the thread pool, it is created again if used afterwards."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
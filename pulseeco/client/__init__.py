@@ -1,15 +1,42 @@
+from .aqi import AirQualityIndex, AqiStandard, RollingMean
+from .batch import QuerySpec
 from .client import PulseEcoClient
+from .columnar import DataValueBatch, DataValueRow
 from .enums import AveragePeriod, DataValueType, SensorStatus, SensorType
+from .mirror import LocalMirror
 from .models import DataValue, Overall, OverallValues, Sensor
+from .multi_city import MultiCityPulseEcoClient, MultiCityResult
+from .records import DataValueRecord
+from .registry import SensorRegistry
+from .spatial import IndexedSensor, NearbySensor, SensorIndex
+from .trusted import TrustedPulseEcoClient
+from .watch import Measurement, MeasurementWatcher
 
 __all__ = [
+    "AirQualityIndex",
+    "AqiStandard",
     "AveragePeriod",
     "DataValue",
+    "DataValueBatch",
+    "DataValueRecord",
+    "DataValueRow",
     "DataValueType",
+    "IndexedSensor",
+    "LocalMirror",
+    "Measurement",
+    "MeasurementWatcher",
+    "MultiCityPulseEcoClient",
+    "MultiCityResult",
+    "NearbySensor",
     "Overall",
     "OverallValues",
     "PulseEcoClient",
+    "QuerySpec",
+    "RollingMean",
     "Sensor",
+    "SensorIndex",
+    "SensorRegistry",
     "SensorStatus",
     "SensorType",
+    "TrustedPulseEcoClient",
 ]
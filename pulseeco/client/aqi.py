@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import bisect
+import collections
+import math
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, NamedTuple
+
+from .columnar import DataValueBatch
+from .enums import DataValueType, StrEnum
+from .models import OverallValues
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Iterable, Mapping
+
+    from .models import DataValue
+
+_HAS_NUMPY = find_spec("numpy") is not None
+# below this number of rows of a type the sub-indices are computed without numpy
+_NUMPY_MIN_ROWS = 256
+
+# the molar volume in liters at 25 °C and 1 atm, to convert ug/m3 into ppb
+_MOLAR_VOLUME = 24.45
+
+
+class AqiStandard(StrEnum):
+    # the Common Air Quality Index of the EU, hourly grid
+    CAQI = "caqi"
+    # the Air Quality Index of the US EPA, with the 2024 PM2.5 breakpoints
+    US_EPA = "us_epa"
+
+
+class _Scale(NamedTuple):
+    """The breakpoints of a pollutant, each segment is (C low, C high, I low, I high)."""
+
+    segments: tuple[tuple[float, float, float, float], ...]
+    # multiplies the measured value into the unit of the breakpoints
+    factor: float = 1.0
+    # the decimals the concentration is truncated to, None to not truncate
+    digits: int | None = None
+    # whether the index grows past the last segment, otherwise it is capped
+    extrapolate: bool = False
+
+
+def _caqi_scale(grid: tuple[float, ...], factor: float = 1.0) -> _Scale:
+    return _Scale(
+        tuple(
+            (low, high, 25.0 * index, 25.0 * (index + 1))
+            for index, (low, high) in enumerate(zip(grid, grid[1:]))
+        ),
+        factor=factor,
+        extrapolate=True,
+    )
+
+
+def _epa_scale(
+    concentrations: tuple[tuple[float, float], ...],
+    factor: float = 1.0,
+    digits: int = 0,
+) -> _Scale:
+    indices = ((0, 50), (51, 100), (101, 150), (151, 200), (201, 300), (301, 500))
+    return _Scale(
+        tuple(
+            (low, high, index_low, index_high)
+            for (low, high), (index_low, index_high) in zip(concentrations, indices)
+        ),
+        factor=factor,
+        digits=digits,
+    )
+
+
+def _ppb(molar_mass: float) -> float:
+    """Get the factor that converts ug/m3 of a gas into ppb."""
+    return _MOLAR_VOLUME / molar_mass
+
+
+def _micrograms(molar_mass: float) -> float:
+    """Get the factor that converts ppb of a gas into ug/m3."""
+    return molar_mass / _MOLAR_VOLUME
+
+
+_NO2_MOLAR_MASS = 46.01
+_O3_MOLAR_MASS = 48.00
+_SO2_MOLAR_MASS = 64.07
+
+# the particles in ug/m3, the gases in ug/m3 unless the type is in ppb
+_SCALES: dict[AqiStandard, dict[DataValueType, _Scale]] = {
+    AqiStandard.CAQI: {
+        DataValueType.PM10: _caqi_scale((0, 25, 50, 90, 180)),
+        DataValueType.PM25: _caqi_scale((0, 15, 30, 55, 110)),
+        DataValueType.NO2: _caqi_scale((0, 50, 100, 200, 400)),
+        DataValueType.NO2_PPB: _caqi_scale(
+            (0, 50, 100, 200, 400), _micrograms(_NO2_MOLAR_MASS)
+        ),
+        DataValueType.O3: _caqi_scale((0, 60, 120, 180, 240)),
+        DataValueType.SO2: _caqi_scale((0, 50, 100, 350, 500)),
+    },
+    AqiStandard.US_EPA: {
+        # 24 hour means
+        DataValueType.PM25: _epa_scale(
+            (
+                (0.0, 9.0),
+                (9.1, 35.4),
+                (35.5, 55.4),
+                (55.5, 125.4),
+                (125.5, 225.4),
+                (225.5, 325.4),
+            ),
+            digits=1,
+        ),
+        DataValueType.PM10: _epa_scale((
+            (0, 54),
+            (55, 154),
+            (155, 254),
+            (255, 354),
+            (355, 424),
+            (425, 604),
+        )),
+        # 8 hour means in ppb, the 1 hour means of higher levels are not covered
+        DataValueType.O3: _epa_scale(
+            ((0, 54), (55, 70), (71, 85), (86, 105), (106, 200)),
+            _ppb(_O3_MOLAR_MASS),
+        ),
+        # 1 hour means in ppb
+        DataValueType.NO2: _epa_scale(
+            ((0, 53), (54, 100), (101, 360), (361, 649), (650, 1249), (1250, 2049)),
+            _ppb(_NO2_MOLAR_MASS),
+        ),
+        DataValueType.NO2_PPB: _epa_scale((
+            (0, 53),
+            (54, 100),
+            (101, 360),
+            (361, 649),
+            (650, 1249),
+            (1250, 2049),
+        )),
+        DataValueType.SO2: _epa_scale(
+            ((0, 35), (36, 75), (76, 185), (186, 304), (305, 604), (605, 1004)),
+            _ppb(_SO2_MOLAR_MASS),
+        ),
+    },
+}
+
+
+class AirQualityIndex(NamedTuple):
+    """The index of a set of concentrations and the type that determined it."""
+
+    value: int
+    type: DataValueType
+
+
+def _round_half_up(value: float) -> int:
+    return math.floor(value + 0.5)
+
+
+def _truncate(concentration: float, digits: int) -> float:
+    scale = 10.0**digits
+    # the epsilon keeps values like 35.4 from truncating to 35.3
+    return math.floor(concentration * scale + 1e-9) / scale
+
+
+def _index_of(scale: _Scale, concentration: float) -> int:
+    concentration = max(concentration * scale.factor, 0.0)
+    if scale.digits is not None:
+        concentration = _truncate(concentration, scale.digits)
+    segments = scale.segments
+    segment = bisect.bisect_right([low for low, *_ in segments], concentration) - 1
+    low, high, index_low, index_high = segments[max(segment, 0)]
+    if concentration > high and not scale.extrapolate:
+        return _round_half_up(index_high)
+    return _round_half_up(
+        index_low + (index_high - index_low) * (concentration - low) / (high - low)
+    )
+
+
+def sub_index(
+    concentration: float | None,
+    type: DataValueType,
+    standard: AqiStandard = AqiStandard.CAQI,
+) -> int | None:
+    """Get the index of the concentration of one pollutant.
+
+    The concentration should be the mean over the period of the standard:
+    one hour for CAQI, for US EPA 24 hours for PM,
+    8 hours for O3 and one hour for NO2 and SO2, see `RollingMean`.
+
+    :param concentration: the concentration in the unit of the type
+    :param type: the data value type
+    :param standard: the index standard, defaults to CAQI
+    :return: the index, None if the concentration is None
+        or the type is not part of the standard
+    """
+    scale = _SCALES[standard].get(type)
+    if scale is None or concentration is None:
+        return None
+    return _index_of(scale, concentration)
+
+
+def _indices_numpy(scale: _Scale, concentrations: list[float]) -> list[int]:
+    import numpy as np  # noqa: PLC0415
+
+    values = np.maximum(np.asarray(concentrations, dtype=np.float64) * scale.factor, 0)
+    if scale.digits is not None:
+        power = 10.0**scale.digits
+        values = np.floor(values * power + 1e-9) / power
+    lows, highs, index_lows, index_highs = (
+        np.asarray(column, dtype=np.float64) for column in zip(*scale.segments)
+    )
+    segment = np.maximum(np.searchsorted(lows, values, side="right") - 1, 0)
+    low, high = lows[segment], highs[segment]
+    index_low, index_high = index_lows[segment], index_highs[segment]
+    indices = index_low + (index_high - index_low) * (values - low) / (high - low)
+    if not scale.extrapolate:
+        indices = np.where(values > highs[-1], index_highs[-1], indices)
+    return np.floor(indices + 0.5).astype(np.int64).tolist()  # type: ignore[no-any-return]
+
+
+def sub_indices(
+    data: DataValueBatch | Iterable[DataValue],
+    standard: AqiStandard = AqiStandard.CAQI,
+) -> list[int | None]:
+    """Get the index of every data value, see `sub_index`.
+
+    The rows of a type are computed together, with numpy if it is installed.
+
+    :param data: data values or a data value batch, ex. the means of `RollingMean`
+    :param standard: the index standard, defaults to CAQI
+    :return: the index of each data value, None if its type is not part of the standard
+    """
+    if isinstance(data, DataValueBatch):
+        type_codes = data.types.codes
+        types = data.types.dictionary
+        values: list[float] = list(data.values)
+        rows_of_type: dict[DataValueType, list[int]] = collections.defaultdict(list)
+        for row, code in enumerate(type_codes):
+            rows_of_type[types[code]].append(row)
+    else:
+        values = []
+        rows_of_type = collections.defaultdict(list)
+        for row, data_value in enumerate(data):
+            values.append(data_value.value)
+            rows_of_type[data_value.type].append(row)
+    indices: list[int | None] = [None] * len(values)
+    scales = _SCALES[standard]
+    for type_, rows in rows_of_type.items():
+        scale = scales.get(type_)
+        if scale is None:
+            continue
+        concentrations = [values[row] for row in rows]
+        if _HAS_NUMPY and len(rows) >= _NUMPY_MIN_ROWS:
+            type_indices = _indices_numpy(scale, concentrations)
+        else:
+            type_indices = [_index_of(scale, value) for value in concentrations]
+        for row, index in zip(rows, type_indices):
+            indices[row] = index
+    return indices
+
+
+def overall_index(
+    concentrations: OverallValues | Mapping[str, float | None],
+    standard: AqiStandard = AqiStandard.CAQI,
+) -> AirQualityIndex | None:
+    """Get the index of a set of concentrations, the highest index of the pollutants.
+
+    :param concentrations: the overall values of a city, ex. the values of `overall`,
+        or the concentrations keyed by data value type
+    :param standard: the index standard, defaults to CAQI
+    :return: the index and the type that determined it,
+        None if no pollutant of the standard has a concentration
+    """
+    if isinstance(concentrations, OverallValues):
+        concentrations = concentrations.model_dump(by_alias=True)
+    worst: AirQualityIndex | None = None
+    for type_, scale in _SCALES[standard].items():
+        concentration = concentrations.get(type_.value)
+        if concentration is None:
+            continue
+        index = _index_of(scale, concentration)
+        if worst is None or index > worst.value:
+            worst = AirQualityIndex(index, type_)
+    return worst
+
+
+class RollingMean:
+    """Rolling means of streaming data values per sensor and type.
+
+    Each data value updates the mean of its sensor and type over the window
+    ending at its stamp in O(1) amortized time,
+    ex. the 24 hour means of PM for the US EPA index.
+    The data values of a sensor and type should arrive ordered by stamp,
+    a data value not newer than the newest one of its sensor and type is ignored,
+    so data values seen twice are not counted twice.
+    """
+
+    def __init__(self, window: datetime.timedelta) -> None:
+        """Initialize the rolling means.
+
+        :param window: the span of the means
+        """
+        if window.total_seconds() <= 0:
+            raise ValueError("`window` should be positive")
+        self._window = window.total_seconds()
+        self._series: dict[
+            tuple[str, DataValueType], collections.deque[tuple[float, int]]
+        ] = {}
+        self._sums: dict[tuple[str, DataValueType], int] = {}
+
+    def add(self, data_value: DataValue) -> float:
+        """Add a data value to the mean of its sensor and type.
+
+        :param data_value: the data value
+        :return: the mean of its sensor and type over the window
+        """
+        key = (data_value.sensor_id, data_value.type)
+        stamp = data_value.stamp.timestamp()
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = collections.deque()
+            self._sums[key] = 0
+        elif stamp <= series[-1][0]:
+            return self._sums[key] / len(series)
+        series.append((stamp, data_value.value))
+        self._sums[key] += data_value.value
+        while series[0][0] <= stamp - self._window:
+            self._sums[key] -= series.popleft()[1]
+        return self._sums[key] / len(series)
+
+    def update(
+        self, data_values: Iterable[DataValue]
+    ) -> dict[tuple[str, DataValueType], float]:
+        """Add many data values, ex. the new data values of a poll.
+
+        :param data_values: the data values
+        :return: the means of the sensors and types that were updated
+        """
+        return {
+            (data_value.sensor_id, data_value.type): self.add(data_value)
+            for data_value in data_values
+        }
+
+    def mean(self, sensor_id: str, type: DataValueType) -> float | None:
+        """Get the mean of a sensor and type over the window of its newest value.
+
+        :param sensor_id: the unique ID of the sensor
+        :param type: the data value type
+        :return: the mean, None if no data value was added
+        """
+        series = self._series.get((sensor_id, type))
+        if not series:
+            return None
+        return self._sums[sensor_id, type] / len(series)
+
+    def means(self) -> dict[tuple[str, DataValueType], float]:
+        """Get the means of every sensor and type.
+
+        :return: the means keyed by (sensor ID, type)
+        """
+        return {
+            key: self._sums[key] / len(series)
+            for key, series in self._series.items()
+            if series
+        }
+
+    def index(
+        self,
+        sensor_id: str,
+        type: DataValueType,
+        standard: AqiStandard = AqiStandard.CAQI,
+    ) -> int | None:
+        """Get the index of the mean of a sensor and type, see `sub_index`.
+
+        :param sensor_id: the unique ID of the sensor
+        :param type: the data value type
+        :param standard: the index standard, defaults to CAQI
+        :return: the index, None if no data value was added
+            or the type is not part of the standard
+        """
+        return sub_index(self.mean(sensor_id, type), type, standard)
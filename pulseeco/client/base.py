@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+if TYPE_CHECKING:
+    import datetime
+    from types import TracebackType
+
+    from pulseeco.api.base import PulseEcoAPIBase
+    from pulseeco.api.data_types import DataRawQuery
+    from pulseeco.api.interning import InternTable
+
+    from .enums import AveragePeriod, DataValueType
+    from .mirror import LocalMirror
+
+_T = TypeVar("_T", bound="PulseEcoClientBase")
+
+
+class PulseEcoClientBase:
+    """High level pulse.eco client base class.
+
+    Holds the API wrapper and the local mirror,
+    and gets the data value jsons for the clients built on top of it.
+    """
+
+    def __init__(
+        self,
+        city_name: str,
+        pulse_eco_api: PulseEcoAPIBase,
+        mirror: LocalMirror | None = None,
+        intern_table: InternTable | None = None,
+    ) -> None:
+        """Initialize the pulse.eco client base.
+
+        :param city_name: the city name
+        :param pulse_eco_api: a pulse.eco API wrapper
+        :param mirror: a persistent local mirror, defaults to None
+        :param intern_table: interns the data value jsons read from the mirror,
+            defaults to None
+        """
+        self._city_name = city_name
+        self._pulse_eco_api = pulse_eco_api
+        self._mirror = mirror
+        self._intern_table = intern_table
+
+    def close(self) -> None:
+        """Close the http clients and the thread pool owned by this client.
+
+        Clients passed to the constructor are not closed.
+        """
+        self._pulse_eco_api.close()
+
+    async def aclose(self) -> None:
+        """Close the http clients and the thread pool owned by this client.
+
+        Clients passed to the constructor are not closed.
+        """
+        await self._pulse_eco_api.aclose()
+
+    def __enter__(self: _T) -> _T:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    async def __aenter__(self: _T) -> _T:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    def _intern(self, data: list[Any]) -> list[Any]:
+        """Intern the repeated strings of data value jsons if enabled."""
+        if self._intern_table is not None:
+            self._intern_table.intern_json(data)
+        return data
+
+    def _data_raw_json(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None,
+        sensor_id: str | None,
+        queries: list[DataRawQuery] | None = None,
+    ) -> list[Any]:
+        """Get the raw data jsons from the local mirror if set, else from the API.
+
+        The queries replace the type and sensor ID when requesting from the API.
+        """
+
+        def fetch(
+            from_: str | datetime.datetime, to: str | datetime.datetime
+        ) -> list[Any]:
+            if queries is not None:
+                return cast(
+                    "list[Any]",
+                    self._pulse_eco_api.data_raw_many(
+                        from_=from_, to=to, queries=queries
+                    ),
+                )
+            return cast(
+                "list[Any]",
+                self._pulse_eco_api.data_raw(
+                    from_=from_, to=to, type=type, sensor_id=sensor_id
+                ),
+            )
+
+        if self._mirror is None:
+            return fetch(from_, to)
+        return self._intern(
+            self._mirror.get(
+                self._city_name,
+                "dataRaw",
+                from_,
+                to,
+                fetch,
+                type=type,
+                sensor_id=sensor_id,
+            )
+        )
+
+    async def _adata_raw_json(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None,
+        sensor_id: str | None,
+        queries: list[DataRawQuery] | None = None,
+    ) -> list[Any]:
+        """Get the raw data jsons from the local mirror if set, else from the API.
+
+        The queries replace the type and sensor ID when requesting from the API.
+        """
+
+        async def fetch(
+            from_: str | datetime.datetime, to: str | datetime.datetime
+        ) -> list[Any]:
+            if queries is not None:
+                return cast(
+                    "list[Any]",
+                    await self._pulse_eco_api.adata_raw_many(
+                        from_=from_, to=to, queries=queries
+                    ),
+                )
+            return cast(
+                "list[Any]",
+                await self._pulse_eco_api.adata_raw(
+                    from_=from_, to=to, type=type, sensor_id=sensor_id
+                ),
+            )
+
+        if self._mirror is None:
+            return await fetch(from_, to)
+        return self._intern(
+            await self._mirror.aget(
+                self._city_name,
+                "dataRaw",
+                from_,
+                to,
+                fetch,
+                type=type,
+                sensor_id=sensor_id,
+            )
+        )
+
+    def _avg_data_json(
+        self,
+        period: AveragePeriod,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType,
+        sensor_id: str | None,
+    ) -> list[Any]:
+        """Get the average data jsons from the local mirror if set, else from the API."""
+
+        def fetch(
+            from_: str | datetime.datetime, to: str | datetime.datetime
+        ) -> list[Any]:
+            return cast(
+                "list[Any]",
+                self._pulse_eco_api.avg_data(
+                    period=period,
+                    from_=from_,
+                    to=to,
+                    type=type.value,
+                    sensor_id=sensor_id,
+                ),
+            )
+
+        if self._mirror is None:
+            return fetch(from_, to)
+        return self._intern(
+            self._mirror.get(
+                self._city_name,
+                f"avgData/{period.value}",
+                from_,
+                to,
+                fetch,
+                type=type.value,
+                sensor_id=sensor_id,
+            )
+        )
+
+    async def _aavg_data_json(
+        self,
+        period: AveragePeriod,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType,
+        sensor_id: str | None,
+    ) -> list[Any]:
+        """Get the average data jsons from the local mirror if set, else from the API."""
+
+        async def fetch(
+            from_: str | datetime.datetime, to: str | datetime.datetime
+        ) -> list[Any]:
+            return cast(
+                "list[Any]",
+                await self._pulse_eco_api.aavg_data(
+                    period=period,
+                    from_=from_,
+                    to=to,
+                    type=type.value,
+                    sensor_id=sensor_id,
+                ),
+            )
+
+        if self._mirror is None:
+            return await fetch(from_, to)
+        return self._intern(
+            await self._mirror.aget(
+                self._city_name,
+                f"avgData/{period.value}",
+                from_,
+                to,
+                fetch,
+                type=type.value,
+                sensor_id=sensor_id,
+            )
+        )
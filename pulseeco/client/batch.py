@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import bisect
+import datetime
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+from pulseeco.api.data_types import RangeQuery
+from pulseeco.api.merging import epoch_seconds
+from pulseeco.utils import parse_datetime
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from .enums import AveragePeriod, DataValueType
+    from .models import DataValue
+
+# consecutive chunks are split with a one second gap
+_ADJACENT = datetime.timedelta(seconds=1)
+
+
+class QuerySpec(NamedTuple):
+    """One raw data query, or average data query if `period` is set."""
+
+    from_: Union[str, datetime.datetime]  # noqa: UP007
+    to: Union[str, datetime.datetime]  # noqa: UP007
+    type: Optional[DataValueType] = None  # noqa: UP045
+    sensor_id: Optional[str] = None  # noqa: UP045
+    period: Optional[AveragePeriod] = None  # noqa: UP045
+
+
+def _to_utc(value: str | datetime.datetime) -> datetime.datetime:
+    value = parse_datetime(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+def plan_range_queries(
+    specs: Sequence[QuerySpec],
+) -> tuple[list[RangeQuery], list[int]]:
+    """Join the ranges of the specs into as few range queries as possible.
+
+    The overlapping and adjacent ranges of the raw data specs
+    of the same type and sensor ID are joined,
+    so the data of every datetime is requested once.
+    The averages depend on the range, so only the equal average data specs
+    share one query.
+
+    :param specs: the query specs
+    :raises ValueError: if an average data spec does not have a type
+    :return: the range queries and the index of the query covering each spec
+    """
+    raw_groups: dict[
+        tuple[str | None, str | None],
+        list[tuple[datetime.datetime, datetime.datetime, int]],
+    ] = {}
+    avg_queries: dict[RangeQuery, list[int]] = {}
+    for index, spec in enumerate(specs):
+        type_value = spec.type.value if spec.type is not None else None
+        if spec.period is None:
+            raw_groups.setdefault((type_value, spec.sensor_id), []).append((
+                _to_utc(spec.from_),
+                _to_utc(spec.to),
+                index,
+            ))
+        elif type_value is None:
+            raise ValueError("`type` is required for average data query specs")
+        else:
+            query = RangeQuery(
+                f"avgData/{spec.period.value}",
+                _to_utc(spec.from_),
+                _to_utc(spec.to),
+                type_value,
+                spec.sensor_id,
+            )
+            avg_queries.setdefault(query, []).append(index)
+    queries: list[RangeQuery] = []
+    covering = [0] * len(specs)
+    for (type_value, sensor_id), ranges in raw_groups.items():
+        ranges.sort()
+        start, end, _ = ranges[0]
+        for from_, to, index in ranges:
+            if from_ > end + _ADJACENT:
+                queries.append(RangeQuery("dataRaw", start, end, type_value, sensor_id))
+                start, end = from_, to
+            end = max(end, to)
+            covering[index] = len(queries)
+        queries.append(RangeQuery("dataRaw", start, end, type_value, sensor_id))
+    for query, indices in avg_queries.items():
+        for index in indices:
+            covering[index] = len(queries)
+        queries.append(query)
+    return queries, covering
+
+
+def select_spec_results(
+    specs: Sequence[QuerySpec],
+    covering: Sequence[int],
+    results: Sequence[list[DataValue]],
+) -> list[list[DataValue]]:
+    """Select the data values of each spec from the results of the range queries.
+
+    :param specs: the query specs
+    :param covering: the index of the range query covering each spec
+    :param results: the data values of each range query, ordered by stamp
+    :return: the raw data values of each spec with stamps within its range,
+        the average data values of each spec
+    """
+    stamps = [
+        [epoch_seconds(data_value.stamp) for data_value in result] for result in results
+    ]
+    selected = []
+    for spec, index in zip(specs, covering):
+        if spec.period is not None:
+            selected.append(list(results[index]))
+            continue
+        result_stamps = stamps[index]
+        start = bisect.bisect_left(result_stamps, epoch_seconds(spec.from_))
+        end = bisect.bisect_right(result_stamps, epoch_seconds(spec.to))
+        selected.append(results[index][start:end])
+    return selected
@@ -1,22 +1,79 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, cast
 
 from pulseeco.api import PulseEcoAPI
-from pulseeco.constants import PULSE_ECO_BASE_URL_FORMAT
-
-from .models import DataValue, DataValues, Overall, Sensor, Sensors
+from pulseeco.api.merging import merge_sorted
+from pulseeco.api.retry import DEFAULT_RETRY_POLICY
+from pulseeco.constants import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY_PER_HOST,
+    DEFAULT_WATCH_INTERVAL,
+    DEFAULT_WATCH_JITTER,
+    DEFAULT_WATCH_QUEUE_SIZE,
+    DEFAULT_WATCH_SEEN_SIZE,
+    DELTA_POLL_MAX_LOOKBACK,
+    DELTA_POLL_WINDOW,
+    PULSE_ECO_BASE_URL_FORMAT,
+    SENSOR_CACHE_TTL,
+)
+
+from .base import PulseEcoClientBase
+from .batch import QuerySpec, plan_range_queries, select_spec_results
+from .columnar import DataValueBatch
+from .models import DataValue, DataValues, Overall, Sensor, Sensors, data_value_key
+from .planner import CityWideQueryPlanner, ReportedTypeCache
+from .poller import DeltaPoller
+from .registry import SensorRegistry
+from .trusted import TrustedPulseEcoClient
+from .watch import MeasurementWatcher
 
 if TYPE_CHECKING:
     import datetime
+    from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+    from pathlib import Path
 
     from pulseeco.api.base import PulseEcoAPIBase
+    from pulseeco.api.cache import ResponseCacheBase
+    from pulseeco.api.chunking import AdaptiveChunkPlanner
+    from pulseeco.api.data_types import DataRawQuery
     from pulseeco.api.http_clients import ASYNC_CLIENT, CLIENT
+    from pulseeco.api.interning import InternTable
+    from pulseeco.api.retry import RetryPolicy
 
     from .enums import AveragePeriod, DataValueType
+    from .mirror import LocalMirror
+    from .watch import WatchSource
+
+
+def _validate_json(
+    content: bytes, intern_table: InternTable | None = None
+) -> list[DataValue]:
+    """Validate a data value response body straight from json.
+
+    The strings of `validate_json` skip the intern table of the API wrapper,
+    so the table is passed to the validators in the validation context.
+    """
+    return DataValues.validate_json(
+        content,
+        context={"intern_table": intern_table} if intern_table is not None else None,
+    )
+
 
+def _validate_json_chunks(
+    contents: list[bytes], intern_table: InternTable | None = None
+) -> list[DataValue]:
+    """Validate the response bodies of chunk requests straight from json.
 
-class PulseEcoClient:
+    The data values are merged by stamp, sensor ID and type, without duplicates.
+    """
+    return merge_sorted(
+        (_validate_json(content, intern_table) for content in contents),
+        data_value_key,
+    )
+
+
+class PulseEcoClient(PulseEcoClientBase):  # noqa: PLR0904
     """High level pulse.eco client."""
 
     def __init__(
@@ -28,6 +85,22 @@ class PulseEcoClient:
         client: CLIENT | None = None,
         async_client: ASYNC_CLIENT | None = None,
         pulse_eco_api: PulseEcoAPIBase | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_concurrency_per_host: int = DEFAULT_MAX_CONCURRENCY_PER_HOST,
+        max_workers: int | None = None,
+        client_factory: Callable[[], CLIENT] | None = None,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        rate_limit: float | None = None,
+        rate_limit_burst: float | None = None,
+        chunk_planner: AdaptiveChunkPlanner | None = None,
+        coalesce_requests: bool = True,
+        cache: ResponseCacheBase | None = None,
+        mirror: LocalMirror | None = None,
+        intern_table: InternTable | None = None,
+        plan_city_wide_queries: bool = False,
+        sensor_ttl: float | None = None,
+        sensor_registry_path: str | Path | None = None,
+        sensor_background_refresh: bool = False,
     ) -> None:
         """Initialize the pulse.eco client.
 
@@ -38,32 +111,220 @@ class PulseEcoClient:
         :param session: deprecated, use client and async_client instead
         :param client: a sync http client, supported types are:
             requests.Session, httpx.Client,
-            defaults to None which uses a new requests.Session for each request,
-            use a context managed session for better performance and resource management
+            defaults to None which lazily creates a keep-alive client
+            owned by this client, sized for the concurrency of this client,
+            close it with `close` or by using the client as a context manager
         :param async_client: an async http client, supported types are:
             aiohttp.ClientSession, httpx.AsyncClient,
-            defaults to None which will use the sync client
+            defaults to None which will run the sync client in a thread pool
+            of `max_concurrency` threads, so the event loop is not blocked
         :param pulse_eco_api: a pulse.eco API wrapper, defaults to None,
             if set, the other parameters are ignored
+        :param max_concurrency: the maximum number of concurrent chunk requests
+            of this client for the async chunked methods, defaults to 4
+        :param max_concurrency_per_host: the maximum number of concurrent
+            chunk requests to one host, shared between all clients, defaults to 8
+        :param max_workers: the number of threads used to request the chunks of
+            the sync chunked methods in parallel, defaults to None which
+            requests the chunks one after another
+        :param client_factory: creates a sync http client for each worker thread
+            if the client is not thread safe (requests.Session),
+            defaults to None which creates sessions with the configuration
+            of the client that share its connection pools
+        :param retry_policy: the backoff and retries of requests that fail with
+            a connection error, a timeout or a 429 or 5xx status code,
+            defaults to 3 retries with exponential backoff and jitter,
+            use `pulseeco.api.retry.NO_RETRY` to disable retries
+        :param rate_limit: the maximum number of requests per second to the host,
+            shared between all clients and both the sync and async methods,
+            defaults to None which does not limit the rate
+        :param rate_limit_burst: the number of requests allowed in a burst,
+            defaults to None which uses the rate limit
+        :param chunk_planner: learns the span of the chunk requests of
+            `data_raw` and `avg_data`, can be shared between clients,
+            defaults to None which always uses the maximum span of the end point
+        :param coalesce_requests: whether identical concurrent requests share
+            one in-flight request, defaults to True
+        :param cache: caches the responses with a TTL per end point,
+            ex. `pulseeco.api.cache.ResponseCache`, can be shared between clients,
+            defaults to None which does not cache
+        :param mirror: a persistent local mirror that `data_raw` and `avg_data`
+            read the intervals it already holds from, so only the missing
+            intervals are requested, it is not closed by this client,
+            defaults to None which requests everything
+        :param intern_table: shares one object between the repeated sensor IDs,
+            positions and types of the responses, bounded in size,
+            ex. `pulseeco.api.interning.InternTable`, can be shared between clients,
+            defaults to None which does not intern
+        :param plan_city_wide_queries: whether `data_raw` without a type and
+            a sensor ID is split into one query per sensor and type the city
+            reports, skipping the sensors that do not send data,
+            the sensors and types are cached for `sensor_ttl`, defaults to False
+        :param sensor_ttl: keeps the sensors in a `SensorRegistry` that is reloaded
+            after this many seconds, `sensor` is then answered from it,
+            defaults to None which requests the sensors every time
+        :param sensor_registry_path: a json file the sensor registry is persisted
+            to and loaded from, defaults to None which keeps it only in memory
+        :param sensor_background_refresh: whether the sensor registry is reloaded
+            in the background while the expired sensors are served,
+            defaults to False
         """
-        self._pulse_eco_api: PulseEcoAPIBase
         if pulse_eco_api is None:
-            self._pulse_eco_api = PulseEcoAPI(
+            pulse_eco_api = PulseEcoAPI(
                 city_name=city_name,
                 auth=auth,
                 base_url=base_url,
                 session=session,
                 client=client,
                 async_client=async_client,
+                max_concurrency=max_concurrency,
+                max_concurrency_per_host=max_concurrency_per_host,
+                max_workers=max_workers,
+                client_factory=client_factory,
+                retry_policy=retry_policy,
+                rate_limit=rate_limit,
+                rate_limit_burst=rate_limit_burst,
+                chunk_planner=chunk_planner,
+                coalesce_requests=coalesce_requests,
+                cache=cache,
+                intern_table=intern_table,
             )
-        else:
-            self._pulse_eco_api = pulse_eco_api
+        super().__init__(
+            city_name=city_name,
+            pulse_eco_api=pulse_eco_api,
+            mirror=mirror,
+            intern_table=intern_table,
+        )
+        self._sensor_registry = (
+            SensorRegistry(
+                pulse_eco_api,
+                ttl=sensor_ttl,
+                path=sensor_registry_path,
+                background_refresh=sensor_background_refresh,
+            )
+            if sensor_ttl is not None
+            else None
+        )
+        self._type_cache = ReportedTypeCache(
+            pulse_eco_api, ttl=SENSOR_CACHE_TTL if sensor_ttl is None else sensor_ttl
+        )
+        # the planner keeps its own cached sensors without a sensor registry
+        self._city_wide_planner = (
+            CityWideQueryPlanner(
+                self._sensor_registry or SensorRegistry(pulse_eco_api),
+                self._type_cache,
+            )
+            if plan_city_wide_queries
+            else None
+        )
+
+    @property
+    def sensor_registry(self) -> SensorRegistry | None:
+        """The sensor registry if `sensor_ttl` is set, use it for bulk lookups."""
+        return self._sensor_registry
+
+    def reported_types(self) -> list[DataValueType]:
+        """Get the data value types the city reports in its overall values.
+
+        The types are cached for `sensor_ttl`, an hour by default.
+
+        :return: the reported data value types, all of them if none has a value
+        """
+        return self._type_cache.get()
+
+    async def areported_types(self) -> list[DataValueType]:
+        """Get the data value types the city reports in its overall values.
+
+        The types are cached for `sensor_ttl`, an hour by default.
+
+        :return: the reported data value types, all of them if none has a value
+        """
+        return await self._type_cache.aget()
+
+    def _city_wide_queries(
+        self, type: DataValueType | None, sensor_id: str | None
+    ) -> list[DataRawQuery] | None:
+        """Plan the queries of a city wide raw data query if enabled."""
+        if self._city_wide_planner is None or type is not None or sensor_id is not None:
+            return None
+        return self._city_wide_planner.plan()
+
+    async def _acity_wide_queries(
+        self, type: DataValueType | None, sensor_id: str | None
+    ) -> list[DataRawQuery] | None:
+        """Plan the queries of a city wide raw data query if enabled."""
+        if self._city_wide_planner is None or type is not None or sensor_id is not None:
+            return None
+        return await self._city_wide_planner.aplan()
+
+    def trusted(self) -> TrustedPulseEcoClient:
+        """Get a client that skips validation and returns lightweight records.
+
+        The trusted client shares the API wrapper and the local mirror
+        of this client, closing either of them closes both.
+
+        :return: a trusted client
+        """
+        return TrustedPulseEcoClient(
+            city_name=self._city_name,
+            pulse_eco_api=self._pulse_eco_api,
+            mirror=self._mirror,
+            intern_table=self._intern_table,
+        )
+
+    def poller(
+        self,
+        window: datetime.timedelta = DELTA_POLL_WINDOW,
+        max_lookback: datetime.timedelta = DELTA_POLL_MAX_LOOKBACK,
+    ) -> DeltaPoller:
+        """Get a poller of the new data values of the city.
+
+        :param window: the span of the rolling buffer, defaults to 24 hours
+        :param max_lookback: how far back a poll requests new data values,
+            defaults to 2 hours
+        :return: a delta poller
+        """
+        return DeltaPoller(self, window=window, max_lookback=max_lookback)
+
+    def watch(
+        self,
+        interval: float = DEFAULT_WATCH_INTERVAL,
+        jitter: float = DEFAULT_WATCH_JITTER,
+        source: WatchSource = "current",
+        max_seen: int = DEFAULT_WATCH_SEEN_SIZE,
+        max_queue_size: int = DEFAULT_WATCH_QUEUE_SIZE,
+    ) -> MeasurementWatcher:
+        """Watch the new data values of the city.
+
+        Only the data values not seen before are validated and yielded.
+        Close the watcher with `aclose` or by using it as an async context manager.
+
+        :param interval: the seconds between polls, defaults to 60
+        :param jitter: the fraction of the interval the polls are randomly moved by,
+            defaults to 0.1
+        :param source: poll `current` or `data24h`, defaults to 'current'
+        :param max_seen: the number of seen data values remembered,
+            defaults to 100000
+        :param max_queue_size: the number of new data values that wait
+            to be consumed before polling pauses, defaults to 1024
+        :return: an async iterator of the new data values
+        """
+        return MeasurementWatcher(
+            {self._city_name: self.trusted()},
+            interval=interval,
+            jitter=jitter,
+            source=source,
+            max_seen=max_seen,
+            max_queue_size=max_queue_size,
+        )
 
     def sensors(self) -> list[Sensor]:
         """Get all sensors for a city.
 
         :return: a list of sensors
         """
+        if self._sensor_registry is not None:
+            return self._sensor_registry.sensors()
         return Sensors.validate_python(self._pulse_eco_api.sensors())
 
     async def asensors(self) -> list[Sensor]:
@@ -71,6 +332,8 @@ class PulseEcoClient:
 
         :return: a list of sensors
         """
+        if self._sensor_registry is not None:
+            return await self._sensor_registry.asensors()
         return Sensors.validate_python(await self._pulse_eco_api.asensors())
 
     def sensor(self, sensor_id: str) -> Sensor:
@@ -79,6 +342,8 @@ class PulseEcoClient:
         :param sensor_id: the unique ID of the sensor
         :return: a sensor
         """
+        if self._sensor_registry is not None:
+            return self._sensor_registry.get(sensor_id)
         return Sensor.model_validate(self._pulse_eco_api.sensor(sensor_id=sensor_id))
 
     async def asensor(self, sensor_id: str) -> Sensor:
@@ -87,6 +352,8 @@ class PulseEcoClient:
         :param sensor_id: the unique ID of the sensor
         :return: a sensor
         """
+        if self._sensor_registry is not None:
+            return await self._sensor_registry.aget(sensor_id)
         return Sensor.model_validate(
             await self._pulse_eco_api.asensor(sensor_id=sensor_id)
         )
@@ -108,13 +375,21 @@ class PulseEcoClient:
         :param sensor_id: the unique ID of the sensor, defaults to None
         :return: a list of data values
         """
-        return DataValues.validate_python(
-            self._pulse_eco_api.data_raw(
-                from_=from_,
-                to=to,
-                type=type.value if type is not None else None,
-                sensor_id=sensor_id,
+        type_value = type.value if type is not None else None
+        queries = self._city_wide_queries(type, sensor_id)
+        if self._mirror is None:
+            return _validate_json_chunks(
+                self._pulse_eco_api.data_raw_many_bytes(
+                    from_=from_, to=to, queries=queries
+                )
+                if queries is not None
+                else self._pulse_eco_api.data_raw_bytes(
+                    from_=from_, to=to, type=type_value, sensor_id=sensor_id
+                ),
+                self._intern_table,
             )
+        return DataValues.validate_python(
+            self._data_raw_json(from_, to, type_value, sensor_id, queries)
         )
 
     async def adata_raw(
@@ -134,15 +409,89 @@ class PulseEcoClient:
         :param sensor_id: the unique ID of the sensor, defaults to None
         :return: a list of data values
         """
-        return DataValues.validate_python(
-            await self._pulse_eco_api.adata_raw(
-                from_=from_,
-                to=to,
-                type=type.value if type is not None else None,
-                sensor_id=sensor_id,
+        type_value = type.value if type is not None else None
+        queries = await self._acity_wide_queries(type, sensor_id)
+        if self._mirror is None:
+            return _validate_json_chunks(
+                await self._pulse_eco_api.adata_raw_many_bytes(
+                    from_=from_, to=to, queries=queries
+                )
+                if queries is not None
+                else await self._pulse_eco_api.adata_raw_bytes(
+                    from_=from_, to=to, type=type_value, sensor_id=sensor_id
+                ),
+                self._intern_table,
             )
+        return DataValues.validate_python(
+            await self._adata_raw_json(from_, to, type_value, sensor_id, queries)
         )
 
+    def iter_data_raw(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType | None = None,
+        sensor_id: str | None = None,
+        prefetch: int = 1,
+    ) -> Iterator[list[DataValue]]:
+        """Get raw data for a city, one validated batch per chunk request.
+
+        The batches are yielded in order as each chunk arrives,
+        so the whole span is never held in memory at once.
+        The local mirror is not used.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :param prefetch: the number of chunks requested ahead in the background,
+            defaults to 1
+        :return: an iterator of lists of data values
+        """
+        for batch in self._pulse_eco_api.iter_data_raw(
+            from_=from_,
+            to=to,
+            type=type.value if type is not None else None,
+            sensor_id=sensor_id,
+            prefetch=prefetch,
+        ):
+            yield DataValues.validate_python(batch)
+
+    async def aiter_data_raw(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType | None = None,
+        sensor_id: str | None = None,
+        prefetch: int = 1,
+    ) -> AsyncIterator[list[DataValue]]:
+        """Get raw data for a city, one validated batch per chunk request.
+
+        The batches are yielded in order as each chunk arrives,
+        so the whole span is never held in memory at once.
+        The local mirror is not used.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :param prefetch: the number of chunks requested ahead in the background,
+            defaults to 1
+        :return: an async iterator of lists of data values
+        """
+        async for batch in self._pulse_eco_api.aiter_data_raw(
+            from_=from_,
+            to=to,
+            type=type.value if type is not None else None,
+            sensor_id=sensor_id,
+            prefetch=prefetch,
+        ):
+            yield DataValues.validate_python(batch)
+
     def avg_data(
         self,
         period: AveragePeriod,
@@ -162,14 +511,19 @@ class PulseEcoClient:
         :param sensor_id: the unique ID of the sensor, defaults to None
         :return: a list of average data values
         """
-        return DataValues.validate_python(
-            self._pulse_eco_api.avg_data(
-                period=period,
-                from_=from_,
-                to=to,
-                type=type.value,
-                sensor_id=sensor_id,
+        if self._mirror is None:
+            return _validate_json_chunks(
+                self._pulse_eco_api.avg_data_bytes(
+                    period=period,
+                    from_=from_,
+                    to=to,
+                    type=type.value,
+                    sensor_id=sensor_id,
+                ),
+                self._intern_table,
             )
+        return DataValues.validate_python(
+            self._avg_data_json(period, from_, to, type, sensor_id)
         )
 
     async def aavg_data(
@@ -191,16 +545,63 @@ class PulseEcoClient:
         :param sensor_id: the unique ID of the sensor, defaults to None
         :return: a list of average data values
         """
-        return DataValues.validate_python(
-            await self._pulse_eco_api.aavg_data(
-                period=period,
-                from_=from_,
-                to=to,
-                type=type.value,
-                sensor_id=sensor_id,
+        if self._mirror is None:
+            return _validate_json_chunks(
+                await self._pulse_eco_api.aavg_data_bytes(
+                    period=period,
+                    from_=from_,
+                    to=to,
+                    type=type.value,
+                    sensor_id=sensor_id,
+                ),
+                self._intern_table,
             )
+        return DataValues.validate_python(
+            await self._aavg_data_json(period, from_, to, type, sensor_id)
         )
 
+    def query_many(self, specs: Iterable[QuerySpec]) -> list[list[DataValue]]:
+        """Get the data of many raw and average data queries in one batch.
+
+        The overlapping and adjacent ranges of the raw data queries
+        of the same type and sensor ID are joined and equal queries are merged,
+        so every datetime is requested once,
+        and the chunks of all queries are requested as one task set.
+        The local mirror is not used.
+
+        :param specs: the query specs
+        :raises ValueError: if an average data spec does not have a type
+        :return: the data values of each spec, in the order of the specs
+        """
+        specs = list(specs)
+        queries, covering = plan_range_queries(specs)
+        results = [
+            _validate_json_chunks(contents, self._intern_table)
+            for contents in self._pulse_eco_api.query_many_bytes(queries)
+        ]
+        return select_spec_results(specs, covering, results)
+
+    async def aquery_many(self, specs: Iterable[QuerySpec]) -> list[list[DataValue]]:
+        """Get the data of many raw and average data queries in one batch.
+
+        The overlapping and adjacent ranges of the raw data queries
+        of the same type and sensor ID are joined and equal queries are merged,
+        so every datetime is requested once,
+        and the chunks of all queries run on the scheduler as one task set.
+        The local mirror is not used.
+
+        :param specs: the query specs
+        :raises ValueError: if an average data spec does not have a type
+        :return: the data values of each spec, in the order of the specs
+        """
+        specs = list(specs)
+        queries, covering = plan_range_queries(specs)
+        results = [
+            _validate_json_chunks(contents, self._intern_table)
+            for contents in await self._pulse_eco_api.aquery_many_bytes(queries)
+        ]
+        return select_spec_results(specs, covering, results)
+
     def data24h(self) -> list[DataValue]:
         """Get 24h data for a city.
 
@@ -208,7 +609,7 @@ class PulseEcoClient:
 
         :return: a list of data values for the past 24 hours
         """
-        return DataValues.validate_python(self._pulse_eco_api.data24h())
+        return _validate_json(self._pulse_eco_api.data24h_bytes(), self._intern_table)
 
     async def adata24h(self) -> list[DataValue]:
         """Get 24h data for a city.
@@ -217,7 +618,127 @@ class PulseEcoClient:
 
         :return: a list of data values for the past 24 hours
         """
-        return DataValues.validate_python(await self._pulse_eco_api.adata24h())
+        return _validate_json(
+            await self._pulse_eco_api.adata24h_bytes(), self._intern_table
+        )
+
+    def data_raw_batch(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType | None = None,
+        sensor_id: str | None = None,
+    ) -> DataValueBatch:
+        """Get raw data for a city as a columnar batch.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a batch of data values
+        """
+        return DataValueBatch.from_dicts(
+            self._data_raw_json(
+                from_,
+                to,
+                type.value if type is not None else None,
+                sensor_id,
+                self._city_wide_queries(type, sensor_id),
+            )
+        )
+
+    async def adata_raw_batch(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType | None = None,
+        sensor_id: str | None = None,
+    ) -> DataValueBatch:
+        """Get raw data for a city as a columnar batch.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a batch of data values
+        """
+        return DataValueBatch.from_dicts(
+            await self._adata_raw_json(
+                from_,
+                to,
+                type.value if type is not None else None,
+                sensor_id,
+                await self._acity_wide_queries(type, sensor_id),
+            )
+        )
+
+    def avg_data_batch(
+        self,
+        period: AveragePeriod,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType,
+        sensor_id: str | None = None,
+    ) -> DataValueBatch:
+        """Get average data for a city as a columnar batch.
+
+        :param period: the period of the average data
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a batch of average data values
+        """
+        return DataValueBatch.from_dicts(
+            self._avg_data_json(period, from_, to, type, sensor_id)
+        )
+
+    async def aavg_data_batch(
+        self,
+        period: AveragePeriod,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType,
+        sensor_id: str | None = None,
+    ) -> DataValueBatch:
+        """Get average data for a city as a columnar batch.
+
+        :param period: the period of the average data
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a batch of average data values
+        """
+        return DataValueBatch.from_dicts(
+            await self._aavg_data_json(period, from_, to, type, sensor_id)
+        )
+
+    def data24h_batch(self) -> DataValueBatch:
+        """Get 24h data for a city as a columnar batch.
+
+        :return: a batch of data values for the past 24 hours
+        """
+        return DataValueBatch.from_dicts(
+            cast("list[Any]", self._pulse_eco_api.data24h())
+        )
+
+    async def adata24h_batch(self) -> DataValueBatch:
+        """Get 24h data for a city as a columnar batch.
+
+        :return: a batch of data values for the past 24 hours
+        """
+        return DataValueBatch.from_dicts(
+            cast("list[Any]", await self._pulse_eco_api.adata24h())
+        )
 
     def current(self) -> list[DataValue]:
         """Get the last received valid data for each sensor in a city.
@@ -226,7 +747,7 @@ class PulseEcoClient:
 
         :return: a list of current data values
         """
-        return DataValues.validate_python(self._pulse_eco_api.current())
+        return _validate_json(self._pulse_eco_api.current_bytes(), self._intern_table)
 
     async def acurrent(self) -> list[DataValue]:
         """Get the last received valid data for each sensor in a city.
@@ -235,7 +756,9 @@ class PulseEcoClient:
 
         :return: a list of current data values
         """
-        return DataValues.validate_python(await self._pulse_eco_api.acurrent())
+        return _validate_json(
+            await self._pulse_eco_api.acurrent_bytes(), self._intern_table
+        )
 
     def overall(self) -> Overall:
         """Get the current average data for all sensors per value for a city.
@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import datetime
+from array import array
+from typing import TYPE_CHECKING, Any, Generic, NamedTuple, Optional, TypeVar, overload
+
+from pulseeco.api.merging import epoch_seconds
+from pulseeco.utils import parse_datetime
+
+from .enums import DataValueType
+from .models import DataValue
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping, Sequence
+
+T = TypeVar("T")
+
+
+class DataValueRow(NamedTuple):
+    """One data value of a batch, with the same field names as `DataValue`."""
+
+    sensor_id: str
+    stamp: datetime.datetime
+    type: DataValueType
+    position: Optional[str]  # noqa: UP045
+    value: int
+
+
+class DictionaryColumn(Generic[T]):
+    """A dictionary encoded column, each row holds the code of its value."""
+
+    __slots__ = ("codes", "dictionary")
+
+    def __init__(self, codes: array[int], dictionary: Sequence[T]) -> None:
+        """Initialize the dictionary encoded column.
+
+        :param codes: the index into the dictionary of each row
+        :param dictionary: the distinct values of the column
+        """
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> T:
+        return self.dictionary[self.codes[index]]
+
+    def __iter__(self) -> Iterator[T]:
+        dictionary = self.dictionary
+        return (dictionary[code] for code in self.codes)
+
+    def code_of(self, value: T) -> int | None:
+        """Get the code of a value, None if no row holds it."""
+        try:
+            return self.dictionary.index(value)
+        except ValueError:
+            return None
+
+    def take(self, indices: Iterable[int]) -> DictionaryColumn[T]:
+        """Get a column of the rows at the indices, sharing the dictionary."""
+        codes = self.codes
+        return DictionaryColumn(
+            array("I", (codes[i] for i in indices)), self.dictionary
+        )
+
+
+class _DictionaryEncoder(Generic[T]):
+    __slots__ = ("codes", "dictionary", "index")
+
+    def __init__(self) -> None:
+        self.codes: array[int] = array("I")
+        self.dictionary: list[T] = []
+        self.index: dict[T, int] = {}
+
+    def extend(self, column: DictionaryColumn[T]) -> None:
+        # re-encode the codes of the column into this dictionary
+        recode = [self._encode(value) for value in column.dictionary]
+        self.codes.extend(recode[code] for code in column.codes)
+
+    def _encode(self, value: T) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.dictionary)
+            self.dictionary.append(value)
+        return code
+
+    def append(self, value: T) -> None:
+        self.codes.append(self._encode(value))
+
+    def column(self) -> DictionaryColumn[T]:
+        return DictionaryColumn(self.codes, tuple(self.dictionary))
+
+
+class DataValueBatch:
+    """Columnar batch of data values.
+
+    The timestamps (epoch seconds) and values are held in compact arrays,
+    the sensor IDs, positions, types and UTC offsets are dictionary encoded,
+    so a row costs a few bytes instead of a `DataValue` object.
+    Filtering and slicing return new batches without creating row objects.
+    The legacy `year` field is not kept.
+    """
+
+    __slots__ = (
+        "_positions",
+        "_sensor_ids",
+        "_stamps",
+        "_timezones",
+        "_types",
+        "_values",
+    )
+
+    def __init__(
+        self,
+        stamps: array[int],
+        values: array[int],
+        sensor_ids: DictionaryColumn[str],
+        types: DictionaryColumn[DataValueType],
+        positions: DictionaryColumn[str | None],
+        timezones: DictionaryColumn[datetime.tzinfo],
+    ) -> None:
+        """Initialize the data value batch from its columns.
+
+        :param stamps: the timestamps in epoch seconds
+        :param values: the values of the measurements
+        :param sensor_ids: the sensor IDs
+        :param types: the data value types
+        :param positions: the positions of the sensors
+        :param timezones: the timezones the timestamps were reported in
+        """
+        self._stamps = stamps
+        self._values = values
+        self._sensor_ids = sensor_ids
+        self._types = types
+        self._positions = positions
+        self._timezones = timezones
+
+    @classmethod
+    def from_dicts(cls, data: Iterable[Mapping[str, Any]]) -> DataValueBatch:
+        """Build a batch from data value jsons, ex. the result of `PulseEcoAPI`.
+
+        :param data: the data value jsons
+        :raises ValueError: if a data value is not valid
+        :return: a data value batch
+        """
+        stamps: array[int] = array("q")
+        values: array[int] = array("q")
+        sensor_ids: _DictionaryEncoder[str] = _DictionaryEncoder()
+        types: _DictionaryEncoder[DataValueType] = _DictionaryEncoder()
+        positions: _DictionaryEncoder[str | None] = _DictionaryEncoder()
+        timezones: _DictionaryEncoder[datetime.tzinfo] = _DictionaryEncoder()
+        # the types repeat, so they are converted only once
+        type_cache: dict[str, DataValueType] = {}
+        for data_value in data:
+            stamp = parse_datetime(data_value["stamp"])
+            if stamp.tzinfo is None:
+                stamp = stamp.replace(tzinfo=datetime.timezone.utc)
+            stamps.append(int(stamp.timestamp()))
+            values.append(int(data_value["value"]))
+            sensor_ids.append(data_value["sensorId"])
+            type_ = type_cache.get(data_value["type"])
+            if type_ is None:
+                type_ = type_cache[data_value["type"]] = DataValueType(
+                    data_value["type"]
+                )
+            types.append(type_)
+            positions.append(data_value.get("position"))
+            timezones.append(stamp.tzinfo)  # type: ignore[arg-type]
+        return cls(
+            stamps,
+            values,
+            sensor_ids.column(),
+            types.column(),
+            positions.column(),
+            timezones.column(),
+        )
+
+    @classmethod
+    def from_data_values(cls, data_values: Iterable[DataValue]) -> DataValueBatch:
+        """Build a batch from data value models.
+
+        :param data_values: the data value models
+        :return: a data value batch
+        """
+        return cls.from_dicts(
+            {
+                "sensorId": data_value.sensor_id,
+                "stamp": data_value.stamp,
+                "type": data_value.type,
+                "position": data_value.position,
+                "value": data_value.value,
+            }
+            for data_value in data_values
+        )
+
+    @classmethod
+    def concat(cls, batches: Iterable[DataValueBatch]) -> DataValueBatch:
+        """Join batches in order into one batch.
+
+        :param batches: the batches to join
+        :return: a data value batch
+        """
+        stamps: array[int] = array("q")
+        values: array[int] = array("q")
+        sensor_ids: _DictionaryEncoder[str] = _DictionaryEncoder()
+        types: _DictionaryEncoder[DataValueType] = _DictionaryEncoder()
+        positions: _DictionaryEncoder[str | None] = _DictionaryEncoder()
+        timezones: _DictionaryEncoder[datetime.tzinfo] = _DictionaryEncoder()
+        for batch in batches:
+            stamps.extend(batch.stamps)
+            values.extend(batch.values)
+            sensor_ids.extend(batch.sensor_ids)
+            types.extend(batch.types)
+            positions.extend(batch.positions)
+            timezones.extend(batch.timezones)
+        return cls(
+            stamps,
+            values,
+            sensor_ids.column(),
+            types.column(),
+            positions.column(),
+            timezones.column(),
+        )
+
+    @property
+    def stamps(self) -> array[int]:
+        """The timestamps in epoch seconds."""
+        return self._stamps
+
+    @property
+    def values(self) -> array[int]:
+        """The values of the measurements."""
+        return self._values
+
+    @property
+    def sensor_ids(self) -> DictionaryColumn[str]:
+        """The dictionary encoded sensor IDs."""
+        return self._sensor_ids
+
+    @property
+    def types(self) -> DictionaryColumn[DataValueType]:
+        """The dictionary encoded data value types."""
+        return self._types
+
+    @property
+    def positions(self) -> DictionaryColumn[str | None]:
+        """The dictionary encoded positions of the sensors."""
+        return self._positions
+
+    @property
+    def timezones(self) -> DictionaryColumn[datetime.tzinfo]:
+        """The dictionary encoded timezones the timestamps were reported in."""
+        return self._timezones
+
+    def __len__(self) -> int:
+        return len(self._stamps)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(rows={len(self)})"
+
+    def _row(self, index: int) -> DataValueRow:
+        return DataValueRow(
+            sensor_id=self._sensor_ids[index],
+            stamp=datetime.datetime.fromtimestamp(
+                self._stamps[index], tz=self._timezones[index]
+            ),
+            type=self._types[index],
+            position=self._positions[index],
+            value=self._values[index],
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> DataValueRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> DataValueBatch: ...
+
+    def __getitem__(self, index: int | slice) -> DataValueRow | DataValueBatch:
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("batch index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[DataValueRow]:
+        return (self._row(index) for index in range(len(self)))
+
+    def take(self, indices: Iterable[int]) -> DataValueBatch:
+        """Get a batch of the rows at the indices.
+
+        :param indices: the indices of the rows
+        :return: a data value batch
+        """
+        indices = list(indices)
+        return DataValueBatch(
+            array("q", (self._stamps[i] for i in indices)),
+            array("q", (self._values[i] for i in indices)),
+            self._sensor_ids.take(indices),
+            self._types.take(indices),
+            self._positions.take(indices),
+            self._timezones.take(indices),
+        )
+
+    def filter(
+        self,
+        sensor_id: str | None = None,
+        type: DataValueType | None = None,
+        from_: str | datetime.datetime | None = None,
+        to: str | datetime.datetime | None = None,
+    ) -> DataValueBatch:
+        """Get a batch of the rows that match all of the given conditions.
+
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :param type: the data value type, defaults to None
+        :param from_: the start datetime, inclusive, defaults to None
+        :param to: the end datetime, inclusive, defaults to None
+        :return: a data value batch
+        """
+        indices: Iterable[int] = range(len(self))
+        if sensor_id is not None:
+            code = self._sensor_ids.code_of(sensor_id)
+            codes = self._sensor_ids.codes
+            indices = [i for i in indices if codes[i] == code]
+        if type is not None:
+            code = self._types.code_of(type)
+            codes = self._types.codes
+            indices = [i for i in indices if codes[i] == code]
+        stamps = self._stamps
+        if from_ is not None:
+            from_timestamp = int(epoch_seconds(from_))
+            indices = [i for i in indices if stamps[i] >= from_timestamp]
+        if to is not None:
+            to_timestamp = int(epoch_seconds(to))
+            indices = [i for i in indices if stamps[i] <= to_timestamp]
+        return self.take(indices)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """Export the batch to numpy arrays, see `pulseeco.client.export.to_numpy`.
+
+        :return: a dictionary of numpy arrays by field name
+        """
+        from .export import to_numpy  # noqa: PLC0415
+
+        return to_numpy(self)
+
+    def to_pandas(self) -> Any:  # noqa: ANN401
+        """Export the batch to a pandas DataFrame, see `pulseeco.client.export`.
+
+        :return: a pandas DataFrame with a column per field of `DataValue`
+        """
+        from .export import to_pandas  # noqa: PLC0415
+
+        return to_pandas(self)
+
+    def to_arrow(self) -> Any:  # noqa: ANN401
+        """Export the batch to an Arrow table, see `pulseeco.client.export`.
+
+        :return: a pyarrow Table with a column per field of `DataValue`
+        """
+        from .export import to_arrow  # noqa: PLC0415
+
+        return to_arrow(self)
+
+    def to_data_values(self) -> list[DataValue]:
+        """Convert the batch into data value models.
+
+        :return: a list of data values
+        """
+        return [
+            DataValue(
+                sensorId=row.sensor_id,
+                stamp=row.stamp,
+                type=row.type,
+                position=row.position,
+                value=row.value,
+            )
+            for row in self
+        ]
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, NamedTuple, Union
+
+from pulseeco.api.json_backend import json_loads
+from pulseeco.utils import parse_datetime
+
+from .columnar import DataValueBatch
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+    from types import ModuleType
+
+# Data values as a columnar batch, data value jsons or an undecoded response body
+ExportData = Union[DataValueBatch, "Iterable[Mapping[str, Any]]", bytes]
+
+# the length of 'YYYY-MM-DDTHH:MM:SS' and of 'YYYY-MM-DDTHH:MM:SS+HH:MM'
+_LOCAL_LENGTH = 19
+_OFFSET_LENGTH = 25
+
+
+def _import_optional(module: str, extra: str, feature: str) -> ModuleType:
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            f"`{module}` is not installed but is required for `{feature}`"
+            f", it is included in the extra `{extra}`"
+            f", install it with `pip install pulse-eco[{extra}]`"
+        ) from e
+
+
+def parse_stamps(stamps: Sequence[str]) -> Any:  # noqa: ANN401
+    """Parse isoformat timestamps into UTC `datetime64[s]` in vectorized form.
+
+    Timestamps of the form 'YYYY-MM-DDTHH:MM:SS' followed by '+HH:MM', '-HH:MM',
+    'Z' or nothing (UTC) are parsed by numpy without creating datetime objects,
+    any other form falls back to parsing one timestamp at a time.
+
+    :param stamps: the isoformat timestamps
+    :return: a numpy array of UTC timestamps
+    """
+    np = _import_optional("numpy", "numpy", "parse_stamps")
+    strings = np.asarray(stamps, dtype=str)
+    if strings.size == 0:
+        return np.empty(0, dtype="datetime64[s]")
+    if strings.itemsize // 4 < _OFFSET_LENGTH:
+        strings = strings.astype(f"U{_OFFSET_LENGTH}")
+    lengths = np.char.str_len(strings)
+    # the code point of each character, one row per timestamp
+    chars = strings.view(np.uint32).reshape(len(strings), -1).astype(np.int64)
+    sign_char = chars[:, _LOCAL_LENGTH]
+    has_offset = (lengths == _OFFSET_LENGTH) & (
+        (sign_char == ord("+")) | (sign_char == ord("-"))
+    )
+    is_utc = (lengths == _LOCAL_LENGTH) | (
+        (lengths == _LOCAL_LENGTH + 1) & (sign_char == ord("Z"))
+    )
+    digits = chars - ord("0")
+    offsets = np.where(
+        has_offset,
+        np.where(sign_char == ord("-"), -1, 1)
+        * (
+            (digits[:, 20] * 10 + digits[:, 21]) * 3600
+            + (digits[:, 23] * 10 + digits[:, 24]) * 60
+        ),
+        0,
+    )
+    fast = has_offset | is_utc
+    parsed = np.empty(len(strings), dtype="datetime64[s]")
+    parsed[fast] = strings[fast].astype(f"U{_LOCAL_LENGTH}").astype("datetime64[s]")
+    parsed -= offsets.astype("timedelta64[s]")
+    for index in np.flatnonzero(~fast):
+        stamp = parse_datetime(str(strings[index]))
+        offset = stamp.utcoffset()
+        parsed[index] = np.datetime64(stamp.replace(tzinfo=None), "s") - (
+            np.timedelta64(int(offset.total_seconds()), "s")
+            if offset is not None
+            else np.timedelta64(0, "s")
+        )
+    return parsed
+
+
+class _Columns(NamedTuple):
+    """The columns of data values, the strings are dictionary encoded."""
+
+    stamps: Any
+    values: Any
+    sensor_ids: tuple[Any, Sequence[str]]
+    types: tuple[Any, Sequence[str]]
+    positions: tuple[Any, Sequence[str | None]]
+
+
+def _without_missing(column: tuple[Any, Sequence[Any]]) -> tuple[Any, list[str]]:
+    """Remove None from the dictionary, the codes of missing rows become -1."""
+    np = _import_optional("numpy", "numpy", "to_numpy")
+    codes, dictionary = column
+    if None not in dictionary:
+        return codes, list(dictionary)
+    missing_code = dictionary.index(None)
+    codes = np.where(codes > missing_code, codes - 1, codes)
+    codes[column[0] == missing_code] = -1
+    return codes, [value for value in dictionary if value is not None]
+
+
+def _encode(values: Iterable[Any]) -> tuple[list[int], list[Any]]:
+    index: dict[Any, int] = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return codes, list(index)
+
+
+def _columns(data: ExportData) -> _Columns:
+    np = _import_optional("numpy", "numpy", "to_numpy")
+    if isinstance(data, DataValueBatch):
+        return _Columns(
+            stamps=np.asarray(data.stamps, dtype=np.int64).astype("datetime64[s]"),
+            values=np.asarray(data.values, dtype=np.int64),
+            sensor_ids=(
+                np.asarray(data.sensor_ids.codes, dtype=np.int32),
+                data.sensor_ids.dictionary,
+            ),
+            types=(
+                np.asarray(data.types.codes, dtype=np.int32),
+                [type_.value for type_ in data.types.dictionary],
+            ),
+            positions=(
+                np.asarray(data.positions.codes, dtype=np.int32),
+                data.positions.dictionary,
+            ),
+        )
+    rows: list[Mapping[str, Any]] = list(
+        json_loads(data) if isinstance(data, bytes) else data
+    )
+    columns = []
+    for key in ("sensorId", "type", "position"):
+        codes, dictionary = _encode(row.get(key) for row in rows)
+        columns.append((np.asarray(codes, dtype=np.int32), dictionary))
+    return _Columns(
+        stamps=parse_stamps([row["stamp"] for row in rows]),
+        values=np.asarray([row["value"] for row in rows]).astype(np.int64),
+        sensor_ids=columns[0],
+        types=columns[1],
+        positions=columns[2],
+    )
+
+
+def to_numpy(data: ExportData) -> dict[str, Any]:
+    """Export data values to numpy arrays, one per field of `DataValue`.
+
+    `stamp` is a UTC `datetime64[s]` array, `value` is an `int64` array
+    and `sensor_id`, `type` and `position` are object arrays.
+
+    :param data: a columnar batch, data value jsons or an undecoded response body
+    :return: a dictionary of numpy arrays by field name
+    """
+    np = _import_optional("numpy", "numpy", "to_numpy")
+    columns = _columns(data)
+
+    def decode(column: tuple[Any, Sequence[Any]]) -> Any:  # noqa: ANN401
+        codes, dictionary = column
+        decoded = np.empty(len(dictionary), dtype=object)
+        decoded[:] = dictionary
+        return decoded[codes]
+
+    return {
+        "sensor_id": decode(columns.sensor_ids),
+        "stamp": columns.stamps,
+        "type": decode(columns.types),
+        "position": decode(columns.positions),
+        "value": columns.values,
+    }
+
+
+def to_pandas(data: ExportData) -> Any:  # noqa: ANN401
+    """Export data values to a pandas DataFrame.
+
+    `stamp` is a UTC timestamp column, `value` is an `int64` column
+    and `sensor_id`, `type` and `position` are categorical columns.
+
+    :param data: a columnar batch, data value jsons or an undecoded response body
+    :return: a pandas DataFrame with a column per field of `DataValue`
+    """
+    pd = _import_optional("pandas", "pandas", "to_pandas")
+    columns = _columns(data)
+
+    def categorical(column: tuple[Any, Sequence[Any]]) -> Any:  # noqa: ANN401
+        # pandas marks missing values with the code -1 as well
+        codes, dictionary = _without_missing(column)
+        return pd.Categorical.from_codes(codes, categories=dictionary)
+
+    return pd.DataFrame({
+        "sensor_id": categorical(columns.sensor_ids),
+        "stamp": pd.to_datetime(columns.stamps, utc=True),
+        "type": categorical(columns.types),
+        "position": categorical(columns.positions),
+        "value": columns.values,
+    })
+
+
+def to_arrow(data: ExportData) -> Any:  # noqa: ANN401
+    """Export data values to an Arrow table.
+
+    `stamp` is a UTC `timestamp[s]` column, `value` is an `int64` column
+    and `sensor_id`, `type` and `position` are dictionary encoded columns.
+
+    :param data: a columnar batch, data value jsons or an undecoded response body
+    :return: a pyarrow Table with a column per field of `DataValue`
+    """
+    pa = _import_optional("pyarrow", "arrow", "to_arrow")
+    columns = _columns(data)
+
+    def dictionary_array(column: tuple[Any, Sequence[Any]]) -> Any:  # noqa: ANN401
+        codes, dictionary = _without_missing(column)
+        missing = codes < 0
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, type=pa.int32(), mask=missing if missing.any() else None),
+            pa.array(dictionary, type=pa.string()),
+        )
+
+    return pa.table({
+        "sensor_id": dictionary_array(columns.sensor_ids),
+        "stamp": pa.array(columns.stamps, type=pa.timestamp("s", tz="UTC")),
+        "type": dictionary_array(columns.types),
+        "position": dictionary_array(columns.positions),
+        "value": pa.array(columns.values, type=pa.int64()),
+    })
@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import itertools
+import json
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Any
+
+from pulseeco.api.merging import epoch_seconds
+from pulseeco.constants import CACHE_SETTLE_DELAY
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Awaitable, Callable, Sequence
+
+# a scope without a sensor ID or a data value type covers all of them
+ALL = "*"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS data_values (
+    city TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    sensor_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    stamp REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (city, kind, scope, sensor_id, type, stamp)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS data_values_type_stamp
+    ON data_values (city, kind, scope, type, stamp);
+CREATE TABLE IF NOT EXISTS coverage (
+    city TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    sensor_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_scope ON coverage (city, kind, sensor_id, type);
+"""
+
+Interval = tuple[float, float]
+
+
+def _is_scoped(kind: str) -> bool:
+    """Whether the data values of a kind depend on the scope of the query.
+
+    A raw data value is the same for every query that includes it,
+    but the averages without a sensor ID are the averages of the whole city.
+    """
+    return kind.startswith("avgData")
+
+
+def _scope_of(kind: str, type: str | None, sensor_id: str | None) -> str:
+    """Get the scope the data values of a query are stored under."""
+    if not _is_scoped(kind):
+        return ""
+    return f"{sensor_id or ALL}/{type or ALL}"
+
+
+def _from_timestamp(value: float) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(value, tz=datetime.timezone.utc)
+
+
+def _merge_intervals(intervals: Sequence[Interval]) -> list[Interval]:
+    """Merge overlapping and adjacent (1 second apart) closed intervals."""
+    merged: list[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _subtract_intervals(
+    start: float, end: float, covered: list[Interval]
+) -> list[Interval]:
+    """Get the parts of the closed interval that are not covered."""
+    gaps: list[Interval] = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start - 1))
+        cursor = max(cursor, covered_end + 1)
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class LocalMirror:
+    """Persistent SQLite mirror of the `dataRaw` and `avgData` data values.
+
+    The mirror remembers which intervals it holds for each
+    (city, end point, sensor ID, data value type) scope,
+    so only the missing intervals of a query are requested from the API
+    and the rest is read from disk.
+    A `dataRaw` scope without a sensor ID or a type also covers the queries
+    for a single sensor or type, an `avgData` scope covers only equal queries.
+    Intervals newer than `settle_delay` are never marked as covered,
+    because the sensors can still send data for them.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] = ":memory:",
+        settle_delay: datetime.timedelta = CACHE_SETTLE_DELAY,
+    ) -> None:
+        """Initialize the local mirror.
+
+        :param path: the path of the SQLite database file,
+            defaults to ':memory:' which does not persist
+        :param settle_delay: data newer than this can still change
+            and is requested again, defaults to 2 hours
+        """
+        self.settle_delay = settle_delay
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _scopes(
+        kind: str, type: str | None, sensor_id: str | None
+    ) -> list[tuple[str, str]]:
+        """Get the (sensor ID, type) scopes that cover a query."""
+        if _is_scoped(kind):
+            return [(sensor_id or ALL, type or ALL)]
+        sensor_ids = {sensor_id or ALL, ALL}
+        types = {type or ALL, ALL}
+        return [(s, t) for s in sensor_ids for t in types]
+
+    def _covered(
+        self, city: str, kind: str, type: str | None, sensor_id: str | None
+    ) -> list[Interval]:
+        intervals: list[Interval] = []
+        with self._lock:
+            for scope_sensor_id, scope_type in self._scopes(kind, type, sensor_id):
+                intervals.extend(
+                    self._connection.execute(
+                        "SELECT start, end FROM coverage "
+                        "WHERE city = ? AND kind = ? AND sensor_id = ? AND type = ?",
+                        (city, kind, scope_sensor_id, scope_type),
+                    )
+                )
+        return _merge_intervals(intervals)
+
+    def missing_intervals(
+        self,
+        city: str,
+        kind: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None = None,
+        sensor_id: str | None = None,
+    ) -> list[tuple[datetime.datetime, datetime.datetime]]:
+        """Get the intervals of a query that are not held by the mirror.
+
+        :param city: the city name
+        :param kind: the end point, ex. 'dataRaw' or 'avgData/day'
+        :param from_: the start datetime of the query
+        :param to: the end datetime of the query
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of (from, to) datetime pairs
+        """
+        covered = self._covered(city, kind, type, sensor_id)
+        return [
+            (_from_timestamp(start), _from_timestamp(end))
+            for start, end in _subtract_intervals(
+                epoch_seconds(from_), epoch_seconds(to), covered
+            )
+        ]
+
+    def store(
+        self,
+        city: str,
+        kind: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        data: Sequence[dict[str, Any]],
+        type: str | None = None,
+        sensor_id: str | None = None,
+    ) -> None:
+        """Store the data values of an interval and mark its settled part as held.
+
+        :param city: the city name
+        :param kind: the end point, ex. 'dataRaw' or 'avgData/day'
+        :param from_: the start datetime of the interval
+        :param to: the end datetime of the interval
+        :param data: the data value jsons returned by the API for the interval
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        """
+        data_scope = _scope_of(kind, type, sensor_id)
+        rows = [
+            (
+                city,
+                kind,
+                data_scope,
+                value.get("sensorId", sensor_id or ""),
+                value.get("type", type or ""),
+                epoch_seconds(value["stamp"]),
+                json.dumps(value, separators=(",", ":")),
+            )
+            for value in data
+        ]
+        start = epoch_seconds(from_)
+        settled = (
+            datetime.datetime.now(tz=datetime.timezone.utc) - self.settle_delay
+        ).timestamp()
+        end = min(epoch_seconds(to), settled)
+        scope = (city, kind, sensor_id or ALL, type or ALL)
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO data_values VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            if start > end:
+                return
+            intervals = self._connection.execute(
+                "SELECT start, end FROM coverage "
+                "WHERE city = ? AND kind = ? AND sensor_id = ? AND type = ?",
+                scope,
+            ).fetchall()
+            self._connection.execute(
+                "DELETE FROM coverage "
+                "WHERE city = ? AND kind = ? AND sensor_id = ? AND type = ?",
+                scope,
+            )
+            self._connection.executemany(
+                "INSERT INTO coverage VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (*scope, interval_start, interval_end)
+                    for interval_start, interval_end in _merge_intervals([
+                        *intervals,
+                        (start, end),
+                    ])
+                ],
+            )
+
+    def read(
+        self,
+        city: str,
+        kind: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: str | None = None,
+        sensor_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Read the stored data values of a query, sorted by their timestamp.
+
+        :param city: the city name
+        :param kind: the end point, ex. 'dataRaw' or 'avgData/day'
+        :param from_: the start datetime of the query
+        :param to: the end datetime of the query
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of data value jsons
+        """
+        query = (
+            "SELECT data FROM data_values "
+            "WHERE city = ? AND kind = ? AND scope = ? AND stamp BETWEEN ? AND ?"
+        )
+        params: list[Any] = [
+            city,
+            kind,
+            _scope_of(kind, type, sensor_id),
+            epoch_seconds(from_),
+            epoch_seconds(to),
+        ]
+        # the averages are stored under the exact scope of their query
+        if type is not None and not _is_scoped(kind):
+            query += " AND type = ?"
+            params.append(type)
+        if sensor_id is not None and not _is_scoped(kind):
+            query += " AND sensor_id = ?"
+            params.append(sensor_id)
+        query += " ORDER BY stamp, sensor_id, type"
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get(
+        self,
+        city: str,
+        kind: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        fetch: Callable[[datetime.datetime, datetime.datetime], list[Any]],
+        type: str | None = None,
+        sensor_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get the data values of a query, fetch only the missing intervals.
+
+        :param city: the city name
+        :param kind: the end point, ex. 'dataRaw' or 'avgData/day'
+        :param from_: the start datetime of the query
+        :param to: the end datetime of the query
+        :param fetch: requests the data values of a (from, to) interval
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of data value jsons, sorted by their timestamp
+        """
+        for missing_from, missing_to in self.missing_intervals(
+            city, kind, from_, to, type=type, sensor_id=sensor_id
+        ):
+            data = fetch(missing_from, missing_to)
+            self.store(
+                city,
+                kind,
+                missing_from,
+                missing_to,
+                data,
+                type=type,
+                sensor_id=sensor_id,
+            )
+        return self.read(city, kind, from_, to, type=type, sensor_id=sensor_id)
+
+    async def aget(
+        self,
+        city: str,
+        kind: str,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        fetch: Callable[[datetime.datetime, datetime.datetime], Awaitable[list[Any]]],
+        type: str | None = None,
+        sensor_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get the data values of a query, fetch only the missing intervals.
+
+        The missing intervals are fetched concurrently
+        and the database is accessed in a thread, so the event loop is not blocked.
+
+        :param city: the city name
+        :param kind: the end point, ex. 'dataRaw' or 'avgData/day'
+        :param from_: the start datetime of the query
+        :param to: the end datetime of the query
+        :param fetch: requests the data values of a (from, to) interval
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of data value jsons, sorted by their timestamp
+        """
+        loop = asyncio.get_running_loop()
+        missing = await loop.run_in_executor(
+            None,
+            lambda: self.missing_intervals(
+                city, kind, from_, to, type=type, sensor_id=sensor_id
+            ),
+        )
+        fetched = await asyncio.gather(*itertools.starmap(fetch, missing))
+
+        def store_fetched() -> None:
+            for (missing_from, missing_to), data in zip(missing, fetched):
+                self.store(
+                    city,
+                    kind,
+                    missing_from,
+                    missing_to,
+                    data,
+                    type=type,
+                    sensor_id=sensor_id,
+                )
+
+        await loop.run_in_executor(None, store_fetched)
+        return await loop.run_in_executor(
+            None,
+            lambda: self.read(city, kind, from_, to, type=type, sensor_id=sensor_id),
+        )
@@ -2,12 +2,22 @@ from __future__ import annotations
 
 import datetime  # noqa: TC003
 import warnings
-from typing import Annotated, Any, Optional
+from typing import TYPE_CHECKING, Annotated, Any, Optional
+
+from pulseeco.api.merging import epoch_seconds
 
 from .enums import DataValueType, SensorStatus, SensorType  # noqa: TC001
 
 try:
-    from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, TypeAdapter
+    from pydantic import (
+        BaseModel,
+        BeforeValidator,
+        ConfigDict,
+        Field,
+        TypeAdapter,
+        ValidationInfo,
+        field_validator,
+    )
 except ImportError:  # pragma: no cover
     warnings.warn(
         "`pydantic` is not installed but is required for `PulseEcoClient`"
@@ -17,6 +27,9 @@ except ImportError:  # pragma: no cover
     )
     raise
 
+if TYPE_CHECKING:
+    from pulseeco.api.merging import DataValueKey
+
 
 class Sensor(BaseModel):
     sensor_id: str = Field(alias="sensorId", description="The unique ID of the sensor")
@@ -48,10 +61,32 @@ class DataValue(BaseModel):
         ", not included with newer data, prefer stamp",
     )
 
+    @field_validator("sensor_id", "position")
+    @classmethod
+    def _intern(cls, value: str | None, info: ValidationInfo) -> str | None:
+        """Intern the value with the `intern_table` of the validation context."""
+        if value is None or not info.context:
+            return value
+        intern_table = info.context.get("intern_table")
+        return intern_table.intern(value) if intern_table is not None else value
+
 
 DataValues = TypeAdapter(list[DataValue])
 
 
+def data_value_key(data_value: DataValue) -> DataValueKey:
+    """Get the order and identity of a data value.
+
+    :param data_value: a data value
+    :return: a tuple of (epoch seconds of the stamp, sensor ID, type)
+    """
+    return (
+        epoch_seconds(data_value.stamp),
+        data_value.sensor_id,
+        data_value.type.value,
+    )
+
+
 def validate_na(v: Any) -> Any | None:  # noqa: ANN401
     """Validate `N/A` value."""
     if v == "N/A":
@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from pulseeco.api.retry import DEFAULT_RETRY_POLICY
+from pulseeco.api.scheduler import LazyThreadPool, LoopSemaphores
+from pulseeco.constants import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY_PER_HOST,
+    DEFAULT_MULTI_CITY_MAX_CONCURRENCY,
+    DEFAULT_WATCH_INTERVAL,
+    DEFAULT_WATCH_JITTER,
+    DEFAULT_WATCH_QUEUE_SIZE,
+    DEFAULT_WATCH_SEEN_SIZE,
+    PULSE_ECO_BASE_URL_FORMAT,
+)
+
+from .client import PulseEcoClient
+from .watch import MeasurementWatcher
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Awaitable, Callable, Iterable, Mapping
+    from types import TracebackType
+
+    from pulseeco.api.http_clients import ASYNC_CLIENT, CLIENT
+    from pulseeco.api.retry import RetryPolicy
+
+    from .enums import AveragePeriod, DataValueType
+    from .models import DataValue, Overall, Sensor
+    from .watch import WatchSource
+
+T = TypeVar("T")
+_T = TypeVar("_T", bound="MultiCityPulseEcoClient")
+
+
+class MultiCityResult(Generic[T]):
+    """Results of a query to multiple cities, keyed by city name.
+
+    A failed city does not abort the query, its exception is kept in `errors`.
+    """
+
+    def __init__(self) -> None:
+        self.results: dict[str, T] = {}
+        self.errors: dict[str, Exception] = {}
+
+    @property
+    def ok(self) -> bool:
+        """Whether the query succeeded for all cities."""
+        return len(self.errors) == 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(results={self.results!r}, errors={self.errors!r})"
+        )
+
+
+class MultiCityPulseEcoClient:  # noqa: PLR0904
+    """High level pulse.eco client for multiple cities.
+
+    Holds one `PulseEcoClient` per city, so the connection pools are reused
+    between queries, and queries all cities concurrently.
+    """
+
+    def __init__(
+        self,
+        cities: Iterable[str],
+        auth: Mapping[str, tuple[str, str]] | None = None,
+        base_url: str = PULSE_ECO_BASE_URL_FORMAT,
+        client: CLIENT | None = None,
+        async_client: ASYNC_CLIENT | None = None,
+        max_concurrency: int = DEFAULT_MULTI_CITY_MAX_CONCURRENCY,
+        max_concurrency_per_city: int = DEFAULT_MAX_CONCURRENCY,
+        max_concurrency_per_host: int = DEFAULT_MAX_CONCURRENCY_PER_HOST,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        rate_limit: float | None = None,
+    ) -> None:
+        """Initialize the multi-city pulse.eco client.
+
+        :param cities: the city names, duplicates are ignored
+        :param auth: a mapping of city name to a tuple of (email, password),
+            defaults to None, cities without auth use the environment variables
+        :param base_url: the base URL of the API, defaults to
+            'https://{city_name}.pulse.eco/rest/{end_point}'
+        :param client: a sync http client shared by all cities,
+            defaults to None which creates a keep-alive client per city
+        :param async_client: an async http client shared by all cities,
+            defaults to None which will run the sync clients in thread pools
+        :param max_concurrency: the maximum number of cities queried at once,
+            defaults to 16
+        :param max_concurrency_per_city: the maximum number of concurrent chunk
+            requests of each city for the async chunked methods, defaults to 4
+        :param max_concurrency_per_host: the maximum number of concurrent
+            chunk requests to one host, defaults to 8
+        :param retry_policy: the backoff and retries of failed requests,
+            defaults to 3 retries with exponential backoff and jitter
+        :param rate_limit: the maximum number of requests per second to each host,
+            defaults to None which does not limit the rate
+        """
+        if max_concurrency < 1:
+            raise ValueError("`max_concurrency` should be at least 1")
+        if auth is None:
+            auth = {}
+        self._clients = {
+            city_name: PulseEcoClient(
+                city_name=city_name,
+                auth=auth.get(city_name),
+                base_url=base_url,
+                client=client,
+                async_client=async_client,
+                max_concurrency=max_concurrency_per_city,
+                max_concurrency_per_host=max_concurrency_per_host,
+                retry_policy=retry_policy,
+                rate_limit=rate_limit,
+            )
+            for city_name in dict.fromkeys(cities)
+        }
+        self._thread_pool = LazyThreadPool(
+            max_concurrency, thread_name_prefix="pulseeco-multi-city"
+        )
+        self._semaphores = LoopSemaphores(max_concurrency)
+
+    @property
+    def clients(self) -> Mapping[str, PulseEcoClient]:
+        """The client of each city, keyed by city name."""
+        return self._clients
+
+    def close(self) -> None:
+        """Close the http clients and thread pools owned by the city clients.
+
+        Clients passed to the constructor are not closed.
+        """
+        self._thread_pool.shutdown()
+        for client in self._clients.values():
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close the http clients and thread pools owned by the city clients.
+
+        Clients passed to the constructor are not closed.
+        """
+        self._thread_pool.shutdown()
+        for client in self._clients.values():
+            await client.aclose()
+
+    def __enter__(self: _T) -> _T:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    async def __aenter__(self: _T) -> _T:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    def map(self, func: Callable[[PulseEcoClient], T]) -> MultiCityResult[T]:
+        """Call a function with the client of each city concurrently.
+
+        :param func: a function that queries a city client
+        :return: the result or the exception of each city
+        """
+        executor = self._thread_pool.get()
+        futures = {
+            city_name: executor.submit(func, client)
+            for city_name, client in self._clients.items()
+        }
+        result: MultiCityResult[T] = MultiCityResult()
+        for city_name, future in futures.items():
+            try:
+                result.results[city_name] = future.result()
+            except Exception as e:  # noqa: PERF203
+                result.errors[city_name] = e
+        return result
+
+    async def amap(
+        self, func: Callable[[PulseEcoClient], Awaitable[T]]
+    ) -> MultiCityResult[T]:
+        """Await a function with the client of each city concurrently.
+
+        :param func: an async function that queries a city client
+        :return: the result or the exception of each city
+        """
+
+        async def run(client: PulseEcoClient) -> T:
+            async with self._semaphores.get():
+                return await func(client)
+
+        city_results = await asyncio.gather(
+            *(run(client) for client in self._clients.values()),
+            return_exceptions=True,
+        )
+        result: MultiCityResult[T] = MultiCityResult()
+        for city_name, city_result in zip(self._clients, city_results):
+            if isinstance(city_result, Exception):
+                result.errors[city_name] = city_result
+            elif isinstance(city_result, BaseException):
+                raise city_result
+            else:
+                result.results[city_name] = city_result
+        return result
+
+    def watch(
+        self,
+        interval: float | Mapping[str, float] = DEFAULT_WATCH_INTERVAL,
+        jitter: float = DEFAULT_WATCH_JITTER,
+        source: WatchSource = "current",
+        max_seen: int = DEFAULT_WATCH_SEEN_SIZE,
+        max_queue_size: int = DEFAULT_WATCH_QUEUE_SIZE,
+    ) -> MeasurementWatcher:
+        """Watch the new data values of every city.
+
+        Only the data values not seen before are validated and yielded.
+        Close the watcher with `aclose` or by using it as an async context manager.
+
+        :param interval: the seconds between polls,
+            or a mapping of city name to the seconds between polls, defaults to 60
+        :param jitter: the fraction of the interval the polls are randomly moved by,
+            defaults to 0.1
+        :param source: poll `current` or `data24h`, defaults to 'current'
+        :param max_seen: the number of seen data values remembered,
+            defaults to 100000
+        :param max_queue_size: the number of new data values that wait
+            to be consumed before polling pauses, defaults to 1024
+        :return: an async iterator of the new data values
+        """
+        return MeasurementWatcher(
+            {
+                city_name: client.trusted()
+                for city_name, client in self._clients.items()
+            },
+            interval=interval,
+            jitter=jitter,
+            source=source,
+            max_seen=max_seen,
+            max_queue_size=max_queue_size,
+        )
+
+    def sensors(self) -> MultiCityResult[list[Sensor]]:
+        """Get all sensors for each city.
+
+        :return: a list of sensors for each city
+        """
+        return self.map(PulseEcoClient.sensors)
+
+    async def asensors(self) -> MultiCityResult[list[Sensor]]:
+        """Get all sensors for each city.
+
+        :return: a list of sensors for each city
+        """
+        return await self.amap(PulseEcoClient.asensors)
+
+    def data_raw(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType | None = None,
+        sensor_id: str | None = None,
+    ) -> MultiCityResult[list[DataValue]]:
+        """Get raw data for each city.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of data values for each city
+        """
+        return self.map(
+            lambda client: client.data_raw(
+                from_=from_, to=to, type=type, sensor_id=sensor_id
+            )
+        )
+
+    async def adata_raw(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType | None = None,
+        sensor_id: str | None = None,
+    ) -> MultiCityResult[list[DataValue]]:
+        """Get raw data for each city.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of data values for each city
+        """
+        return await self.amap(
+            lambda client: client.adata_raw(
+                from_=from_, to=to, type=type, sensor_id=sensor_id
+            )
+        )
+
+    def avg_data(
+        self,
+        period: AveragePeriod,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType,
+        sensor_id: str | None = None,
+    ) -> MultiCityResult[list[DataValue]]:
+        """Get average data for each city.
+
+        :param period: the period of the average data
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of average data values for each city
+        """
+        return self.map(
+            lambda client: client.avg_data(
+                period=period, from_=from_, to=to, type=type, sensor_id=sensor_id
+            )
+        )
+
+    async def aavg_data(
+        self,
+        period: AveragePeriod,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType,
+        sensor_id: str | None = None,
+    ) -> MultiCityResult[list[DataValue]]:
+        """Get average data for each city.
+
+        :param period: the period of the average data
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of average data values for each city
+        """
+        return await self.amap(
+            lambda client: client.aavg_data(
+                period=period, from_=from_, to=to, type=type, sensor_id=sensor_id
+            )
+        )
+
+    def data24h(self) -> MultiCityResult[list[DataValue]]:
+        """Get 24h data for each city.
+
+        :return: a list of data values for the past 24 hours for each city
+        """
+        return self.map(PulseEcoClient.data24h)
+
+    async def adata24h(self) -> MultiCityResult[list[DataValue]]:
+        """Get 24h data for each city.
+
+        :return: a list of data values for the past 24 hours for each city
+        """
+        return await self.amap(PulseEcoClient.adata24h)
+
+    def current(self) -> MultiCityResult[list[DataValue]]:
+        """Get the last received valid data for each sensor in each city.
+
+        :return: a list of current data values for each city
+        """
+        return self.map(PulseEcoClient.current)
+
+    async def acurrent(self) -> MultiCityResult[list[DataValue]]:
+        """Get the last received valid data for each sensor in each city.
+
+        :return: a list of current data values for each city
+        """
+        return await self.amap(PulseEcoClient.acurrent)
+
+    def overall(self) -> MultiCityResult[Overall]:
+        """Get the current average data for all sensors per value for each city.
+
+        :return: the overall data for each city
+        """
+        return self.map(PulseEcoClient.overall)
+
+    async def aoverall(self) -> MultiCityResult[Overall]:
+        """Get the current average data for all sensors per value for each city.
+
+        :return: the overall data for each city
+        """
+        return await self.amap(PulseEcoClient.aoverall)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any
+
+from pulseeco.api.data_types import DataRawQuery
+from pulseeco.constants import SENSOR_CACHE_TTL
+
+from .enums import DataValueType, SensorStatus
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pulseeco.api.base import PulseEcoAPIBase
+
+    from .models import Sensor
+    from .registry import SensorRegistry
+
+# sensors with these statuses do not send data
+SKIPPED_SENSOR_STATUSES = frozenset({
+    SensorStatus.INACTIVE,
+    SensorStatus.BANNED,
+    SensorStatus.REQUESTED,
+})
+
+
+def plan_city_wide_queries(
+    sensors: Iterable[Sensor], types: Iterable[DataValueType] | None = None
+) -> list[DataRawQuery]:
+    """Split a raw data query of a whole city into one query per sensor and type.
+
+    Queries without a sensor ID and a type often fail for a whole city,
+    while every query of a sensor and type is small.
+    Sensors that do not send data are skipped.
+
+    :param sensors: the sensors of the city
+    :param types: the data value types, defaults to None which uses all of them
+    :return: a list of queries, one for each sensor and type
+    """
+    type_values = [type_.value for type_ in (DataValueType if types is None else types)]
+    return [
+        DataRawQuery(type=type_value, sensor_id=sensor.sensor_id)
+        for sensor in sensors
+        if sensor.status not in SKIPPED_SENSOR_STATUSES
+        for type_value in type_values
+    ]
+
+
+def reported_types(overall: Any) -> list[DataValueType]:  # noqa: ANN401
+    """Get the data value types a city reports from its overall values.
+
+    :param overall: the json of the `overall` end point
+    :return: the types with a value, all of them if none has a value
+    """
+    values = overall.get("values") or {}
+    types = [
+        type_ for type_ in DataValueType if values.get(type_.value) not in {None, "N/A"}
+    ]
+    return types or list(DataValueType)
+
+
+class ReportedTypeCache:
+    """Cache of the data value types a city reports in its overall values.
+
+    The types are reloaded when older than the TTL,
+    so the callers do not request the overall values every time.
+    """
+
+    def __init__(
+        self, pulse_eco_api: PulseEcoAPIBase, ttl: float = SENSOR_CACHE_TTL
+    ) -> None:
+        """Initialize the cache.
+
+        :param pulse_eco_api: the pulse.eco API wrapper of the city
+        :param ttl: the seconds after which the types are reloaded,
+            defaults to 3600
+        """
+        self._pulse_eco_api = pulse_eco_api
+        self._ttl = ttl
+        self._types: list[DataValueType] | None = None
+        self._loaded_at = 0.0
+
+    def _expired(self) -> bool:
+        return time.time() - self._loaded_at >= self._ttl
+
+    def get(self) -> list[DataValueType]:
+        """Get the data value types the city reports.
+
+        :return: the reported data value types
+        """
+        if self._types is None or self._expired():
+            self._types = reported_types(self._pulse_eco_api.overall())
+            self._loaded_at = time.time()
+        return self._types
+
+    async def aget(self) -> list[DataValueType]:
+        """Get the data value types the city reports.
+
+        :return: the reported data value types
+        """
+        if self._types is None or self._expired():
+            self._types = reported_types(await self._pulse_eco_api.aoverall())
+            self._loaded_at = time.time()
+        return self._types
+
+
+class CityWideQueryPlanner:
+    """Planner of the queries of city wide raw data queries.
+
+    The sensors are read from a sensor registry and the data value types
+    from a cache of the reported types,
+    so planning a query does not request the metadata every time.
+    """
+
+    def __init__(
+        self, sensor_registry: SensorRegistry, type_cache: ReportedTypeCache
+    ) -> None:
+        """Initialize the planner.
+
+        :param sensor_registry: the sensor registry of the city
+        :param type_cache: the cache of the data value types the city reports
+        """
+        self._sensor_registry = sensor_registry
+        self._type_cache = type_cache
+
+    def plan(self) -> list[DataRawQuery]:
+        """Plan the queries of a city wide raw data query.
+
+        :return: a list of queries, one for each sensor and reported type
+        """
+        return plan_city_wide_queries(
+            self._sensor_registry.sensors(), self._type_cache.get()
+        )
+
+    async def aplan(self) -> list[DataRawQuery]:
+        """Plan the queries of a city wide raw data query.
+
+        :return: a list of queries, one for each sensor and reported type
+        """
+        return plan_city_wide_queries(
+            await self._sensor_registry.asensors(), await self._type_cache.aget()
+        )
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import bisect
+import datetime
+import heapq
+import operator
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from pulseeco.api.http_clients import is_http_error, is_transient_error
+from pulseeco.constants import DELTA_POLL_MAX_LOOKBACK, DELTA_POLL_WINDOW
+
+from .batch import QuerySpec
+from .models import data_value_key
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from pulseeco.api.merging import DataValueKey
+
+    from .client import PulseEcoClient
+    from .enums import DataValueType
+    from .models import DataValue
+
+Subscriber = Callable[[list["DataValue"]], None]
+
+
+class DeltaPoller:
+    """Polls the new data values of a city incrementally.
+
+    The first poll gets the last 24 hours with `data24h`,
+    every next poll requests only the data values newer than the newest stamp
+    seen per sensor and type with `dataRaw`, and the types the city reports
+    but were not seen yet from the lookback, falling back to `current`
+    if the request fails with a connection error or an error status.
+    The data values of the rolling window are kept in `buffer`
+    and the new data values of every poll are handed to the subscribers.
+    Create one with `PulseEcoClient.poller`.
+    """
+
+    def __init__(
+        self,
+        client: PulseEcoClient,
+        window: datetime.timedelta = DELTA_POLL_WINDOW,
+        max_lookback: datetime.timedelta = DELTA_POLL_MAX_LOOKBACK,
+    ) -> None:
+        """Initialize the delta poller.
+
+        :param client: the client of the city
+        :param window: the span of the rolling buffer, defaults to 24 hours
+        :param max_lookback: how far back a poll requests new data values,
+            late data values older than this are not seen, defaults to 2 hours
+        """
+        self._client = client
+        self._window = window
+        self._max_lookback = max_lookback
+        self._watermarks: dict[tuple[str, DataValueType], datetime.datetime] = {}
+        self._buffer: list[DataValue] = []
+        self._buffer_keys: list[DataValueKey] = []
+        self._subscribers: list[Subscriber] = []
+
+    @property
+    def watermarks(self) -> Mapping[tuple[str, DataValueType], datetime.datetime]:
+        """The newest stamp seen per (sensor ID, type)."""
+        return self._watermarks
+
+    @property
+    def buffer(self) -> list[DataValue]:
+        """The data values of the rolling window, ordered by stamp."""
+        return list(self._buffer)
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """Hand the new data values of every poll to a subscriber.
+
+        :param subscriber: called with the new data values of every poll
+            that found new data values
+        :return: a function that unsubscribes the subscriber
+        """
+        self._subscribers.append(subscriber)
+        return lambda: self._subscribers.remove(subscriber)
+
+    def _tail_specs(
+        self, now: datetime.datetime, types: Iterable[DataValueType]
+    ) -> list[QuerySpec]:
+        """Get a query per type from the oldest recent watermark of the type.
+
+        The watermarks older than the lookback are left out, so a sensor that
+        stopped sending does not make every poll request the whole lookback.
+        The reported types without a watermark are requested from the lookback.
+
+        :param now: the end of the queries
+        :param types: the data value types the city reports
+        """
+        cutoff = now - self._max_lookback
+        oldest: dict[DataValueType, datetime.datetime] = dict.fromkeys(types, cutoff)
+        for (_, type_), stamp in self._watermarks.items():
+            if stamp < cutoff:
+                oldest.setdefault(type_, cutoff)
+            elif (
+                type_ not in oldest or oldest[type_] == cutoff or stamp < oldest[type_]
+            ):
+                oldest[type_] = stamp
+        return [
+            QuerySpec(from_=stamp, to=now, type=type_)
+            for type_, stamp in sorted(oldest.items())
+        ]
+
+    def _update(
+        self, data_values: list[DataValue], now: datetime.datetime
+    ) -> list[DataValue]:
+        """Keep the data values newer than the watermarks and notify subscribers."""
+        watermarks = self._watermarks
+        # compared to the watermarks before the poll, a sensor can send
+        # many data values between polls and they need not be ordered
+        new = []
+        for data_value in data_values:
+            key = (data_value.sensor_id, data_value.type)
+            watermark = watermarks.get(key)
+            if watermark is None or data_value.stamp > watermark:
+                new.append(data_value)
+        for data_value in new:
+            key = (data_value.sensor_id, data_value.type)
+            watermark = watermarks.get(key)
+            if watermark is None or data_value.stamp > watermark:
+                watermarks[key] = data_value.stamp
+        new.sort(key=data_value_key)
+        new_keys = list(map(data_value_key, new))
+        # the new data values are mostly newer than the buffer, merge if not
+        if new_keys and self._buffer_keys and new_keys[0] < self._buffer_keys[-1]:
+            merged = list(
+                heapq.merge(
+                    zip(self._buffer_keys, self._buffer),
+                    zip(new_keys, new),
+                    key=operator.itemgetter(0),
+                )
+            )
+            self._buffer_keys = [item[0] for item in merged]
+            self._buffer = [item[1] for item in merged]
+        else:
+            self._buffer_keys.extend(new_keys)
+            self._buffer.extend(new)
+        cutoff = bisect.bisect_left(
+            self._buffer_keys, ((now - self._window).timestamp(),)
+        )
+        del self._buffer_keys[:cutoff]
+        del self._buffer[:cutoff]
+        if new:
+            for subscriber in list(self._subscribers):
+                subscriber(new)
+        return new
+
+    def poll(self) -> list[DataValue]:
+        """Get the new data values since the last poll.
+
+        :return: the new data values ordered by stamp
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        if not self._watermarks:
+            return self._update(self._client.data24h(), now)
+        try:
+            data_values = [
+                data_value
+                for result in self._client.query_many(
+                    self._tail_specs(now, self._client.reported_types())
+                )
+                for data_value in result
+            ]
+        except Exception as e:
+            if not (is_transient_error(e) or is_http_error(e)):
+                raise
+            data_values = self._client.current()
+        return self._update(data_values, now)
+
+    async def apoll(self) -> list[DataValue]:
+        """Get the new data values since the last poll.
+
+        :return: the new data values ordered by stamp
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        if not self._watermarks:
+            return self._update(await self._client.adata24h(), now)
+        try:
+            data_values = [
+                data_value
+                for result in await self._client.aquery_many(
+                    self._tail_specs(now, await self._client.areported_types())
+                )
+                for data_value in result
+            ]
+        except Exception as e:
+            if not (is_transient_error(e) or is_http_error(e)):
+                raise
+            data_values = await self._client.acurrent()
+        return self._update(data_values, now)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from pulseeco.utils import parse_datetime
+
+from .enums import DataValueType
+from .models import DataValue
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Iterable, Mapping
+
+
+class DataValueRecord:
+    """Immutable lightweight data value, built without validation.
+
+    The record keeps the data value json as returned by the API,
+    the fields have the same names as `DataValue`
+    and are converted lazily on first access.
+    Use `validate` to get a fully validated `DataValue`.
+    """
+
+    __slots__ = ("_raw", "_stamp", "_type", "_value")
+
+    _stamp: datetime.datetime
+    _type: DataValueType
+    _value: int
+
+    def __init__(self, raw: Mapping[str, Any]) -> None:
+        """Initialize the data value record.
+
+        :param raw: the data value json
+        """
+        self._raw = raw
+
+    @property
+    def raw(self) -> Mapping[str, Any]:
+        """The data value json as returned by the API."""
+        return self._raw
+
+    @property
+    def sensor_id(self) -> str:
+        """The unique ID of the sensor."""
+        return self._raw["sensorId"]  # type: ignore[no-any-return]
+
+    @property
+    def stamp(self) -> datetime.datetime:
+        """Timestamp of when the measurement was taken."""
+        try:
+            return self._stamp
+        except AttributeError:
+            self._stamp = stamp = parse_datetime(self._raw["stamp"])
+            return stamp
+
+    @property
+    def type(self) -> DataValueType:
+        """The type of the data value taken."""
+        try:
+            return self._type
+        except AttributeError:
+            self._type = type_ = DataValueType(self._raw["type"])
+            return type_
+
+    @property
+    def position(self) -> str | None:
+        """Latitude and longitude GPS coordinates of the sensor."""
+        return self._raw.get("position")
+
+    @property
+    def value(self) -> int:
+        """The actual value of the measurement taken."""
+        try:
+            return self._value
+        except AttributeError:
+            self._value = value = int(self._raw["value"])
+            return value
+
+    @property
+    def year(self) -> int | None:
+        """Year when the measurement was taken, not included with newer data."""
+        year = self._raw.get("year")
+        return int(year) if year is not None else None
+
+    def validate(self) -> DataValue:
+        """Fully validate the record.
+
+        :raises pydantic.ValidationError: if the data value is not valid
+        :return: a validated data value
+        """
+        return DataValue.model_validate(self._raw)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DataValueRecord):
+            return NotImplemented
+        return self._raw == other._raw
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(sensor_id={self.sensor_id!r}"
+            f", stamp={self._raw['stamp']!r}, type={self._raw['type']!r}"
+            f", position={self.position!r}, value={self._raw['value']!r})"
+        )
+
+
+def to_records(data: Iterable[Mapping[str, Any]]) -> list[DataValueRecord]:
+    """Wrap data value jsons into records without validating them.
+
+    :param data: the data value jsons
+    :return: a list of data value records
+    """
+    return list(map(DataValueRecord, data))
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pulseeco.constants import SENSOR_CACHE_TTL
+
+from .models import Sensor, Sensors
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pulseeco.api.base import PulseEcoAPIBase
+
+
+class SensorRegistry:
+    """In-memory registry of the sensors of a city.
+
+    The sensors are loaded with one `sensors` request and reloaded when older
+    than the TTL, `get` and `get_many` are answered from memory
+    and only unknown sensor IDs are requested with the `sensor/{id}` end point.
+    The registry can be persisted to a json file, so a warm start needs no request.
+    """
+
+    def __init__(
+        self,
+        pulse_eco_api: PulseEcoAPIBase,
+        ttl: float = SENSOR_CACHE_TTL,
+        path: str | Path | None = None,
+        background_refresh: bool = False,
+    ) -> None:
+        """Initialize the sensor registry.
+
+        :param pulse_eco_api: the pulse.eco API wrapper of the city
+        :param ttl: the seconds after which the sensors are reloaded,
+            defaults to 3600
+        :param path: a json file the sensors are persisted to and loaded from,
+            defaults to None which keeps them only in memory
+        :param background_refresh: whether expired sensors are reloaded in the
+            background while the expired sensors are served, defaults to False
+        """
+        self._pulse_eco_api = pulse_eco_api
+        self._ttl = ttl
+        self._path = Path(path) if path is not None else None
+        self._background_refresh = background_refresh
+        self._sensors: dict[str, Sensor] = {}
+        self._loaded_at: float | None = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._refresh_task: asyncio.Task[None] | None = None
+        # the exception of the last reload, if it failed
+        self.last_error: Exception | None = None
+        if self._path is not None:
+            self._load()
+
+    @property
+    def loaded_at(self) -> float | None:
+        """The epoch seconds when the sensors were loaded, None if never."""
+        return self._loaded_at
+
+    @property
+    def expired(self) -> bool:
+        """Whether the sensors are older than the TTL or were never loaded."""
+        return self._loaded_at is None or time.time() - self._loaded_at >= self._ttl
+
+    def _load(self) -> None:
+        """Load the persisted sensors, a missing or invalid file is ignored."""
+        if self._path is None or not self._path.exists():
+            return
+        try:
+            data = json.loads(self._path.read_bytes())
+            sensors = Sensors.validate_python(data["sensors"])
+            loaded_at = float(data["loaded_at"])
+        except (ValueError, KeyError, TypeError):
+            return
+        self._set(sensors, loaded_at, persist=False)
+
+    def _set(self, sensors: list[Sensor], loaded_at: float, persist: bool) -> None:
+        with self._lock:
+            self._sensors = {sensor.sensor_id: sensor for sensor in sensors}
+            self._loaded_at = loaded_at
+        if persist and self._path is not None:
+            data: dict[str, Any] = {
+                "loaded_at": loaded_at,
+                "sensors": [
+                    sensor.model_dump(mode="json", by_alias=True) for sensor in sensors
+                ],
+            }
+            # write to a unique temporary file first, so a crash does not corrupt
+            # the file and concurrent writers do not clobber each other
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self._path.parent,
+                prefix=self._path.name,
+                suffix=".tmp",
+                delete=False,
+            ) as temporary_file:
+                try:
+                    json.dump(data, temporary_file)
+                except BaseException:
+                    temporary_file.close()
+                    os.unlink(temporary_file.name)
+                    raise
+            os.replace(temporary_file.name, self._path)
+
+    def refresh(self) -> None:
+        """Reload the sensors of the city."""
+        sensors = Sensors.validate_python(self._pulse_eco_api.sensors())
+        self._set(sensors, time.time(), persist=True)
+
+    async def arefresh(self) -> None:
+        """Reload the sensors of the city."""
+        sensors = Sensors.validate_python(await self._pulse_eco_api.asensors())
+        self._set(sensors, time.time(), persist=True)
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            self.last_error = e
+        else:
+            self.last_error = None
+        finally:
+            self._refreshing = False
+
+    def _ensure_loaded(self) -> None:
+        """Reload the sensors if expired, the expired sensors are kept on failure."""
+        if not self.expired:
+            return
+        if self._sensors and self._background_refresh:
+            with self._lock:
+                if self._refreshing:
+                    return
+                self._refreshing = True
+            threading.Thread(
+                target=self._refresh_in_background,
+                name="pulseeco-sensor-registry",
+                daemon=True,
+            ).start()
+            return
+        try:
+            self.refresh()
+        except Exception as e:
+            if not self._sensors:
+                raise
+            self.last_error = e
+        else:
+            self.last_error = None
+
+    async def _arefresh_in_background(self) -> None:
+        try:
+            await self.arefresh()
+        except Exception as e:
+            self.last_error = e
+        else:
+            self.last_error = None
+
+    async def _aensure_loaded(self) -> None:
+        """Reload the sensors if expired, the expired sensors are kept on failure."""
+        if not self.expired:
+            return
+        if self._sensors and self._background_refresh:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.ensure_future(
+                    self._arefresh_in_background()
+                )
+            return
+        try:
+            await self.arefresh()
+        except Exception as e:
+            if not self._sensors:
+                raise
+            self.last_error = e
+        else:
+            self.last_error = None
+
+    def _remember(self, sensor: Sensor) -> Sensor:
+        with self._lock:
+            self._sensors[sensor.sensor_id] = sensor
+        return sensor
+
+    def sensors(self) -> list[Sensor]:
+        """Get all sensors of the city.
+
+        :return: a list of sensors
+        """
+        self._ensure_loaded()
+        return list(self._sensors.values())
+
+    async def asensors(self) -> list[Sensor]:
+        """Get all sensors of the city.
+
+        :return: a list of sensors
+        """
+        await self._aensure_loaded()
+        return list(self._sensors.values())
+
+    def get(self, sensor_id: str) -> Sensor:
+        """Get a sensor by its ID, requested only if it is unknown.
+
+        :param sensor_id: the unique ID of the sensor
+        :return: a sensor
+        """
+        self._ensure_loaded()
+        sensor = self._sensors.get(sensor_id)
+        if sensor is not None:
+            return sensor
+        return self._remember(
+            Sensor.model_validate(self._pulse_eco_api.sensor(sensor_id=sensor_id))
+        )
+
+    async def aget(self, sensor_id: str) -> Sensor:
+        """Get a sensor by its ID, requested only if it is unknown.
+
+        :param sensor_id: the unique ID of the sensor
+        :return: a sensor
+        """
+        await self._aensure_loaded()
+        sensor = self._sensors.get(sensor_id)
+        if sensor is not None:
+            return sensor
+        return self._remember(
+            Sensor.model_validate(
+                await self._pulse_eco_api.asensor(sensor_id=sensor_id)
+            )
+        )
+
+    def get_many(self, sensor_ids: Iterable[str]) -> dict[str, Sensor]:
+        """Get many sensors by their IDs, only the unknown ones are requested.
+
+        :param sensor_ids: the unique IDs of the sensors, duplicates are ignored
+        :return: a dictionary of sensors by ID
+        """
+        self._ensure_loaded()
+        return {
+            sensor_id: self.get(sensor_id) for sensor_id in dict.fromkeys(sensor_ids)
+        }
+
+    async def aget_many(self, sensor_ids: Iterable[str]) -> dict[str, Sensor]:
+        """Get many sensors by their IDs, the unknown ones are requested concurrently.
+
+        :param sensor_ids: the unique IDs of the sensors, duplicates are ignored
+        :return: a dictionary of sensors by ID
+        """
+        await self._aensure_loaded()
+        unique_ids = list(dict.fromkeys(sensor_ids))
+        sensors = await asyncio.gather(*map(self.aget, unique_ids))
+        return dict(zip(unique_ids, sensors))
+
+    def clear(self) -> None:
+        """Forget the sensors, they are reloaded on the next lookup."""
+        with self._lock:
+            self._sensors = {}
+            self._loaded_at = None
+        if self._path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                self._path.unlink()
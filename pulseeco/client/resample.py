@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import datetime
+import itertools
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, Literal, Union
+
+from .columnar import DataValueBatch
+from .enums import AveragePeriod
+from .models import DataValue
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+# a period of `avgData`, 'hour', or a custom bucket width
+Bucket = Union[AveragePeriod, Literal["hour"], datetime.timedelta]
+
+# the sensor ID of the averages of the whole city
+CITY_SENSOR_ID = "-1"
+
+_HAS_NUMPY = find_spec("numpy") is not None
+# below this number of rows the batch is resampled without numpy
+_NUMPY_MIN_ROWS = 1024
+
+_HOUR = 3600
+_DAY = 86400
+# 1970-01-01 was a Thursday, the weeks start on the Monday before
+_WEEK_SHIFT = 3
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+_EPOCH = datetime.datetime(1970, 1, 1)  # noqa: DTZ001
+
+
+def _bucket_width(bucket: Bucket, origin: int | None) -> tuple[int | None, int]:
+    """Get the width in seconds, None for months, and the local origin of a bucket.
+
+    The origin of months is the offset from the start of the month.
+    """
+    if isinstance(bucket, datetime.timedelta):
+        width = int(bucket.total_seconds())
+        if width <= 0:
+            raise ValueError("a custom bucket should be at least one second")
+        return width, origin or 0
+    if bucket == "hour":
+        return _HOUR, origin or 0
+    period = AveragePeriod(bucket)
+    if period == AveragePeriod.DAY:
+        return _DAY, origin or 0
+    if period == AveragePeriod.WEEK:
+        return 7 * _DAY, -_WEEK_SHIFT * _DAY if origin is None else origin
+    if origin is None:
+        return None, 0
+    day = datetime.date.fromordinal(origin // _DAY + _EPOCH_ORDINAL).day
+    if day > 28:  # noqa: PLR2004
+        raise ValueError("the origin of months should be on one of the first 28 days")
+    return None, (day - 1) * _DAY + origin % _DAY
+
+
+def _origin_seconds(
+    origin: datetime.datetime | None, tz: datetime.tzinfo | None
+) -> int | None:
+    """Get the local wall time of the origin in epoch seconds."""
+    if origin is None:
+        return None
+    if origin.tzinfo is None:
+        origin = origin.replace(tzinfo=datetime.timezone.utc)
+    if tz is not None:
+        origin = origin.astimezone(tz)
+    return int((origin.replace(tzinfo=None) - _EPOCH).total_seconds())
+
+
+def _local_seconds(
+    batch: DataValueBatch, tz: datetime.tzinfo | None
+) -> tuple[list[int], list[datetime.tzinfo]]:
+    """Get the local wall time in epoch seconds and the timezone of each row.
+
+    :param batch: the data values
+    :param tz: the timezone of the buckets, None for the reported timezones
+    :return: the local seconds and the timezone of each row
+    """
+    stamps = batch.stamps
+    if tz is None:
+        timezones = list(batch.timezones)
+        offsets = {}
+        for timezone in batch.timezones.dictionary:
+            offset = timezone.utcoffset(None)
+            # only fixed offsets are known without the datetime
+            offsets[timezone] = int(offset.total_seconds()) if offset else 0
+        return [
+            stamp + offsets[timezone] for stamp, timezone in zip(stamps, timezones)
+        ], timezones
+    # the offset of a timezone changes at most on the hour
+    hour_offsets: dict[int, int] = {}
+    local = []
+    for stamp in stamps:
+        hour = stamp // _HOUR
+        if hour not in hour_offsets:
+            utcoffset = datetime.datetime.fromtimestamp(hour * _HOUR, tz).utcoffset()
+            hour_offsets[hour] = int(utcoffset.total_seconds()) if utcoffset else 0
+        local.append(stamp + hour_offsets[hour])
+    return local, [tz] * len(local)
+
+
+def _month_of(local_second: int) -> int:
+    date = datetime.date.fromordinal(local_second // _DAY + _EPOCH_ORDINAL)
+    return (date.year - 1970) * 12 + date.month - 1
+
+
+def _bucket_start(key: int, width: int | None, origin: int) -> int:
+    """Get the local epoch seconds of the start of a bucket."""
+    if width is None:
+        year, month = divmod(key, 12)
+        date = datetime.date(1970 + year, month + 1, 1)
+        return (date.toordinal() - _EPOCH_ORDINAL) * _DAY + origin
+    return origin + key * width
+
+
+def _group_python(
+    batch: DataValueBatch,
+    local: Sequence[int],
+    width: int | None,
+    origin: int,
+    city_wide: bool,
+) -> list[tuple[int, int, int, int]]:
+    """Group the rows by sensor, type and bucket.
+
+    :return: a tuple of (sum, count, first row, bucket key) per group
+    """
+    if width is None:
+        keys = [_month_of(second - origin) for second in local]
+    else:
+        keys = [(second - origin) // width for second in local]
+    sensor_codes: Iterable[int] = (
+        itertools.repeat(0, len(batch)) if city_wide else batch.sensor_ids.codes
+    )
+    groups: dict[tuple[int, int, int], list[int]] = {}
+    for row, (sensor_code, type_code, key, value) in enumerate(
+        zip(sensor_codes, batch.types.codes, keys, batch.values)
+    ):
+        group = groups.get((sensor_code, type_code, key))
+        if group is None:
+            groups[sensor_code, type_code, key] = [value, 1, row]
+        else:
+            group[0] += value
+            group[1] += 1
+    return [
+        (total, count, row, key) for (_, _, key), (total, count, row) in groups.items()
+    ]
+
+
+def _group_numpy(
+    batch: DataValueBatch,
+    local: Sequence[int],
+    width: int | None,
+    origin: int,
+    city_wide: bool,
+) -> list[tuple[int, int, int, int]]:
+    """Group the rows by sensor, type and bucket in vectorized form.
+
+    :return: a tuple of (sum, count, first row, bucket key) per group
+    """
+    import numpy as np  # noqa: PLC0415
+
+    seconds = np.asarray(local, dtype=np.int64)
+    if width is None:
+        keys = (
+            (seconds - origin)
+            .astype("datetime64[s]")
+            .astype("datetime64[M]")
+            .astype(np.int64)
+        )
+    else:
+        keys = (seconds - origin) // width
+    unique_keys, key_codes = np.unique(keys, return_inverse=True)
+    series_codes = np.frombuffer(batch.types.codes, dtype=np.uint32).astype(np.int64)
+    if not city_wide:
+        series_codes += np.frombuffer(batch.sensor_ids.codes, dtype=np.uint32).astype(
+            np.int64
+        ) * len(batch.types.dictionary)
+    groups, first_rows, group_codes = np.unique(
+        series_codes * len(unique_keys) + key_codes.reshape(-1),
+        return_index=True,
+        return_inverse=True,
+    )
+    group_codes = group_codes.reshape(-1)
+    values = np.frombuffer(batch.values, dtype=np.int64)
+    totals = np.zeros(len(groups), dtype=np.int64)
+    np.add.at(totals, group_codes, values)
+    counts = np.bincount(group_codes, minlength=len(groups))
+    return list(
+        zip(
+            totals.tolist(),
+            counts.tolist(),
+            first_rows.tolist(),
+            unique_keys[groups % len(unique_keys)].tolist(),
+        )
+    )
+
+
+def resample(
+    data: DataValueBatch | Iterable[DataValue],
+    bucket: Bucket,
+    tz: datetime.tzinfo | None = None,
+    origin: datetime.datetime | None = None,
+    city_wide: bool = False,
+) -> list[DataValue]:
+    """Average raw data values per sensor, type and time bucket.
+
+    The averages are computed like the `avgData` end point:
+    the buckets are aligned to the local time of the city,
+    each average is stamped with the start of its bucket
+    and its value is the mean rounded half up to an integer.
+    The days start at midnight, the weeks on Monday and the months
+    on their first day, unless an origin is given.
+    Large batches are grouped with numpy if it is installed.
+
+    :param data: the raw data values, ex. the result of `data_raw`,
+        or a data value batch
+    :param bucket: an `AveragePeriod`, 'hour' or a custom bucket width
+    :param tz: the timezone the buckets are aligned to,
+        defaults to None which uses the timezone each data value was reported in
+    :param origin: the start of one of the buckets, ex. the `from_` of `avg_data`,
+        a naive datetime is UTC, defaults to None
+    :param city_wide: whether the data values of all sensors are averaged together
+        under the sensor ID '-1', like the city average of `avgData`,
+        defaults to False
+    :raises ValueError: if the custom bucket is shorter than one second
+        or the origin of months is after the 28th day
+    :return: a list of average data values ordered by stamp
+    """
+    batch = (
+        data
+        if isinstance(data, DataValueBatch)
+        else DataValueBatch.from_data_values(data)
+    )
+    local, timezones = _local_seconds(batch, tz)
+    width, origin_seconds = _bucket_width(
+        bucket, _origin_seconds(origin, tz or (timezones[0] if timezones else None))
+    )
+    group = (
+        _group_numpy if _HAS_NUMPY and len(batch) >= _NUMPY_MIN_ROWS else _group_python
+    )
+    averages: list[tuple[datetime.datetime, str, Any, int, int]] = []
+    for total, count, row, key in group(batch, local, width, origin_seconds, city_wide):
+        stamp = (
+            _EPOCH
+            + datetime.timedelta(seconds=_bucket_start(key, width, origin_seconds))
+        ).replace(tzinfo=timezones[row])
+        # the mean rounded half up, with integers to avoid float error
+        value = (2 * total + count) // (2 * count)
+        sensor_id = CITY_SENSOR_ID if city_wide else batch.sensor_ids[row]
+        averages.append((stamp, sensor_id, batch.types[row], row, value))
+    averages.sort(key=lambda average: (average[0], average[1], average[2].value))
+    return [
+        DataValue(
+            sensorId=sensor_id,
+            stamp=stamp,
+            type=type_,
+            position="" if city_wide else batch.positions[row],
+            value=value,
+        )
+        for stamp, sensor_id, type_, row, value in averages
+    ]
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import functools
+import math
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
+
+from pulseeco.constants import DEFAULT_SPATIAL_CELL_SIZE
+
+from .models import Sensor  # noqa: TC001
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+T = TypeVar("T")
+
+# the mean radius of the earth in meters
+EARTH_RADIUS = 6_371_008.8
+_METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+# below this number of candidates the distances are computed without numpy
+_NUMPY_MIN_CANDIDATES = 256
+
+_HAS_NUMPY = find_spec("numpy") is not None
+
+
+class IndexedSensor(NamedTuple):
+    """A sensor of the spatial index with its parsed position."""
+
+    city_name: str
+    sensor: Sensor
+    latitude: float
+    longitude: float
+
+
+class NearbySensor(NamedTuple):
+    """A sensor of the spatial index and its distance in meters to a point."""
+
+    distance: float
+    city_name: str
+    sensor: Sensor
+
+
+def _nearby_key(nearby: NearbySensor) -> tuple[float, str, str]:
+    # sensors at the same distance are ordered without comparing the sensors
+    return nearby.distance, nearby.city_name, nearby.sensor.sensor_id
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_position(position: str | None) -> tuple[float, float] | None:
+    """Parse a 'latitude,longitude' position.
+
+    :param position: the position of a sensor or a data value
+    :return: a tuple of (latitude, longitude), None if the position is not valid
+    """
+    if not position:
+        return None
+    latitude, _, longitude = position.partition(",")
+    try:
+        return float(latitude), float(longitude)
+    except ValueError:
+        return None
+
+
+def haversine(
+    latitude1: float, longitude1: float, latitude2: float, longitude2: float
+) -> float:
+    """Get the great-circle distance between two points.
+
+    :return: the distance in meters
+    """
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1)
+        * math.cos(phi2)
+        * math.sin(math.radians(longitude2 - longitude1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def _degrees_around(latitude: float, radius: float) -> tuple[float, float]:
+    """Get the latitude and longitude degrees that cover a radius around a point."""
+    latitude_degrees = radius / _METERS_PER_DEGREE
+    cos_latitude = math.cos(math.radians(min(abs(latitude) + latitude_degrees, 89.9)))
+    return latitude_degrees, latitude_degrees / cos_latitude
+
+
+class SensorIndex:
+    """Grid index of sensor positions for nearest, radius and bounding box queries.
+
+    The sensors are bucketed into cells of `cell_size` degrees,
+    so a query visits only the cells around it instead of every sensor.
+    The distances of many candidates are computed with numpy if it is installed.
+    Sensors of many cities can share one index.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_SPATIAL_CELL_SIZE) -> None:
+        """Initialize an empty sensor index.
+
+        :param cell_size: the side of a cell in degrees, defaults to 0.05
+        """
+        if cell_size <= 0:
+            raise ValueError("`cell_size` should be positive")
+        self._cell_size = cell_size
+        self._entries: list[IndexedSensor] = []
+        self._cells: dict[tuple[int, int], list[int]] = {}
+        self._arrays: tuple[Any, Any] | None = None
+
+    @classmethod
+    def from_sensors(
+        cls,
+        sensors: Iterable[Sensor],
+        city_name: str = "",
+        cell_size: float = DEFAULT_SPATIAL_CELL_SIZE,
+    ) -> SensorIndex:
+        """Build an index of the sensors of a city, ex. the result of `sensors`.
+
+        :param sensors: the sensors
+        :param city_name: the city name of the sensors, defaults to ''
+        :param cell_size: the side of a cell in degrees, defaults to 0.05
+        :return: a sensor index
+        """
+        index = cls(cell_size)
+        for sensor in sensors:
+            index.add(sensor, city_name)
+        return index
+
+    @classmethod
+    def from_cities(
+        cls,
+        sensors: Mapping[str, Iterable[Sensor]],
+        cell_size: float = DEFAULT_SPATIAL_CELL_SIZE,
+    ) -> SensorIndex:
+        """Build an index of the sensors of many cities.
+
+        :param sensors: the sensors of each city, keyed by city name,
+            ex. the results of `MultiCityPulseEcoClient.sensors`
+        :param cell_size: the side of a cell in degrees, defaults to 0.05
+        :return: a sensor index
+        """
+        index = cls(cell_size)
+        for city_name, city_sensors in sensors.items():
+            for sensor in city_sensors:
+                index.add(sensor, city_name)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return (
+            math.floor(latitude / self._cell_size),
+            math.floor(longitude / self._cell_size),
+        )
+
+    def add(self, sensor: Sensor, city_name: str = "") -> bool:
+        """Add a sensor to the index.
+
+        :param sensor: the sensor
+        :param city_name: the city name of the sensor, defaults to ''
+        :return: whether the sensor was added, False if its position is not valid
+        """
+        position = parse_position(sensor.position)
+        if position is None:
+            return False
+        latitude, longitude = position
+        self._cells.setdefault(self._cell(latitude, longitude), []).append(
+            len(self._entries)
+        )
+        self._entries.append(IndexedSensor(city_name, sensor, latitude, longitude))
+        self._arrays = None
+        return True
+
+    def _distances(
+        self, latitude: float, longitude: float, candidates: list[int]
+    ) -> list[float]:
+        """Get the distances in meters from a point to the candidate entries."""
+        entries = self._entries
+        if not _HAS_NUMPY or len(candidates) < _NUMPY_MIN_CANDIDATES:
+            return [
+                haversine(
+                    latitude, longitude, entries[i].latitude, entries[i].longitude
+                )
+                for i in candidates
+            ]
+        import numpy as np  # noqa: PLC0415
+
+        if self._arrays is None:
+            self._arrays = (
+                np.radians([entry.latitude for entry in entries]),
+                np.radians([entry.longitude for entry in entries]),
+            )
+        latitudes, longitudes = (array[candidates] for array in self._arrays)
+        phi = math.radians(latitude)
+        a = (
+            np.sin((latitudes - phi) / 2) ** 2
+            + math.cos(phi)
+            * np.cos(latitudes)
+            * np.sin((longitudes - math.radians(longitude)) / 2) ** 2
+        )
+        distances = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+        return distances.tolist()  # type: ignore[no-any-return]
+
+    def _cells_in_box(
+        self,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+    ) -> list[int]:
+        """Get the entries of the cells that overlap a bounding box."""
+        min_row, min_column = self._cell(min_latitude, min_longitude)
+        max_row, max_column = self._cell(max_latitude, max_longitude)
+        cells = self._cells
+        if (max_row - min_row + 1) * (max_column - min_column + 1) > len(cells):
+            # the box is larger than the occupied cells, visit those instead
+            return [
+                i
+                for (row, column), entries in cells.items()
+                if min_row <= row <= max_row and min_column <= column <= max_column
+                for i in entries
+            ]
+        return [
+            i
+            for row in range(min_row, max_row + 1)
+            for column in range(min_column, max_column + 1)
+            for i in cells.get((row, column), ())
+        ]
+
+    def within_bbox(
+        self,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+    ) -> list[IndexedSensor]:
+        """Get the sensors within a bounding box, inclusive.
+
+        :param min_latitude: the south edge of the box
+        :param min_longitude: the west edge of the box
+        :param max_latitude: the north edge of the box
+        :param max_longitude: the east edge of the box
+        :return: a list of the sensors in the box
+        """
+        entries = self._entries
+        return [
+            entries[i]
+            for i in self._cells_in_box(
+                min_latitude, min_longitude, max_latitude, max_longitude
+            )
+            if min_latitude <= entries[i].latitude <= max_latitude
+            and min_longitude <= entries[i].longitude <= max_longitude
+        ]
+
+    def within_radius(
+        self, latitude: float, longitude: float, radius: float
+    ) -> list[NearbySensor]:
+        """Get the sensors within a radius of a point, nearest first.
+
+        :param latitude: the latitude of the point
+        :param longitude: the longitude of the point
+        :param radius: the radius in meters
+        :return: a list of the sensors in the radius and their distances
+        """
+        latitude_degrees, longitude_degrees = _degrees_around(latitude, radius)
+        candidates = self._cells_in_box(
+            latitude - latitude_degrees,
+            longitude - longitude_degrees,
+            latitude + latitude_degrees,
+            longitude + longitude_degrees,
+        )
+        entries = self._entries
+        return sorted(
+            (
+                NearbySensor(distance, entries[i].city_name, entries[i].sensor)
+                for i, distance in zip(
+                    candidates, self._distances(latitude, longitude, candidates)
+                )
+                if distance <= radius
+            ),
+            key=_nearby_key,
+        )
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int = 1
+    ) -> list[NearbySensor]:
+        """Get the k nearest sensors to a point, nearest first.
+
+        The rings of cells around the point are searched outwards
+        until no farther cell can hold a nearer sensor,
+        the rest of the sensors are scanned once a ring is larger
+        than the occupied cells.
+
+        :param latitude: the latitude of the point
+        :param longitude: the longitude of the point
+        :param k: the number of sensors, defaults to 1
+        :return: a list of the nearest sensors and their distances
+        """
+        if k < 1 or not self._entries:
+            return []
+        row, column = self._cell(latitude, longitude)
+        entries = self._entries
+        found: list[NearbySensor] = []
+        visited = 0
+        ring = 0
+        while visited < len(entries):
+            if ring == 0:
+                ring_cells = [(row, column)]
+            elif 8 * ring > len(self._cells):
+                # the ring is larger than the occupied cells, scan the rest instead
+                ring_cells = [
+                    cell
+                    for cell in self._cells
+                    if max(abs(cell[0] - row), abs(cell[1] - column)) >= ring
+                ]
+            else:
+                ring_cells = [
+                    (row + d_row, column + d_column)
+                    for d_row in range(-ring, ring + 1)
+                    for d_column in range(-ring, ring + 1)
+                    if max(abs(d_row), abs(d_column)) == ring
+                ]
+            candidates = [i for cell in ring_cells for i in self._cells.get(cell, ())]
+            visited += len(candidates)
+            found.extend(
+                NearbySensor(distance, entries[i].city_name, entries[i].sensor)
+                for i, distance in zip(
+                    candidates, self._distances(latitude, longitude, candidates)
+                )
+            )
+            found.sort(key=_nearby_key)
+            del found[k:]
+            # every sensor outside of the searched rings is farther than this
+            searched = ring * self._cell_size
+            bound = (
+                searched
+                * _METERS_PER_DEGREE
+                * math.cos(math.radians(min(abs(latitude) + searched, 89.9)))
+            )
+            if len(found) == k and found[-1].distance <= bound:
+                break
+            ring += 1
+        return found
+
+
+def select_data_values(
+    data_values: Iterable[T],
+    sensors: Iterable[IndexedSensor | NearbySensor],
+    city_name: str,
+) -> list[T]:
+    """Select the data values of the sensors found by a query of the index.
+
+    :param data_values: data values or data value records of a city,
+        ex. the result of `current` or `data_raw`
+    :param sensors: the result of a query of the index
+    :param city_name: the city name of the data values, as given to the index
+    :return: the data values of the sensors of the city
+    """
+    keys = {(sensor.city_name, sensor.sensor.sensor_id) for sensor in sensors}
+    return [
+        data_value
+        for data_value in data_values
+        if (city_name, data_value.sensor_id) in keys  # type: ignore[attr-defined]
+    ]
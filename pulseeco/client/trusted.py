@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, cast
+
+from .base import PulseEcoClientBase
+from .records import DataValueRecord, to_records
+
+if TYPE_CHECKING:
+    import datetime
+
+    from .enums import AveragePeriod, DataValueType
+
+
+class TrustedPulseEcoClient(PulseEcoClientBase):
+    """High level pulse.eco client that trusts the API and skips validation.
+
+    The data values are returned as `DataValueRecord` objects,
+    which convert their fields lazily on first access,
+    call `DataValueRecord.validate` to fully validate one.
+    Create one with `PulseEcoClient.trusted`.
+    """
+
+    def data_raw(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType | None = None,
+        sensor_id: str | None = None,
+    ) -> list[DataValueRecord]:
+        """Get raw data for a city.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of data value records
+        """
+        return to_records(
+            self._data_raw_json(
+                from_, to, type.value if type is not None else None, sensor_id
+            )
+        )
+
+    async def adata_raw(
+        self,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType | None = None,
+        sensor_id: str | None = None,
+    ) -> list[DataValueRecord]:
+        """Get raw data for a city.
+
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type, defaults to None
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of data value records
+        """
+        return to_records(
+            await self._adata_raw_json(
+                from_, to, type.value if type is not None else None, sensor_id
+            )
+        )
+
+    def avg_data(
+        self,
+        period: AveragePeriod,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType,
+        sensor_id: str | None = None,
+    ) -> list[DataValueRecord]:
+        """Get average data for a city.
+
+        :param period: the period of the average data
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of average data value records
+        """
+        return to_records(self._avg_data_json(period, from_, to, type, sensor_id))
+
+    async def aavg_data(
+        self,
+        period: AveragePeriod,
+        from_: str | datetime.datetime,
+        to: str | datetime.datetime,
+        type: DataValueType,
+        sensor_id: str | None = None,
+    ) -> list[DataValueRecord]:
+        """Get average data for a city.
+
+        :param period: the period of the average data
+        :param from_: the start datetime of the data
+            as a datetime object or an isoformat string
+        :param to: the end datetime of the data
+            as a datetime object or an isoformat string
+        :param type: the data value type
+        :param sensor_id: the unique ID of the sensor, defaults to None
+        :return: a list of average data value records
+        """
+        return to_records(
+            await self._aavg_data_json(period, from_, to, type, sensor_id)
+        )
+
+    def data24h(self) -> list[DataValueRecord]:
+        """Get 24h data for a city.
+
+        The data values are sorted ascending by their timestamp.
+
+        :return: a list of data value records for the past 24 hours
+        """
+        return to_records(cast("list[Any]", self._pulse_eco_api.data24h()))
+
+    async def adata24h(self) -> list[DataValueRecord]:
+        """Get 24h data for a city.
+
+        The data values are sorted ascending by their timestamp.
+
+        :return: a list of data value records for the past 24 hours
+        """
+        return to_records(cast("list[Any]", await self._pulse_eco_api.adata24h()))
+
+    def current(self) -> list[DataValueRecord]:
+        """Get the last received valid data for each sensor in a city.
+
+        Will not return sensor data older than 2 hours.
+
+        :return: a list of current data value records
+        """
+        return to_records(cast("list[Any]", self._pulse_eco_api.current()))
+
+    async def acurrent(self) -> list[DataValueRecord]:
+        """Get the last received valid data for each sensor in a city.
+
+        Will not return sensor data older than 2 hours.
+
+        :return: a list of current data value records
+        """
+        return to_records(cast("list[Any]", await self._pulse_eco_api.acurrent()))
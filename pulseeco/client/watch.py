@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Literal, NamedTuple, TypeVar
+
+from pydantic import ValidationError
+
+from pulseeco.constants import (
+    DEFAULT_WATCH_INTERVAL,
+    DEFAULT_WATCH_JITTER,
+    DEFAULT_WATCH_QUEUE_SIZE,
+    DEFAULT_WATCH_SEEN_SIZE,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from types import TracebackType
+
+    from .models import DataValue
+    from .trusted import TrustedPulseEcoClient
+
+_T = TypeVar("_T", bound="MeasurementWatcher")
+
+WatchSource = Literal["current", "data24h"]
+
+
+class Measurement(NamedTuple):
+    """A new data value of a city."""
+
+    city_name: str
+    data_value: DataValue
+
+
+class MeasurementWatcher:
+    """Async iterator of the new data values of many cities.
+
+    Each city is polled on its own schedule with jitter,
+    the data values already seen are dropped before they are validated,
+    and only the new data values are yielded, the invalid ones are skipped.
+    The polling pauses while `max_queue_size` data values wait to be consumed.
+    Create one with `PulseEcoClient.watch` or `MultiCityPulseEcoClient.watch`
+    and close it with `aclose` or by using it as an async context manager.
+    """
+
+    def __init__(
+        self,
+        clients: Mapping[str, TrustedPulseEcoClient],
+        interval: float | Mapping[str, float] = DEFAULT_WATCH_INTERVAL,
+        jitter: float = DEFAULT_WATCH_JITTER,
+        source: WatchSource = "current",
+        max_seen: int = DEFAULT_WATCH_SEEN_SIZE,
+        max_queue_size: int = DEFAULT_WATCH_QUEUE_SIZE,
+    ) -> None:
+        """Initialize the measurement watcher.
+
+        :param clients: the client of each city, keyed by city name
+        :param interval: the seconds between polls,
+            or a mapping of city name to the seconds between polls, defaults to 60
+        :param jitter: the fraction of the interval the polls are randomly moved by,
+            defaults to 0.1
+        :param source: poll `current` or `data24h`, defaults to 'current'
+        :param max_seen: the number of seen data values remembered,
+            the oldest are forgotten first, defaults to 100000
+        :param max_queue_size: the number of new data values that wait
+            to be consumed before polling pauses, defaults to 1024
+        """
+        if source not in {"current", "data24h"}:
+            raise ValueError("`source` should be 'current' or 'data24h'")
+        if not 0 <= jitter < 1:
+            raise ValueError("`jitter` should be at least 0 and less than 1")
+        self._clients = dict(clients)
+        self._intervals = {
+            city_name: interval
+            if isinstance(interval, (int, float))
+            else interval[city_name]
+            for city_name in self._clients
+        }
+        self._jitter = jitter
+        self._source = source
+        self._max_seen = max_seen
+        self._max_queue_size = max_queue_size
+        self._seen: OrderedDict[tuple[str, str, str, str], None] = OrderedDict()
+        # None is put by `aclose` to stop the waiting consumers
+        self._queue: asyncio.Queue[Measurement | None] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._closed = False
+        # the exception of the last poll request of each city, if it failed
+        self.errors: dict[str, Exception] = {}
+
+    def _seen_before(self, key: tuple[str, str, str, str]) -> bool:
+        """Get whether a data value was seen before, refreshing it if so."""
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return True
+        return False
+
+    def _remember(self, key: tuple[str, str, str, str]) -> None:
+        """Remember a data value, forgetting the oldest if full."""
+        seen = self._seen
+        seen[key] = None
+        if len(seen) > self._max_seen:
+            seen.popitem(last=False)
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(1 - self._jitter, 1 + self._jitter)  # noqa: S311
+
+    async def _poll_city(
+        self,
+        city_name: str,
+        client: TrustedPulseEcoClient,
+        queue: asyncio.Queue[Measurement | None],
+    ) -> None:
+        interval = self._intervals[city_name]
+        # spread the first polls of the cities
+        await asyncio.sleep(random.uniform(0, interval * self._jitter))  # noqa: S311
+        while True:
+            try:
+                records = await (
+                    client.acurrent()
+                    if self._source == "current"
+                    else client.adata24h()
+                )
+            except Exception as e:
+                self.errors[city_name] = e
+                records = []
+            else:
+                self.errors.pop(city_name, None)
+            for record in records:
+                key = (
+                    city_name,
+                    record.sensor_id,
+                    record.raw["type"],
+                    record.raw["stamp"],
+                )
+                if self._seen_before(key):
+                    continue
+                try:
+                    measurement = Measurement(city_name, record.validate())
+                except ValidationError:
+                    # an invalid data value is skipped and not validated again
+                    self._remember(key)
+                    continue
+                # remembered once queued, so a data value whose poll
+                # was cancelled is tried again
+                await queue.put(measurement)
+                self._remember(key)
+            await asyncio.sleep(self._jittered(interval))
+
+    def __aiter__(self: _T) -> _T:
+        return self
+
+    async def __anext__(self) -> Measurement:
+        if self._closed:
+            raise StopAsyncIteration
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._max_queue_size)
+            self._tasks = [
+                asyncio.ensure_future(self._poll_city(city_name, client, self._queue))
+                for city_name, client in self._clients.items()
+            ]
+        measurement = await self._queue.get()
+        if measurement is None:
+            # wake the next waiting consumer as well
+            self._queue.put_nowait(None)
+            raise StopAsyncIteration
+        return measurement
+
+    async def aclose(self) -> None:
+        """Stop polling, the clients are not closed."""
+        self._closed = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queue is not None:
+            # a full queue has no waiting consumers
+            with contextlib.suppress(asyncio.QueueFull):
+                self._queue.put_nowait(None)
+
+    async def __aenter__(self: _T) -> _T:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
@@ -9,3 +9,28 @@ PULSE_ECO_CITY_PASSWORD_ENV_KEY_FORMAT = "PULSE_ECO_{city_name}_PASSWORD"  # noq
 PULSE_ECO_BASE_URL_FORMAT = "https://{city_name}.pulse.eco/rest/{end_point}"
 DATA_RAW_MAX_SPAN = datetime.timedelta(days=7)
 AVG_DATA_MAX_SPAN = datetime.timedelta(days=365)
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY_PER_HOST = 8
+DEFAULT_MULTI_CITY_MAX_CONCURRENCY = 16
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+ADAPTIVE_CHUNK_MIN_SPAN = datetime.timedelta(hours=1)
+ADAPTIVE_CHUNK_SMALL_ROWS = 500
+ADAPTIVE_CHUNK_LARGE_ROWS = 20_000
+DEFAULT_CACHE_MAX_SIZE = 1024
+SENSOR_CACHE_TTL = 3600.0
+LIVE_CACHE_TTL = 60.0
+# data older than this is not expected to change anymore
+CACHE_SETTLE_DELAY = datetime.timedelta(hours=2)
+DEFAULT_INTERN_TABLE_SIZE = 65_536
+# the rolling window of the delta poller and how far back it requests new data
+DELTA_POLL_WINDOW = datetime.timedelta(hours=24)
+DELTA_POLL_MAX_LOOKBACK = datetime.timedelta(hours=2)
+DEFAULT_WATCH_INTERVAL = 60.0
+DEFAULT_WATCH_JITTER = 0.1
+DEFAULT_WATCH_SEEN_SIZE = 100_000
+DEFAULT_WATCH_QUEUE_SIZE = 1024
+# the side of a cell of the spatial index in degrees, about 5.5 km of latitude
+DEFAULT_SPATIAL_CELL_SIZE = 0.05
@@ -18,6 +18,20 @@ def convert_datetime_to_str(datetime: datetime) -> str:
     return datetime.isoformat()
 
 
+def parse_datetime(value: str | datetime) -> datetime:
+    """Parse an isoformat string into a datetime object
+
+    :param value: an isoformat string or a datetime object
+    :return: a datetime object
+    """
+    if isinstance(value, str):
+        # `fromisoformat` does not support the `Z` suffix before Python 3.11
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value)
+    return value
+
+
 def split_datetime_span(
     fr: str | datetime, to: str | datetime, td: timedelta
 ) -> Iterator[tuple[datetime, datetime]]:
@@ -29,10 +43,8 @@ def split_datetime_span(
     :param td: the timedelta between the datetimes
     :return: a list of datetimes
     """
-    if isinstance(fr, str):
-        fr = datetime.fromisoformat(fr)
-    if isinstance(to, str):
-        to = datetime.fromisoformat(to)
+    fr = parse_datetime(fr)
+    to = parse_datetime(to)
     current = fr
     prev = current
     while current + td < to:
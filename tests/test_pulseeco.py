@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import datetime
+import json
+import random
 import ssl
-from typing import TYPE_CHECKING
+import time
+from typing import TYPE_CHECKING, Any
 
 import aiohttp
 import certifi
@@ -10,8 +14,33 @@ import httpx
 import pytest
 import requests
 
-from pulseeco import AveragePeriod, DataValueType, OverallValues, PulseEcoClient
+from pulseeco import (
+    AqiStandard,
+    AveragePeriod,
+    DataValue,
+    DataValueBatch,
+    DataValueRecord,
+    DataValueType,
+    LocalMirror,
+    MultiCityPulseEcoClient,
+    OverallValues,
+    PulseEcoClient,
+    QuerySpec,
+    RollingMean,
+    Sensor,
+    SensorIndex,
+)
+from pulseeco.api.base import PulseEcoAPIBase
+from pulseeco.api.cache import ResponseCache, default_cache_policy
+from pulseeco.api.chunking import AdaptiveChunkPlanner
+from pulseeco.api.http_clients import SyncClientPool
+from pulseeco.api.interning import InternTable
 from pulseeco.api.pulse_eco_api import PulseEcoAPI
+from pulseeco.api.rate_limit import TokenBucket, get_host_rate_limiter
+from pulseeco.api.retry import NO_RETRY, RetryPolicy, parse_retry_after
+from pulseeco.client.aqi import overall_index, sub_index, sub_indices
+from pulseeco.client.resample import resample
+from pulseeco.client.spatial import haversine, select_data_values
 from pulseeco.constants import (
     DATA_RAW_MAX_SPAN,
     PULSE_ECO_BASE_URL_FORMAT_ENV_KEY,
@@ -21,7 +50,101 @@ from pulseeco.constants import (
 from pulseeco.utils import split_datetime_span
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator, Iterator
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+    from pathlib import Path
+
+FAKE_BASE_URL_FORMAT = "https://{city_name}.fake.pulse.eco/rest/{end_point}"
+
+
+class FakeResponse:
+    def __init__(
+        self,
+        payload: Any,  # noqa: ANN401
+        status_code: int = 200,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.status_code = status_code
+        self.headers = headers if headers is not None else {}
+        self.content = json.dumps(payload).encode()
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:  # noqa: PLR2004
+            raise requests.HTTPError(f"{self.status_code} error", response=None)
+
+    def json(self) -> Any:  # noqa: ANN401
+        return json.loads(self.content)
+
+
+class FakeAiohttpResponse:
+    def __init__(self, payload: Any) -> None:  # noqa: ANN401
+        self.status = 200
+        self.headers: dict[str, str] = {}
+        self._body = json.dumps(payload).encode()
+
+    def raise_for_status(self) -> None:
+        pass
+
+    async def read(self) -> bytes:
+        return self._body
+
+
+def echo_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+    """Respond with one data value per request, stamped with `from` if given."""
+    return [
+        {
+            "sensorId": params.get("sensorId", "1000"),
+            "stamp": params.get("from", "2020-01-01T00:00:00+00:00"),
+            "type": params.get("type", "pm10"),
+            "position": "41.99,21.42",
+            "value": "1",
+        }
+    ]
+
+
+class FakeClient:
+    def __init__(
+        self, handler: Callable[[str, dict[str, str]], Any] = echo_handler
+    ) -> None:
+        self.handler = handler
+        self.calls: list[tuple[str, dict[str, str]]] = []
+
+    def get(
+        self,
+        url: str,
+        params: dict[str, str],
+        auth: tuple[str, str] | None = None,
+    ) -> FakeResponse | FakeAiohttpResponse:
+        self.calls.append((url, params))
+        response = self.handler(url, params)
+        if isinstance(response, (FakeResponse, FakeAiohttpResponse)):
+            return response
+        return FakeResponse(response)
+
+
+class FakeAsyncClient(FakeClient):
+    def __init__(
+        self,
+        handler: Callable[[str, dict[str, str]], Any] = echo_handler,
+        delay: float = 0.01,
+    ) -> None:
+        super().__init__(handler)
+        self.delay = delay
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+    async def get(  # type: ignore[override]
+        self,
+        url: str,
+        params: dict[str, str],
+        auth: tuple[str, str] | None = None,
+    ) -> FakeResponse | FakeAiohttpResponse:
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            await asyncio.sleep(self.delay)
+            return super().get(url, params, auth)
+        finally:
+            self.concurrent -= 1
 
 
 @pytest.fixture(scope="session")
@@ -150,6 +273,86 @@ def test_custom_pulse_eco_api() -> None:
     ), "`_pulse_eco_api` should be the same as the passed object"
 
 
+async def test_custom_pulse_eco_api_base() -> None:
+    data_value = {
+        "sensorId": "1",
+        "stamp": "2020-01-01T00:00:00+00:00",
+        "type": "pm10",
+        "position": "41.99,21.42",
+        "value": "1",
+    }
+
+    class MemoryPulseEcoAPI(PulseEcoAPIBase):
+        """Answer every data value request with one data value."""
+
+        def __init__(self) -> None:
+            self.sensors_json: dict[str, Any] = {}
+            self.overall_json = {"cityName": "memory", "values": {}}
+            self.data_value = data_value
+
+        def data_values(self) -> Any:  # noqa: ANN401
+            return [dict(self.data_value)]
+
+        def sensors(self) -> Any:  # noqa: ANN401
+            return list(self.sensors_json.values())
+
+        async def asensors(self) -> Any:  # noqa: ANN401
+            return self.sensors()
+
+        def sensor(self, sensor_id: str) -> Any:  # noqa: ANN401
+            return self.sensors_json[sensor_id]
+
+        async def asensor(self, sensor_id: str) -> Any:  # noqa: ANN401
+            return self.sensor(sensor_id)
+
+        def data_raw(self, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            return self.data_values()
+
+        async def adata_raw(self, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            return self.data_values()
+
+        def avg_data(self, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            return self.data_values()
+
+        async def aavg_data(self, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            return self.data_values()
+
+        def data24h(self) -> Any:  # noqa: ANN401
+            return self.data_values()
+
+        async def adata24h(self) -> Any:  # noqa: ANN401
+            return self.data_values()
+
+        def current(self) -> Any:  # noqa: ANN401
+            return self.data_values()
+
+        async def acurrent(self) -> Any:  # noqa: ANN401
+            return self.data_values()
+
+        def overall(self) -> Any:  # noqa: ANN401
+            return self.overall_json
+
+        async def aoverall(self) -> Any:  # noqa: ANN401
+            return self.overall()
+
+    intern_table = InternTable()
+    pulse_eco = PulseEcoClient(
+        "memory", pulse_eco_api=MemoryPulseEcoAPI(), intern_table=intern_table
+    )
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    results = [
+        pulse_eco.current(),
+        await pulse_eco.adata24h(),
+        pulse_eco.data_raw(from_=from_, to=from_),
+        await pulse_eco.aavg_data(AveragePeriod.DAY, from_, from_, DataValueType.PM10),
+        *pulse_eco.query_many([QuerySpec(from_, from_, DataValueType.PM10)]),
+    ]
+    assert all(len(result) == 1 for result in results), (
+        "a custom API wrapper should answer through the bytes methods of the base"
+    )
+    assert intern_table.intern("".join("41.99,21.42")) is results[0][0].position
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_sensor_skopje(
     pulse_eco_skopje: PulseEcoClient, pulse_eco_skopje_async_httpx: PulseEcoClient
@@ -362,3 +565,1274 @@ async def test_compare_http_clients(
         "all avg data should be the same"
     )
     assert len(avg_data[0]) > 0, "there should be at least one data value"
+
+
+async def test_adata_raw_bounded_concurrency() -> None:
+    max_concurrency = 3
+    chunks = 10
+    async_client = FakeAsyncClient()
+    pulse_eco_api = PulseEcoAPI(
+        city_name="bounded",
+        base_url=FAKE_BASE_URL_FORMAT,
+        async_client=async_client,  # type: ignore[arg-type]
+        max_concurrency=max_concurrency,
+    )
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    to = from_ + DATA_RAW_MAX_SPAN * chunks
+    data_raw = await pulse_eco_api.adata_raw(from_=from_, to=to, type="pm10")
+    assert async_client.max_concurrent == max_concurrency, (
+        "concurrency should be bounded"
+    )
+    assert len(data_raw) == len(async_client.calls) == chunks, (
+        "there should be one data value per chunk"
+    )
+    assert [data["stamp"] for data in data_raw] == [
+        params["from"] for _, params in async_client.calls
+    ], "chunks should be joined in order"
+    assert pulse_eco_api.scheduler.in_flight == 0, "no chunk should be in flight"
+    assert pulse_eco_api.scheduler.queued == 0, "no chunk should be queued"
+
+
+async def test_adata_raw_host_limit_per_client() -> None:
+    chunks = 10
+    PulseEcoAPI(
+        city_name="per-host",
+        base_url=FAKE_BASE_URL_FORMAT,
+        async_client=FakeAsyncClient(),  # type: ignore[arg-type]
+    )
+    async_client = FakeAsyncClient()
+    pulse_eco_api = PulseEcoAPI(
+        city_name="per-host",
+        base_url=FAKE_BASE_URL_FORMAT,
+        async_client=async_client,  # type: ignore[arg-type]
+        max_concurrency_per_host=2,
+    )
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    to = from_ + DATA_RAW_MAX_SPAN * chunks
+    await pulse_eco_api.adata_raw(from_=from_, to=to, type="pm10")
+    assert async_client.max_concurrent == 2, (  # noqa: PLR2004
+        "a lower host limit of a later client should not be ignored"
+    )
+    async_client = FakeAsyncClient()
+    pulse_eco_api = PulseEcoAPI(
+        city_name="per-host",
+        base_url=FAKE_BASE_URL_FORMAT,
+        async_client=async_client,  # type: ignore[arg-type]
+        max_concurrency=8,
+        max_concurrency_per_host=6,
+    )
+    await pulse_eco_api.adata_raw(from_=from_, to=to, type="pm10")
+    assert async_client.max_concurrent == 2, (  # noqa: PLR2004
+        "a higher host limit should not raise the limit shared with other clients"
+    )
+    PulseEcoAPI(
+        city_name="per-host",
+        base_url=FAKE_BASE_URL_FORMAT,
+        async_client=FakeAsyncClient(),  # type: ignore[arg-type]
+        max_concurrency_per_host=1,
+    )
+    async_client.max_concurrent = 0
+    await pulse_eco_api.adata_raw(from_=from_, to=to, type="pm10")
+    assert async_client.max_concurrent == 1, (
+        "a lower host limit should hold for the clients already requesting"
+    )
+
+
+def test_data_raw_thread_pool_order() -> None:
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    to = from_ + DATA_RAW_MAX_SPAN * 6
+    serial_client = FakeClient()
+    serial = PulseEcoAPI(
+        city_name="serial",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=serial_client,  # type: ignore[arg-type]
+    ).data_raw(from_=from_, to=to, type="pm10")
+    threaded_client = FakeClient()
+    threaded = PulseEcoAPI(
+        city_name="threaded",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=threaded_client,  # type: ignore[arg-type]
+        max_workers=4,
+    ).data_raw(from_=from_, to=to, type="pm10")
+    assert threaded == serial, "thread pool results should match the serial order"
+    assert len(threaded_client.calls) == len(serial_client.calls), (
+        "the same chunks should be requested"
+    )
+
+
+def test_owned_keep_alive_client() -> None:
+    client_pool = SyncClientPool(pool_maxsize=4)
+    client = client_pool.get()
+    assert isinstance(client, requests.Session), "requests should be preferred"
+    assert client_pool.get() is client, "the owned client should be reused"
+    client_pool.close()
+    assert client_pool.get() is not client, "a closed client should not be reused"
+    client_pool.close()
+    with PulseEcoClient(city_name="skopje") as pulse_eco:
+        assert isinstance(pulse_eco, PulseEcoClient), "should enter the client"
+
+
+async def test_async_fallback_does_not_block_event_loop() -> None:
+    def slow_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        time.sleep(0.05)
+        return echo_handler(url, params)
+
+    pulse_eco_api = PulseEcoAPI(
+        city_name="fallback",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=FakeClient(slow_handler),  # type: ignore[arg-type]
+    )
+    ticks = 0
+
+    async def heartbeat() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    await pulse_eco_api.adata_raw(
+        from_=from_, to=from_ + DATA_RAW_MAX_SPAN * 4, type="pm10"
+    )
+    heartbeat_task.cancel()
+    await pulse_eco_api.aclose()
+    assert ticks > 1, "the event loop should keep running during the requests"
+
+
+async def test_multi_city_errors_are_kept_per_city() -> None:
+    def handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        if "broken" in url:
+            return FakeResponse({}, status_code=500)
+        return echo_handler(url, params)
+
+    async_client = FakeAsyncClient(handler)
+    with MultiCityPulseEcoClient(
+        cities=["skopje", "broken", "bitola", "skopje"],
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=FakeClient(handler),  # type: ignore[arg-type]
+        async_client=async_client,  # type: ignore[arg-type]
+        retry_policy=NO_RETRY,
+    ) as multi_city:
+        current = multi_city.current()
+        acurrent = await multi_city.acurrent()
+    for result in (current, acurrent):
+        assert set(result.results) == {"skopje", "bitola"}, (
+            "working cities should have results"
+        )
+        assert set(result.errors) == {"broken"}, "the broken city should fail"
+        assert not result.ok, "the result should not be ok"
+
+
+async def test_retry_transient_errors() -> None:
+    failures = 2
+    responses: list[FakeResponse] = [
+        FakeResponse({}, status_code=502, headers={"Retry-After": "0"})
+        for _ in range(failures)
+    ]
+
+    def handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        if responses:
+            return responses.pop()
+        return echo_handler(url, params)
+
+    retry_policy = RetryPolicy(max_retries=failures, backoff_factor=0)
+    client = FakeClient(handler)
+    async_client = FakeAsyncClient(handler, delay=0)
+    pulse_eco_api = PulseEcoAPI(
+        city_name="retry",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=client,  # type: ignore[arg-type]
+        async_client=async_client,  # type: ignore[arg-type]
+        retry_policy=retry_policy,
+    )
+    assert len(pulse_eco_api.current()) == 1, "the request should succeed"
+    assert len(client.calls) == failures + 1, "the failures should be retried"
+    responses.extend(FakeResponse({}, status_code=503) for _ in range(failures + 1))
+    with pytest.raises(requests.HTTPError):
+        await pulse_eco_api.acurrent()
+    assert len(async_client.calls) == failures + 1, "retries should be limited"
+    assert parse_retry_after("120") == 120, "delay seconds should be parsed"  # noqa: PLR2004
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0, (
+        "a past date should not wait"
+    )
+    assert RetryPolicy(max_backoff=5).get_delay(0, "3600") == 5, (  # noqa: PLR2004
+        "a `Retry-After` delay should be capped at the maximum backoff"
+    )
+
+
+def test_token_bucket() -> None:
+    rate = 50
+    token_bucket = TokenBucket(rate=rate, capacity=1)
+    start = time.monotonic()
+    for _ in range(4):
+        token_bucket.acquire()
+    assert time.monotonic() - start >= 3 / rate * 0.9, (
+        "tokens should be limited to the rate"
+    )
+    assert get_host_rate_limiter("limited.pulse.eco", 10) is get_host_rate_limiter(
+        "limited.pulse.eco", 10
+    ), "the same rate should share the rate limiter of the host"
+    assert get_host_rate_limiter("limited.pulse.eco", 2).rate == 2, (  # noqa: PLR2004
+        "a lower rate of a later instance should not be ignored"
+    )
+    assert get_host_rate_limiter("limited.pulse.eco", 20) is get_host_rate_limiter(
+        "limited.pulse.eco", 2
+    ), "the instances of a host should share one rate limiter"
+    assert get_host_rate_limiter("limited.pulse.eco", 20).rate == 2, (  # noqa: PLR2004
+        "a higher rate should not raise the rate shared with other instances"
+    )
+
+
+def test_adaptive_chunk_planner() -> None:
+    max_span = datetime.timedelta(days=2)
+
+    def handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        span = datetime.datetime.fromisoformat(
+            params["to"]
+        ) - datetime.datetime.fromisoformat(params["from"])
+        if span > max_span:
+            raise requests.Timeout
+        return echo_handler(url, params)
+
+    chunk_planner = AdaptiveChunkPlanner(small_rows=0, large_rows=1)
+    client = FakeClient(handler)
+    pulse_eco_api = PulseEcoAPI(
+        city_name="adaptive",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=client,  # type: ignore[arg-type]
+        retry_policy=NO_RETRY,
+        chunk_planner=chunk_planner,
+    )
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    to = from_ + DATA_RAW_MAX_SPAN
+    data_raw = pulse_eco_api.data_raw(from_=from_, to=to, type="pm10")
+    assert len(data_raw) > 1, "the timed out chunk should be split"
+    decisions = chunk_planner.decisions
+    assert len(decisions) >= 2, "the span should be halved at least twice"  # noqa: PLR2004
+    assert all(decision.reason == "timeout" for decision in decisions), (
+        "the span should be halved because of timeouts"
+    )
+    learned_span = chunk_planner.spans["adaptive", "dataRaw", "pm10", ""]
+    assert learned_span <= max_span, "the learned span should not time out"
+    client.calls.clear()
+    pulse_eco_api.data_raw(from_=from_, to=to, type="pm10")
+    assert all(
+        datetime.datetime.fromisoformat(params["to"])
+        - datetime.datetime.fromisoformat(params["from"])
+        <= max_span
+        for _, params in client.calls
+    ), "the learned span should be used"
+
+
+async def test_coalesce_identical_requests() -> None:
+    requests_count = 5
+    async_client = FakeAsyncClient()
+    pulse_eco_api = PulseEcoAPI(
+        city_name="coalesce",
+        base_url=FAKE_BASE_URL_FORMAT,
+        async_client=async_client,  # type: ignore[arg-type]
+    )
+    results = await asyncio.gather(
+        *(pulse_eco_api.acurrent() for _ in range(requests_count))
+    )
+    assert all(result == results[0] for result in results), (
+        "the coalesced requests should share the result"
+    )
+    assert len(async_client.calls) == 1, "only one request should be sent"
+    assert pulse_eco_api.coalesced_requests == requests_count - 1, (
+        "the saved requests should be counted"
+    )
+    await pulse_eco_api.acurrent()
+    assert len(async_client.calls) == 2, "finished requests should not be shared"  # noqa: PLR2004
+
+
+async def test_coalesce_cancelled_leader() -> None:
+    async_client = FakeAsyncClient(delay=0.05)
+    pulse_eco_api = PulseEcoAPI(
+        city_name="coalesce-cancel",
+        base_url=FAKE_BASE_URL_FORMAT,
+        async_client=async_client,  # type: ignore[arg-type]
+    )
+    leader = asyncio.ensure_future(pulse_eco_api.acurrent())
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(pulse_eco_api.acurrent())
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert len(await follower) == 1, (
+        "a cancelled leader should not cancel the call of the followers"
+    )
+    assert leader.cancelled()
+    assert len(async_client.calls) == 1, "only one request should be sent"
+
+    abandoned = asyncio.ensure_future(pulse_eco_api.acurrent())
+    await asyncio.sleep(0)
+    abandoned.cancel()
+    await asyncio.sleep(0)
+    assert len(await pulse_eco_api.acurrent()) == 1, (
+        "an abandoned call should not be shared with a new one"
+    )
+
+
+def test_response_cache() -> None:
+    client = FakeClient()
+    cache = ResponseCache(max_size=2)
+    pulse_eco_api = PulseEcoAPI(
+        city_name="cache",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=client,  # type: ignore[arg-type]
+        cache=cache,
+    )
+    past = {"from": "2020-01-01T00:00:00+00:00", "to": "2020-01-02T00:00:00+00:00"}
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    assert default_cache_policy("dataRaw", past) == float("inf"), (
+        "past windows should be cached forever"
+    )
+    assert default_cache_policy("dataRaw", {"to": now.isoformat()}) == 60, (  # noqa: PLR2004
+        "windows touching now should be cached shortly"
+    )
+    first = pulse_eco_api.data_raw(from_=past["from"], to=past["to"], type="pm10")
+    second = pulse_eco_api.data_raw(from_=past["from"], to=past["to"], type="pm10")
+    assert first == second, "the cached response should be returned"
+    assert len(client.calls) == 1, "the cached window should not be requested again"
+    assert (cache.hits, cache.misses) == (1, 1), "the hits and misses should be counted"
+    pulse_eco_api.sensors()
+    pulse_eco_api.overall()
+    assert len(cache) == 2, "the least recently used response should be evicted"  # noqa: PLR2004
+    assert cache.evictions == 1, "the eviction should be counted"
+
+
+def test_local_mirror_fetches_only_missing_intervals(tmp_path: Path) -> None:
+    client = FakeClient()
+    mirror = LocalMirror(tmp_path / "mirror.sqlite3")
+    pulse_eco = PulseEcoClient(
+        city_name="mirror",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=client,  # type: ignore[arg-type]
+        mirror=mirror,
+    )
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    day = datetime.timedelta(days=1)
+    first = pulse_eco.data_raw(from_=from_, to=from_ + day, type=DataValueType.PM10)
+    assert len(client.calls) == 1, "the empty mirror should request the interval"
+    client.calls.clear()
+    second = pulse_eco.data_raw(
+        from_=from_, to=from_ + 2 * day, type=DataValueType.PM10
+    )
+    assert len(client.calls) == 1, "only the missing interval should be requested"
+    assert datetime.datetime.fromisoformat(
+        client.calls[0][1]["from"]
+    ) == from_ + day + datetime.timedelta(seconds=1), (
+        "the missing interval should start after the held interval"
+    )
+    assert second[0] == first[0], "the held data values should be read from disk"
+    mirror.close()
+    client.calls.clear()
+    reopened = LocalMirror(tmp_path / "mirror.sqlite3")
+    assert (
+        reopened.missing_intervals(
+            "mirror", "dataRaw", from_, from_ + 2 * day, type="pm10", sensor_id="1000"
+        )
+        == []
+    ), "the coverage should persist and cover a single sensor"
+    reopened.close()
+
+
+async def test_local_mirror_average_scopes() -> None:
+    mirror = LocalMirror()
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    to = from_ + datetime.timedelta(days=2)
+    fetched: list[str | None] = []
+
+    def fetcher(
+        sensor_id: str | None,
+    ) -> Callable[[datetime.datetime, datetime.datetime], Awaitable[list[Any]]]:
+        async def fetch(
+            fetch_from: datetime.datetime, fetch_to: datetime.datetime
+        ) -> list[Any]:
+            await asyncio.sleep(0)
+            fetched.append(sensor_id)
+            return [
+                {
+                    "sensorId": sensor_id or "-1",
+                    "stamp": fetch_from.isoformat(),
+                    "type": "pm10",
+                    "position": "",
+                    "value": 1 if sensor_id is None else 2,
+                }
+            ]
+
+        return fetch
+
+    city_wide = await mirror.aget(
+        "mirror", "avgData/day", from_, to, fetcher(None), type="pm10"
+    )
+    sensor = await mirror.aget(
+        "mirror",
+        "avgData/day",
+        from_,
+        to,
+        fetcher("1000"),
+        type="pm10",
+        sensor_id="1000",
+    )
+    assert fetched == [None, "1000"], (
+        "the city average should not cover the averages of a sensor"
+    )
+    assert [data["value"] for data in sensor] == [2]
+    assert (
+        await mirror.aget(
+            "mirror", "avgData/day", from_, to, fetcher(None), type="pm10"
+        )
+        == city_wide
+    ), "the city averages should not include the averages of a sensor"
+    assert fetched == [None, "1000"], "the city averages should be held"
+    mirror.close()
+
+
+async def test_iter_data_raw_batches() -> None:
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    to = from_ + 3 * DATA_RAW_MAX_SPAN
+    client = FakeClient()
+    pulse_eco = PulseEcoClient(
+        city_name="iter",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=client,  # type: ignore[arg-type]
+    )
+    batches = pulse_eco.iter_data_raw(from_=from_, to=to, type=DataValueType.PM10)
+    first_batch = next(batches)
+    assert first_batch[0].stamp == from_, "the first chunk should be yielded first"
+    assert len(client.calls) <= 2, "only the next chunk should be prefetched"  # noqa: PLR2004
+    stamps = [first_batch[0].stamp] + [batch[0].stamp for batch in batches]
+    assert stamps == sorted(stamps), "the batches should be yielded in order"
+    assert len(stamps) == 3, "there should be one batch per chunk"  # noqa: PLR2004
+
+    async_client = FakeAsyncClient()
+    pulse_eco = PulseEcoClient(
+        city_name="aiter",
+        base_url=FAKE_BASE_URL_FORMAT,
+        async_client=async_client,  # type: ignore[arg-type]
+    )
+    async_stamps = [
+        batch[0].stamp
+        async for batch in pulse_eco.aiter_data_raw(
+            from_=from_, to=to, type=DataValueType.PM10, prefetch=2
+        )
+    ]
+    assert async_stamps == stamps, "the async batches should match the sync batches"
+
+
+async def test_validate_json_from_response_bytes() -> None:
+    decoded: list[bytes] = []
+
+    def counting_json_loads(content: bytes) -> Any:  # noqa: ANN401
+        decoded.append(content)
+        return json.loads(content)
+
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    to = from_ + 2 * DATA_RAW_MAX_SPAN
+    pulse_eco_api = PulseEcoAPI(
+        city_name="bytes",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=FakeClient(),  # type: ignore[arg-type]
+        async_client=FakeAsyncClient(  # type: ignore[arg-type]
+            lambda url, params: FakeAiohttpResponse(echo_handler(url, params))
+        ),
+        json_loads=counting_json_loads,
+    )
+    contents = pulse_eco_api.data_raw_bytes(from_=from_, to=to, type="pm10")
+    assert len(contents) == 2, "there should be one body per chunk"  # noqa: PLR2004
+    assert all(isinstance(content, bytes) for content in contents)
+    pulse_eco = PulseEcoClient(city_name="bytes", pulse_eco_api=pulse_eco_api)
+    data_raw = pulse_eco.data_raw(from_=from_, to=to, type=DataValueType.PM10)
+    adata_raw = await pulse_eco.adata_raw(from_=from_, to=to, type=DataValueType.PM10)
+    assert data_raw == adata_raw, "the aiohttp body should be read as bytes"
+    assert data_raw[0].value == 1, "the values should be validated from json"
+    assert decoded == [], "the client should not decode into intermediate dicts"
+    pulse_eco_api.data_raw(from_=from_, to=to, type="pm10")
+    assert len(decoded) == 2, "the json backend should decode the low level API"  # noqa: PLR2004
+
+
+def test_data_value_batch() -> None:
+    stamps = ["2020-01-01T00:00:00+01:00", "2020-01-01T00:10:00+01:00"]
+
+    def handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        return [
+            {
+                "sensorId": sensor_id,
+                "stamp": stamp,
+                "type": type,
+                "position": f"41.99,21.4{sensor_id[-1]}",
+                "value": str(value),
+            }
+            for value, (stamp, sensor_id, type) in enumerate(
+                (stamp, sensor_id, type)
+                for stamp in stamps
+                for sensor_id in ("1000", "1001")
+                for type in ("pm10", "pm25")
+            )
+        ]
+
+    pulse_eco = PulseEcoClient(
+        city_name="batch",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=FakeClient(handler),  # type: ignore[arg-type]
+    )
+    batch = pulse_eco.data24h_batch()
+    data_values = pulse_eco.data24h()
+    assert len(batch) == len(data_values)
+    assert batch.to_data_values() == data_values, "the batch should hold the same data"
+    assert len(batch.sensor_ids.dictionary) == 2, "the sensor IDs should be encoded"  # noqa: PLR2004
+    pm10 = batch.filter(sensor_id="1001", type=DataValueType.PM10)
+    assert [row.value for row in pm10] == [2, 6], "the rows should be filtered"
+    assert batch.filter(from_=stamps[1]).stamps == batch[4:].stamps, (
+        "the rows should be filtered by time"
+    )
+    assert batch[-1].stamp == data_values[-1].stamp, "the stamp should be kept"
+    joined = DataValueBatch.concat([batch[:3], batch[3:]])
+    assert list(joined) == list(batch), "the joined batch should hold all rows"
+
+
+def test_export_to_numpy() -> None:
+    np = pytest.importorskip("numpy")
+    from pulseeco.client.export import parse_stamps, to_numpy  # noqa: PLC0415
+
+    stamps = [
+        "2020-01-01T00:00:00+01:00",
+        "2020-06-01T12:30:00-02:30",
+        "2020-01-01T00:00:00Z",
+        "2020-01-01T00:00:00.500+01:00",
+    ]
+    expected = [
+        np.datetime64(
+            datetime.datetime.fromisoformat(stamp.replace("Z", "+00:00"))
+            .astimezone(datetime.timezone.utc)
+            .replace(tzinfo=None),
+            "s",
+        )
+        for stamp in stamps
+    ]
+    assert list(parse_stamps(stamps)) == expected, "the stamps should be UTC"
+    data = [
+        {
+            "sensorId": str(1000 + index % 2),
+            "stamp": stamp,
+            "type": "pm10",
+            "position": None if index == 0 else "41.99,21.42",
+            "value": str(index),
+        }
+        for index, stamp in enumerate(stamps)
+    ]
+    arrays = to_numpy(json.dumps(data).encode())
+    assert list(arrays["stamp"]) == expected
+    assert arrays["value"].dtype == np.int64
+    assert list(arrays["position"]) == [None] + ["41.99,21.42"] * 3
+    batch_arrays = DataValueBatch.from_dicts(data).to_numpy()
+    assert all(np.array_equal(batch_arrays[name], arrays[name]) for name in arrays), (
+        "the batch should export the same arrays"
+    )
+
+
+def test_trusted_client_records() -> None:
+    pulse_eco = PulseEcoClient(
+        city_name="trusted",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=FakeClient(),  # type: ignore[arg-type]
+    )
+    data_values = pulse_eco.data24h()
+    records = pulse_eco.trusted().data24h()
+    assert all(isinstance(record, DataValueRecord) for record in records)
+    assert [record.validate() for record in records] == data_values, (
+        "the records should validate into the same data values"
+    )
+    record, data_value = records[0], data_values[0]
+    assert all(
+        getattr(record, field) == getattr(data_value, field)
+        for field in DataValue.model_fields
+    ), "the record fields should match the data value fields"
+    with pytest.raises(AttributeError):
+        record.value = 0  # type: ignore[misc]
+    with pytest.raises(AttributeError):
+        record.extra = 0  # type: ignore[attr-defined]
+
+
+def test_intern_table() -> None:
+    table = InternTable(max_size=2)
+    first = json.loads('"41.99,21.42"')
+    second = json.loads('"41.99,21.42"')
+    assert first is not second
+    assert table.intern(first) is first
+    assert table.intern(second) is first, "equal values should share one object"
+    table.intern("a")
+    table.intern("b")
+    assert len(table) == 2, "the table should be bounded"  # noqa: PLR2004
+    assert table.intern(second) is second, "the oldest value should be forgotten"
+
+    pulse_eco = PulseEcoClient(
+        city_name="interning",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=FakeClient(),  # type: ignore[arg-type]
+        coalesce_requests=False,
+        intern_table=InternTable(),
+    )
+    trusted = pulse_eco.trusted()
+    first_records = trusted.data24h()
+    second_records = trusted.data24h()
+    assert first_records[0].raw is not second_records[0].raw
+    assert first_records[0].position is second_records[0].position, (
+        "the repeated strings of separate responses should share one object"
+    )
+    assert pulse_eco.data24h()[0].position is pulse_eco.data24h()[0].position
+
+    intern_table = InternTable()
+    pulse_eco = PulseEcoClient(
+        city_name="interning",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=FakeClient(),  # type: ignore[arg-type]
+        coalesce_requests=False,
+        intern_table=intern_table,
+    )
+    data_value = pulse_eco.data24h()[0]
+    assert data_value.position is not None
+    assert intern_table.intern("".join(data_value.position)) is data_value.position, (
+        "the data values validated straight from json should be interned"
+    )
+
+
+async def test_chunk_results_merged() -> None:
+    def boundary_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        """Respond with the end of the previous chunk again, sensors unordered."""
+        previous_to = datetime.datetime.fromisoformat(
+            params["from"]
+        ) - datetime.timedelta(seconds=1)
+        return [
+            {
+                "sensorId": sensor_id,
+                "stamp": stamp,
+                "type": "pm10",
+                "position": "41.99,21.42",
+                "value": "1",
+            }
+            for stamp in (previous_to.isoformat(), params["to"])
+            for sensor_id in ("2", "1")
+        ]
+
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    to = from_ + 3 * DATA_RAW_MAX_SPAN
+    pulse_eco = PulseEcoClient(
+        city_name="merge",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=FakeClient(boundary_handler),  # type: ignore[arg-type]
+        async_client=FakeAsyncClient(boundary_handler),  # type: ignore[arg-type]
+    )
+    data_values = pulse_eco.data_raw(from_=from_, to=to, type=DataValueType.PM10)
+    keys = [(data_value.stamp, data_value.sensor_id) for data_value in data_values]
+    assert keys == sorted(set(keys)), "the data values should be ordered and unique"
+    assert len(keys) == 2 * 4, "each of the 4 boundaries should be kept once"
+    assert (
+        await pulse_eco.adata_raw(from_=from_, to=to, type=DataValueType.PM10)
+        == data_values
+    )
+    assert [
+        data_value
+        for batch in pulse_eco.iter_data_raw(
+            from_=from_, to=to, type=DataValueType.PM10
+        )
+        for data_value in batch
+    ] == data_values, "the batches should not repeat the chunk boundaries"
+
+
+async def test_city_wide_query_planner() -> None:
+    statuses = {"1": "ACTIVE", "2": "INACTIVE", "3": "BANNED", "4": "NOT_CLAIMED"}
+
+    def sensors_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        if url.endswith("/sensor"):
+            return [
+                {
+                    "sensorId": sensor_id,
+                    "position": "41.99,21.42",
+                    "comments": "",
+                    "type": "1",
+                    "description": f"Sensor {sensor_id}",
+                    "status": status,
+                }
+                for sensor_id, status in statuses.items()
+            ]
+        if url.endswith("/overall"):
+            return {
+                "cityName": "planner",
+                "values": {"pm10": "73", "pm25": "53", "no2": "N/A"},
+            }
+        return echo_handler(url, params)
+
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    to = from_ + datetime.timedelta(hours=1)
+    client = FakeClient(sensors_handler)
+    async_client = FakeAsyncClient(sensors_handler)
+    pulse_eco = PulseEcoClient(
+        city_name="planner",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=client,  # type: ignore[arg-type]
+        async_client=async_client,  # type: ignore[arg-type]
+        plan_city_wide_queries=True,
+    )
+    data_values = pulse_eco.data_raw(from_=from_, to=to)
+    raw_calls = [params for url, params in client.calls if "dataRaw" in url]
+    assert all("sensorId" in params and "type" in params for params in raw_calls), (
+        "a city wide query should be split by sensor and type"
+    )
+    assert {params["sensorId"] for params in raw_calls} == {"1", "4"}, (
+        "the inactive and banned sensors should be skipped"
+    )
+    assert {params["type"] for params in raw_calls} == {"pm10", "pm25"}, (
+        "only the types the city reports should be queried"
+    )
+    assert len(raw_calls) == 4  # noqa: PLR2004
+    assert {data_value.sensor_id for data_value in data_values} == {"1", "4"}
+    assert await pulse_eco.adata_raw(from_=from_, to=to) == data_values
+    batch_calls = len(client.calls) + len(async_client.calls)
+    assert pulse_eco.data_raw_batch(from_=from_, to=to).to_data_values() == data_values
+    batch = await pulse_eco.adata_raw_batch(from_=from_, to=to)
+    assert batch.to_data_values() == data_values
+    assert len(client.calls) + len(async_client.calls) - batch_calls == 8, (  # noqa: PLR2004
+        "the batches should use the planned city wide queries"
+    )
+    pulse_eco.data_raw(from_=from_, to=to)
+    metadata_calls = [
+        url for url, _ in client.calls + async_client.calls if "dataRaw" not in url
+    ]
+    assert len(metadata_calls) == 2, (  # noqa: PLR2004
+        "the sensors and the reported types should be cached"
+    )
+
+
+async def test_query_many() -> None:
+    def hourly_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        """Respond with one data value per hour of the range."""
+        stamp = datetime.datetime.fromisoformat(params["from"])
+        to = datetime.datetime.fromisoformat(params["to"])
+        data_values = []
+        while stamp <= to:
+            data_values.append({
+                "sensorId": params["sensorId"],
+                "stamp": stamp.isoformat(),
+                "type": params["type"],
+                "position": "41.99,21.42",
+                "value": "1",
+            })
+            stamp += datetime.timedelta(hours=1)
+        return data_values
+
+    from_ = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    hour = datetime.timedelta(hours=1)
+    specs = [
+        QuerySpec(from_, from_ + 2 * hour, DataValueType.PM10, "1"),
+        QuerySpec(from_ + hour, from_ + 3 * hour, DataValueType.PM10, "1"),
+        QuerySpec(from_, from_ + hour, DataValueType.PM25, "1"),
+        QuerySpec(from_, from_ + 24 * hour, DataValueType.PM10, "1", AveragePeriod.DAY),
+        QuerySpec(from_, from_ + 24 * hour, DataValueType.PM10, "1", AveragePeriod.DAY),
+    ]
+    client = FakeClient(hourly_handler)
+    async_client = FakeAsyncClient(hourly_handler)
+    pulse_eco = PulseEcoClient(
+        city_name="batch",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=client,  # type: ignore[arg-type]
+        async_client=async_client,  # type: ignore[arg-type]
+        coalesce_requests=False,
+    )
+    results = pulse_eco.query_many(specs)
+    assert len(client.calls) == 3, "overlapping and equal specs should be joined"  # noqa: PLR2004
+    assert [len(result) for result in results] == [3, 3, 2, 25, 25]
+    assert results[1][0].stamp == from_ + hour, "a spec should get only its range"
+    assert await pulse_eco.aquery_many(specs) == results
+    assert len(async_client.calls) == 3  # noqa: PLR2004
+    with pytest.raises(ValueError, match="type"):
+        pulse_eco.query_many([QuerySpec(from_, from_, period=AveragePeriod.DAY)])
+
+
+async def test_delta_poller() -> None:
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    stamps = [now - datetime.timedelta(hours=30), now - datetime.timedelta(hours=1)]
+    fail_data_raw = False
+
+    def live_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        """Respond with every stamp, the tail requests fail if asked to."""
+        if fail_data_raw and "dataRaw" in url:
+            return FakeResponse(None, status_code=500)
+        if url.endswith("/overall"):
+            return {"cityName": "poller", "values": {"pm10": "1"}}
+        return [
+            {
+                "sensorId": "1",
+                "stamp": stamp.isoformat(),
+                "type": "pm10",
+                "position": "41.99,21.42",
+                "value": "1",
+            }
+            for stamp in stamps
+        ]
+
+    client = FakeClient(live_handler)
+    pulse_eco = PulseEcoClient(
+        city_name="poller",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=client,  # type: ignore[arg-type]
+        retry_policy=NO_RETRY,
+    )
+    poller = pulse_eco.poller()
+    received: list[list[DataValue]] = []
+    poller.subscribe(received.append)
+    assert len(poller.poll()) == 2  # noqa: PLR2004
+    assert [data_value.stamp for data_value in poller.buffer] == stamps[1:], (
+        "the buffer should keep only the rolling window"
+    )
+    stamps.append(now - datetime.timedelta(minutes=1))
+    new = poller.poll()
+    assert [data_value.stamp for data_value in new] == stamps[2:], (
+        "only the data values newer than the watermark should be new"
+    )
+    assert "dataRaw" in client.calls[-1][0], "the tail should be requested"
+    assert client.calls[-1][1]["from"] == stamps[1].isoformat()
+    assert poller.poll() == [], "a poll without new data should find nothing"
+    stamps.append(now)
+    fail_data_raw = True
+    new = await poller.apoll()
+    assert [data_value.stamp for data_value in new] == stamps[3:]
+    assert "current" in client.calls[-1][0], "a failed tail should use current"
+    assert [len(batch) for batch in received] == [2, 1, 1]
+    assert poller.watermarks["1", DataValueType.PM10] == now
+
+
+def test_delta_poller_stale_sensor() -> None:
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    stamps = {
+        "1": now - datetime.timedelta(minutes=1),
+        "2": now - datetime.timedelta(hours=5),
+    }
+    broken = False
+
+    def live_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        if broken and "dataRaw" in url:
+            raise ValueError("broken handler")
+        if url.endswith("/overall"):
+            return {"cityName": "stale", "values": {"pm10": "1"}}
+        return [
+            {
+                "sensorId": sensor_id,
+                "stamp": stamp.isoformat(),
+                "type": "pm10",
+                "position": "41.99,21.42",
+                "value": "1",
+            }
+            for sensor_id, stamp in stamps.items()
+        ]
+
+    client = FakeClient(live_handler)
+    pulse_eco = PulseEcoClient(
+        city_name="stale",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=client,  # type: ignore[arg-type]
+        retry_policy=NO_RETRY,
+    )
+    poller = pulse_eco.poller()
+    poller.poll()
+    poller.poll()
+    assert client.calls[-1][1]["from"] == stamps["1"].isoformat(), (
+        "a sensor that stopped sending should not hold the tail back"
+    )
+    broken = True
+    with pytest.raises(ValueError, match="broken handler"):
+        poller.poll()
+    assert "dataRaw" in client.calls[-1][0], "only request errors should use current"
+
+
+def test_delta_poller_new_type() -> None:
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    readings = [("pm10", now - datetime.timedelta(minutes=2))]
+
+    def typed_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        """Respond with the readings of the requested type."""
+        if url.endswith("/overall"):
+            return {
+                "cityName": "types",
+                "values": {type_: "1" for type_, _ in readings},
+            }
+        return [
+            {
+                "sensorId": "1",
+                "stamp": stamp.isoformat(),
+                "type": type_,
+                "position": "41.99,21.42",
+                "value": "1",
+            }
+            for type_, stamp in readings
+            if params.get("type", type_) == type_
+        ]
+
+    pulse_eco = PulseEcoClient(
+        city_name="types",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=FakeClient(typed_handler),  # type: ignore[arg-type]
+        sensor_ttl=0,
+    )
+    poller = pulse_eco.poller()
+    assert len(poller.poll()) == 1
+    readings.append(("pm25", now - datetime.timedelta(minutes=1)))
+    new = poller.poll()
+    assert [data_value.type for data_value in new] == [DataValueType.PM25], (
+        "a type first reported after the first poll should be requested"
+    )
+    assert poller.watermarks["1", DataValueType.PM25] == readings[1][1]
+
+
+async def test_watch_new_measurements() -> None:
+    polls: dict[str, int] = {}
+
+    def growing_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        """Respond with one more data value on every poll of a city."""
+        city_name = url.split("//")[1].split(".")[0]
+        polls[city_name] = polls.get(city_name, 0) + 1
+        return [
+            {
+                "sensorId": "1",
+                "stamp": f"2020-01-01T00:0{minute}:00+00:00",
+                "type": "pm10",
+                "position": "41.99,21.42",
+                "value": str(minute),
+            }
+            for minute in range(min(polls[city_name], 3))
+        ]
+
+    multi_city = MultiCityPulseEcoClient(
+        cities=["skopje", "bitola"],
+        base_url=FAKE_BASE_URL_FORMAT,
+        async_client=FakeAsyncClient(growing_handler, delay=0),  # type: ignore[arg-type]
+    )
+    received: list[tuple[str, int]] = []
+    async with multi_city.watch(interval=0.01) as watcher:
+        async for measurement in watcher:
+            assert isinstance(measurement.data_value, DataValue)
+            received.append((measurement.city_name, measurement.data_value.value))
+            if len(received) == 6:  # noqa: PLR2004
+                break
+    assert sorted(received) == [
+        (city_name, value) for city_name in ("bitola", "skopje") for value in range(3)
+    ], "every data value should be yielded once"
+    assert min(polls.values()) >= 3, "the repeated data values should be dropped"  # noqa: PLR2004
+    assert [measurement async for measurement in watcher] == [], (
+        "a closed watcher should stop"
+    )
+
+
+async def test_watch_invalid_and_close() -> None:
+    def mixed_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        """Respond with an invalid value between valid values."""
+        return [
+            {
+                "sensorId": "1",
+                "stamp": f"2020-01-01T00:0{minute}:00+00:00",
+                "type": "pm10",
+                "position": "41.99,21.42",
+                "value": value,
+            }
+            for minute, value in enumerate(["invalid", "1", "2"])
+        ]
+
+    pulse_eco = PulseEcoClient(
+        city_name="skopje",
+        base_url=FAKE_BASE_URL_FORMAT,
+        async_client=FakeAsyncClient(mixed_handler, delay=0),  # type: ignore[arg-type]
+    )
+    watcher = pulse_eco.watch(interval=0.01)
+    values = [
+        (await asyncio.wait_for(watcher.__anext__(), 1)).data_value.value
+        for _ in range(2)
+    ]
+    assert values == [1, 2], (
+        "the valid data values after an invalid one should be yielded"
+    )
+    assert watcher.errors == {}, "an invalid data value is not a poll error"
+    waiting = asyncio.ensure_future(watcher.__anext__())
+    await asyncio.sleep(0.05)
+    assert not waiting.done(), "the invalid data value should not be yielded"
+    await watcher.aclose()
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(waiting, 1)
+
+
+def test_sensor_registry(tmp_path: Path) -> None:
+    def sensor_json(sensor_id: str) -> dict[str, str]:
+        return {
+            "sensorId": sensor_id,
+            "position": "41.99,21.42",
+            "comments": "",
+            "type": "1",
+            "description": f"Sensor {sensor_id}",
+            "status": "ACTIVE",
+        }
+
+    def sensors_handler(url: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        if url.endswith("/sensor"):
+            return [sensor_json("1"), sensor_json("2")]
+        return sensor_json(url.rsplit("/", 1)[1])
+
+    path = tmp_path / "sensors.json"
+    # a temporary file left behind by another writer
+    (tmp_path / "sensors.json.tmp").mkdir()
+    client = FakeClient(sensors_handler)
+    pulse_eco = PulseEcoClient(
+        city_name="registry",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=client,  # type: ignore[arg-type]
+        sensor_ttl=3600,
+        sensor_registry_path=path,
+    )
+    assert pulse_eco.sensor("1").sensor_id == "1"
+    assert pulse_eco.sensor("2").sensor_id == "2"
+    assert len(client.calls) == 1, "the known sensors should not be requested"
+    assert pulse_eco.sensor("3").sensor_id == "3"
+    assert client.calls[-1][0].endswith("/sensor/3"), "unknown IDs should be requested"
+    assert pulse_eco.sensor_registry is not None
+    assert list(pulse_eco.sensor_registry.get_many(["3", "1", "3"])) == ["3", "1"]
+    assert len(client.calls) == 2  # noqa: PLR2004
+
+    warm_client = FakeClient(sensors_handler)
+    warm_pulse_eco = PulseEcoClient(
+        city_name="registry",
+        base_url=FAKE_BASE_URL_FORMAT,
+        client=warm_client,  # type: ignore[arg-type]
+        sensor_ttl=3600,
+        sensor_registry_path=path,
+    )
+    assert [sensor.sensor_id for sensor in warm_pulse_eco.sensors()] == ["1", "2"]
+    assert warm_client.calls == [], "a warm start should not request the sensors"
+    assert sorted(child.name for child in tmp_path.iterdir()) == [
+        "sensors.json",
+        "sensors.json.tmp",
+    ], "the temporary files should be replaced"
+
+
+def test_sensor_index() -> None:
+    rng = random.Random(23)  # noqa: S311
+    sensors = [
+        Sensor.model_validate({
+            "sensorId": str(index),
+            "position": f"{rng.uniform(41.9, 42.1)},{rng.uniform(21.3, 21.6)}",
+            "comments": "",
+            "type": "1",
+            "description": f"Sensor {index}",
+            "status": "ACTIVE",
+        })
+        for index in range(600)
+    ]
+    sensors.append(sensors[0].model_copy(update={"sensor_id": "600", "position": ""}))
+    index = SensorIndex.from_cities({"skopje": sensors[:300], "tetovo": sensors[300:]})
+    assert len(index) == 600, "a sensor without a position should be skipped"  # noqa: PLR2004
+
+    def brute_force(latitude: float, longitude: float) -> list[tuple[float, str]]:
+        distances = []
+        for sensor in sensors[:600]:
+            sensor_latitude, sensor_longitude = map(float, sensor.position.split(","))
+            distances.append((
+                haversine(latitude, longitude, sensor_latitude, sensor_longitude),
+                sensor.sensor_id,
+            ))
+        return sorted(distances)
+
+    # the last point is the antipode, far from every sensor
+    points = [(42.0, 21.45), (41.95, 21.35), (43.0, 22.0), (-42.0, -158.55)]
+    for latitude, longitude in points:
+        expected = brute_force(latitude, longitude)
+        nearest = index.nearest(latitude, longitude, k=5)
+        assert [match.sensor.sensor_id for match in nearest] == [
+            sensor_id for _, sensor_id in expected[:5]
+        ]
+        assert nearest[0].distance == pytest.approx(expected[0][0])
+        within = index.within_radius(latitude, longitude, radius=3000)
+        assert [match.sensor.sensor_id for match in within] == [
+            sensor_id
+            for distance, sensor_id in expected
+            if distance <= 3000  # noqa: PLR2004
+        ]
+    assert index.nearest(42.0, 21.45, k=1)[0].city_name in {"skopje", "tetovo"}
+
+    in_box = index.within_bbox(41.95, 21.4, 42.0, 21.5)
+    assert {entry.sensor.sensor_id for entry in in_box} == {
+        sensor.sensor_id
+        for sensor in sensors[:600]
+        if 41.95 <= float(sensor.position.split(",")[0]) <= 42.0  # noqa: PLR2004
+        and 21.4 <= float(sensor.position.split(",")[1]) <= 21.5  # noqa: PLR2004
+    }
+    data_values = [
+        DataValue.model_validate({
+            "sensorId": sensor.sensor_id,
+            "stamp": "2020-01-01T00:00:00+01:00",
+            "type": "pm10",
+            "position": sensor.position,
+            "value": "1",
+        })
+        for sensor in sensors[:600]
+    ]
+    assert {
+        data_value.sensor_id
+        for data_value in select_data_values(data_values[:300], in_box, "skopje")
+    } == {entry.sensor.sensor_id for entry in in_box if entry.city_name == "skopje"}
+
+    # sensors at the same position are at the same distance
+    tied = SensorIndex.from_cities({
+        "tetovo": sensors[:1],
+        "skopje": [sensors[0].model_copy(update={"sensor_id": "tied"}), sensors[0]],
+    })
+    latitude, longitude = map(float, sensors[0].position.split(","))
+    tied_order = [("skopje", "0"), ("skopje", "tied"), ("tetovo", "0")]
+    assert [
+        (match.city_name, match.sensor.sensor_id)
+        for match in tied.nearest(latitude, longitude, k=3)
+    ] == tied_order
+    assert [
+        (match.city_name, match.sensor.sensor_id)
+        for match in tied.within_radius(latitude, longitude, radius=1)
+    ] == tied_order
+    in_tetovo = tied.within_bbox(41.9, 21.3, 42.1, 21.6)[:1]
+    assert in_tetovo[0].city_name == "tetovo"
+    assert select_data_values(data_values[:1], in_tetovo, "tetovo") == data_values[:1]
+    assert select_data_values(data_values[:1], in_tetovo, "skopje") == [], (
+        "the data values should be selected by city and sensor ID"
+    )
+
+
+def test_resample(monkeypatch: pytest.MonkeyPatch) -> None:
+    offset = datetime.timezone(datetime.timedelta(hours=1))
+
+    def data_value(
+        sensor_id: str, stamp: datetime.datetime, value: int, type: str = "pm10"
+    ) -> DataValue:
+        return DataValue.model_validate({
+            "sensorId": sensor_id,
+            "stamp": stamp,
+            "type": type,
+            "position": "41.99,21.42",
+            "value": value,
+        })
+
+    # Wednesday and Sunday of one week, Monday of the next one
+    data_values = [
+        data_value("1", datetime.datetime(2024, 1, 3, 10, tzinfo=offset), 10),
+        data_value("1", datetime.datetime(2024, 1, 7, 23, tzinfo=offset), 11),
+        data_value("2", datetime.datetime(2024, 1, 7, 12, tzinfo=offset), 20),
+        data_value("1", datetime.datetime(2024, 1, 8, 0, tzinfo=offset), 30),
+        data_value("1", datetime.datetime(2024, 1, 8, 1, tzinfo=offset), 30, "pm25"),
+        data_value("3", datetime.datetime(2024, 1, 1, 11, tzinfo=offset), 5),
+    ]
+    weekly = resample(data_values, AveragePeriod.WEEK)
+    assert [
+        (average.stamp, average.sensor_id, average.type, average.value)
+        for average in weekly
+    ] == [
+        (datetime.datetime(2024, 1, 1, tzinfo=offset), "1", DataValueType.PM10, 11),
+        (datetime.datetime(2024, 1, 1, tzinfo=offset), "2", DataValueType.PM10, 20),
+        (datetime.datetime(2024, 1, 1, tzinfo=offset), "3", DataValueType.PM10, 5),
+        (datetime.datetime(2024, 1, 8, tzinfo=offset), "1", DataValueType.PM10, 30),
+        (datetime.datetime(2024, 1, 8, tzinfo=offset), "1", DataValueType.PM25, 30),
+    ], "the weeks should start on Monday and the mean should be rounded half up"
+    monthly = resample(
+        data_values,
+        AveragePeriod.MONTH,
+        origin=datetime.datetime(2023, 12, 1, 11, tzinfo=datetime.timezone.utc),
+        city_wide=True,
+    )
+    assert [
+        (average.stamp, average.sensor_id, average.value) for average in monthly
+    ] == [
+        (datetime.datetime(2023, 12, 1, 12, tzinfo=offset), "-1", 5),
+        (datetime.datetime(2024, 1, 1, 12, tzinfo=offset), "-1", 18),
+        (datetime.datetime(2024, 1, 1, 12, tzinfo=offset), "-1", 30),
+    ], "the months should start at the origin"
+    assert resample([], "hour") == []
+
+    rng = random.Random(24)  # noqa: S311
+    start = datetime.datetime(2023, 12, 20, tzinfo=offset)
+    batch = DataValueBatch.from_data_values(
+        data_value(
+            str(rng.randint(1, 5)),
+            start + datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 60)),
+            rng.randint(0, 100),
+            rng.choice(["pm10", "pm25"]),
+        )
+        for _ in range(2000)
+    )
+    buckets: list[Any] = [
+        "hour",
+        AveragePeriod.DAY,
+        AveragePeriod.WEEK,
+        AveragePeriod.MONTH,
+        datetime.timedelta(hours=6),
+    ]
+    vectorized = [resample(batch, bucket) for bucket in buckets]
+    monkeypatch.setattr("pulseeco.client.resample._HAS_NUMPY", False)
+    assert vectorized == [resample(batch, bucket) for bucket in buckets], (
+        "the numpy and pure Python grouping should give the same averages"
+    )
+
+
+def test_air_quality_index(monkeypatch: pytest.MonkeyPatch) -> None:
+    us_epa = AqiStandard.US_EPA
+    assert [
+        sub_index(concentration, DataValueType.PM25, us_epa)
+        for concentration in (0, 9.0, 9.05, 9.1, 35.5, 40, 1000)
+    ] == [0, 50, 50, 51, 101, 112, 500], "the 2024 PM2.5 breakpoints should be used"
+    assert [
+        sub_index(concentration, DataValueType.PM10)
+        for concentration in (0, 12.5, 25, 90, 360)
+    ] == [0, 13, 25, 75, 150], "CAQI should grow past 100"
+    assert sub_index(10, DataValueType.TEMPERATURE) is None
+    assert overall_index(
+        OverallValues.model_validate({"pm10": "60", "pm25": "40", "no2": "N/A"})
+    ) == (60, DataValueType.PM25)
+    assert overall_index({"temperature": 20}) is None
+
+    rng = random.Random(25)  # noqa: S311
+    batch = DataValueBatch.from_dicts(
+        {
+            "sensorId": "1000",
+            "stamp": "2024-01-01T00:00:00+01:00",
+            "type": rng.choice(["pm10", "pm25", "no2", "o3", "so2", "humidity"]),
+            "position": "41.99,21.42",
+            "value": rng.randint(0, 700),
+        }
+        for _ in range(3000)
+    )
+    vectorized = sub_indices(batch, us_epa)
+    assert vectorized[:10] == [
+        sub_index(row.value, row.type, us_epa) for row in batch[:10]
+    ]
+    monkeypatch.setattr("pulseeco.client.aqi._HAS_NUMPY", False)
+    assert vectorized == sub_indices(batch.to_data_values(), us_epa), (
+        "the numpy and pure Python indices should be the same"
+    )
+
+    means = RollingMean(datetime.timedelta(hours=24))
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    data_values = [
+        DataValue.model_validate({
+            "sensorId": "1000",
+            "stamp": start + datetime.timedelta(hours=hours),
+            "type": "pm25",
+            "position": "41.99,21.42",
+            "value": value,
+        })
+        for hours, value in [(0, 10), (12, 20), (12, 20), (24, 30), (36, 40)]
+    ]
+    assert [means.add(data_value) for data_value in data_values] == [
+        10,
+        15,
+        15,
+        25,
+        35,
+    ], "the data values out of the window and repeated ones should not count"
+    assert means.means() == {("1000", DataValueType.PM25): 35}
+    assert means.index("1000", DataValueType.PM25, us_epa) == sub_index(
+        35, DataValueType.PM25, us_epa
+    )
+    assert means.mean("1001", DataValueType.PM25) is None